@@ -0,0 +1,114 @@
+"""
+Deterministic synthetic inputs for the benchmarks: transcripts, context
+sources, resumes (as text and as multi-page PDFs), scraped HTML and model
+replies. Same arguments, same bytes.
+"""
+import uuid
+import random
+from typing import Dict, List, Tuple
+
+WORDS = ("latency cache queue shard replica index schema migration retry backoff rollout canary metric alert "
+         "incident postmortem design tradeoff throughput consistency partition leader follower consensus "
+         "pipeline deploy review mentor stakeholder roadmap deadline scope estimate customer feature").split()
+
+SECTIONS = ("SUMMARY", "EXPERIENCE", "SKILLS", "PROJECTS", "EDUCATION")
+
+def sentence(rng: random.Random, words: int = 14) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(words)).capitalize() + "."
+
+def paragraph(rng: random.Random, chars: int) -> str:
+    parts, size = [], 0
+    while size < chars:
+        parts.append(sentence(rng, rng.randint(8, 20)))
+        size += len(parts[-1]) + 1
+    return " ".join(parts)[:chars]
+
+def transcript(messages: int, seed: int = 0) -> List[Dict]:
+    """
+    Interaction log as stored on SessionStep: alternating assistant/user
+    entries of 200-600 characters, with the occasional system note.
+    """
+    rng = random.Random(seed)
+    log = []
+    for i in range(messages):
+        role = "system" if i and i % 25 == 0 else ("assistant" if i % 2 == 0 else "user")
+        log.append({"role": role, "content": paragraph(rng, rng.randint(200, 600)), "id": str(uuid.UUID(int=rng.getrandbits(128)))})
+    return log
+
+def context_sources(count: int, chars: int = 5000, seed: int = 0) -> List[Tuple[str, str]]:
+    rng = random.Random(seed)
+    return [(f"source-{i}", paragraph(rng, chars)) for i in range(count)]
+
+def resume_text(lines: int, seed: int = 0) -> str:
+    """
+    Resume-shaped text: the standard headings with bullet lines spread between them.
+    """
+    rng = random.Random(seed)
+    per_section = max(1, lines // len(SECTIONS))
+    out = ["Jordan Example", "Senior Software Engineer"]
+    for heading in SECTIONS:
+        out.append(heading)
+        out.extend(f"- {sentence(rng, rng.randint(8, 16))}" for _ in range(per_section))
+    return "\n".join(out)
+
+def _pdf_escape(text: str) -> str:
+    return text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+def pdf_document(pages: int, lines_per_page: int = 50, seed: int = 0) -> bytes:
+    """
+    A text PDF (Helvetica, one content stream per page) carrying a resume of
+    pages * lines_per_page lines.
+    """
+    lines = resume_text(pages * lines_per_page, seed).splitlines()
+    page_lines = [lines[i:i + lines_per_page] for i in range(0, len(lines), lines_per_page)][:pages]
+
+    # 1 catalog, 2 page tree, 3 font, then a (page, contents) pair per page
+    objects = [None, None, b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"]
+    kids = []
+    for chunk in page_lines:
+        page_id, contents_id = len(objects) + 1, len(objects) + 2
+        kids.append(f"{page_id} 0 R")
+        stream = "BT /F1 10 Tf 14 TL 50 760 Td\n" + "".join(f"({_pdf_escape(line)}) Tj T*\n" for line in chunk) + "ET"
+        objects.append(f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+                       f"/Resources << /Font << /F1 3 0 R >> >> /Contents {contents_id} 0 R >>".encode())
+        objects.append(f"<< /Length {len(stream)} >>\nstream\n{stream}\nendstream".encode())
+    objects[0] = b"<< /Type /Catalog /Pages 2 0 R >>"
+    objects[1] = f"<< /Type /Pages /Kids [{' '.join(kids)}] /Count {len(kids)} >>".encode()
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += f"{number} 0 obj\n".encode() + body + b"\nendobj\n"
+    xref = len(out)
+    out += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode()
+    out += "".join(f"{offset:010d} 00000 n \n" for offset in offsets).encode()
+    out += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode()
+    return bytes(out)
+
+def html_page(kilobytes: int, seed: int = 0) -> bytes:
+    """
+    A careers/about page: navigation, inline scripts and styles, and text blocks.
+    """
+    rng = random.Random(seed)
+    head = ("<html><head><title>Careers</title><style>body{font-family:sans-serif} .nav a{margin:0 4px}</style>"
+            "<script>window.dataLayer=window.dataLayer||[];function gtag(){dataLayer.push(arguments)}</script></head><body>"
+            "<div class='nav'>" + "".join(f"<a href='/{w}'>{w.title()}</a>" for w in WORDS[:12]) + "</div>")
+    parts = [head]
+    size = len(head)
+    while size < kilobytes * 1024:
+        block = (f"<section><h2>{sentence(rng, 4)}</h2>\n  <p>{paragraph(rng, 600)}</p>\n"
+                 f"  <ul>{''.join(f'<li>  {sentence(rng, 6)}  </li>' for _ in range(4))}</ul>\n"
+                 f"<script>track('{rng.getrandbits(32):x}')</script></section>\n")
+        parts.append(block)
+        size += len(block)
+    parts.append("</body></html>")
+    return "".join(parts).encode()
+
+def assistant_reply(chars: int, roadmap: bool = True, seed: int = 0) -> str:
+    rng = random.Random(seed)
+    text = paragraph(rng, chars)
+    if roadmap:
+        items = ", ".join(sentence(rng, 3).rstrip(".") for _ in range(5))
+        return f"<roadmap>{items}</roadmap>{text}"
+    return text
@@ -0,0 +1,131 @@
+"""
+Drives complete interview flows against the API at a fixed concurrency and
+reports p50/p95/p99 latency per endpoint plus throughput. Every external
+service is replaced by a local fake (see fakes.py), so it runs offline.
+
+    python -m backend.benchmarks.loadtest                                  # throwaway SQLite file
+    python -m backend.benchmarks.loadtest --users 200 --concurrency 50 --llm-latency 1200:0.6 --llm-429-rate 0.05
+    python -m backend.benchmarks.loadtest --database-url postgresql://.../scratch --json report.json
+
+The app runs in-process (ASGI transport, with its lifespan), so client overhead
+shares the CPU with the server: compare runs with each other, not with
+production numbers. Writes data: only point --database-url at a scratch database.
+Exits non-zero if any flow failed.
+"""
+import os
+import sys
+import json
+import time
+import uuid
+import asyncio
+import logging
+import argparse
+import tempfile
+
+def _parse_args():
+    from .fakes import Latency
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", help="scratch database (default: a temporary SQLite file)")
+    parser.add_argument("--users", type=int, default=20, help="interview flows to run")
+    parser.add_argument("--concurrency", type=int, default=10, help="flows in flight at once")
+    parser.add_argument("--turns", type=int, default=3, help="text turns per step")
+    parser.add_argument("--steps", type=int, default=4, help="steps to go through per session")
+    parser.add_argument("--no-voice", dest="voice", action="store_false", help="skip voice turns and TTS replays")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--llm-latency", type=Latency.parse, default=Latency(800, 0.5), metavar="MS[:SIGMA]",
+                        help="Gemini latency to first token, log-normal median and spread")
+    parser.add_argument("--llm-chunk-ms", type=float, default=30, help="gap between streamed chunks")
+    parser.add_argument("--llm-429-rate", type=float, default=0.02, help="share of Gemini attempts rejected with 429")
+    parser.add_argument("--tts-latency", type=Latency.parse, default=Latency(250), metavar="MS[:SIGMA]")
+    parser.add_argument("--search-latency", type=Latency.parse, default=Latency(400), metavar="MS[:SIGMA]")
+    parser.add_argument("--storage-latency", type=Latency.parse, default=Latency(30), metavar="MS[:SIGMA]")
+    parser.add_argument("--workers", type=int, default=4, help="threads standing in for the Celery worker")
+    parser.add_argument("--research-timeout", type=float, default=60, help="seconds to poll research status")
+    parser.add_argument("--json", help="also write the report here")
+    parser.add_argument("--verbose", action="store_true", help="keep the app's INFO and WARNING logs")
+    return parser.parse_args()
+
+def _configure_environment(args):
+    scratch = tempfile.mkdtemp(prefix="loadtest-")
+    os.environ["DATABASE_URL"] = args.database_url or f"sqlite:///{scratch}/loadtest.db"
+    os.environ.pop("ASYNC_DATABASE_URL", None)
+    os.environ.pop("DATABASE_REPLICA_URLS", None)
+    os.environ["DB_ECHO"] = "false"
+    # Fresh caches, so a run doesn't start warm from the previous one
+    os.environ["AUDIO_CACHE_DIR"] = os.path.join(scratch, "audio_cache")
+    os.environ["UPLOAD_DIR"] = os.path.join(scratch, "uploads")
+    os.environ.setdefault("SECRET_KEY", "loadtest-secret")
+
+def print_report(rows, elapsed: float, flows: int, failed: int):
+    print(f"\n{'endpoint':<58} {'n':>6} {'err':>5} {'p50':>9} {'p95':>9} {'p99':>9} {'max':>9} {'req/s':>7}")
+    for row in rows:
+        print(f"{row['endpoint']:<58} {row['count']:>6} {row['errors']:>5} {row['p50_ms']:>9.1f} {row['p95_ms']:>9.1f} "
+              f"{row['p99_ms']:>9.1f} {row['max_ms']:>9.1f} {row['rps']:>7.2f}")
+    total = sum(row["count"] for row in rows)
+    print(f"\n{total} requests in {elapsed:.1f}s: {total / elapsed:.1f} req/s, "
+          f"{(flows - failed) / elapsed:.2f} completed flows/s, {failed}/{flows} flows failed (latencies in ms)")
+
+async def run(args, app):
+    import httpx
+    from .fakes import resume_docx
+    from .flows import FlowError, InterviewFlow, Recorder
+
+    recorder = Recorder()
+    resumes = [resume_docx(i) for i in range(min(args.users, 8))]
+    run_id = uuid.uuid4().hex[:8]
+    gate = asyncio.Semaphore(args.concurrency)
+    failures = []
+
+    async def one(http, index):
+        async with gate:
+            flow = InterviewFlow(http, recorder, index, args.turns, args.steps, args.voice,
+                                 resumes[index % len(resumes)], args.research_timeout, run_id)
+            try:
+                await flow.run()
+            except (FlowError, httpx.HTTPError) as e:
+                failures.append(f"flow {index}: {e}")
+
+    transport = httpx.ASGITransport(app=app)
+    limits = httpx.Limits(max_connections=args.concurrency)
+    async with app.router.lifespan_context(app):
+        async with httpx.AsyncClient(transport=transport, base_url="http://loadtest", limits=limits, timeout=None) as http:
+            started = time.perf_counter()
+            await asyncio.gather(*(one(http, index) for index in range(args.users)))
+            elapsed = time.perf_counter() - started
+    return recorder, elapsed, failures
+
+def main():
+    args = _parse_args()
+    _configure_environment(args)
+    if not args.verbose:
+        logging.disable(logging.WARNING)
+
+    # Imported after the environment is set; engines and services are created at import time
+    from .fakes import install
+    fakes = install(args.seed, args.llm_latency, args.llm_chunk_ms, args.llm_429_rate, args.tts_latency,
+                    args.search_latency, args.storage_latency, workers=args.workers)
+    from ...main import app
+
+    print(f"{args.users} flows, concurrency {args.concurrency}, {args.turns} turns x {args.steps} steps, "
+          f"LLM {args.llm_latency} ({args.llm_429_rate:.0%} 429s), TTS {args.tts_latency}, "
+          f"DB {os.environ['DATABASE_URL'].split('@')[-1]}")
+    try:
+        recorder, elapsed, failures = asyncio.run(run(args, app))
+    finally:
+        fakes.shutdown()
+
+    for failure in failures[:10]:
+        print(failure, file=sys.stderr)
+    rows = recorder.summary(elapsed)
+    print_report(rows, elapsed, args.users, len(failures))
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"config": {k: str(v) for k, v in vars(args).items()}, "elapsed_seconds": elapsed,
+                       "flows": args.users, "failed_flows": len(failures), "endpoints": rows}, f, indent=2)
+
+    sys.exit(1 if failures else 0)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,326 @@
+"""
+Deterministic local stand-ins for every external service the API talks to:
+Gemini (API and Celery research tasks), Google/OpenAI TTS, DuckDuckGo, S3 and
+the LeetCode CSV source. install() patches them into the backend modules; the
+real code paths (retries, caches, limiters, threadpools) stay in place.
+"""
+import io
+import json
+import math
+import sys
+import time
+import types
+import random
+import hashlib
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+class Latency:
+    """
+    Log-normal latency: median in ms and a spread (sigma). "800:0.5" parses to
+    Latency(800, 0.5). Samples are capped at 20x the median.
+    """
+    def __init__(self, median_ms: float, sigma: float = 0.4):
+        self.median_ms = median_ms
+        self.sigma = sigma
+
+    @classmethod
+    def parse(cls, value: str) -> "Latency":
+        median, _, sigma = value.partition(":")
+        return cls(float(median), float(sigma) if sigma else 0.4)
+
+    def sample(self, rng: random.Random) -> float:
+        if self.median_ms <= 0:
+            return 0.0
+        return min(self.median_ms * math.exp(rng.gauss(0, self.sigma)), self.median_ms * 20) / 1000
+
+    def __repr__(self):
+        return f"{self.median_ms:g}ms:{self.sigma:g}"
+
+class _Dice:
+    # One seeded generator per fake, shared by worker threads
+    def __init__(self, seed: int):
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def sleep(self, latency: Latency):
+        with self._lock:
+            seconds = latency.sample(self._rng)
+        time.sleep(seconds)
+
+    def chance(self, rate: float) -> bool:
+        with self._lock:
+            return self._rng.random() < rate
+
+    def choice(self, items):
+        with self._lock:
+            return self._rng.choice(items)
+
+    def sample(self, items, k: int):
+        with self._lock:
+            return self._rng.sample(items, k)
+
+# --- Gemini ---
+
+OPENERS = ["Thanks, that helps.", "Good.", "Interesting approach.", "Okay, let's dig into that.", "Fair enough.",
+           "Nice, that is a common trade-off.", "Understood.", "Let me push on that a little."]
+QUESTIONS = ["How would you handle {} under load?", "What would you monitor for {}?", "Walk me through how you tested {}.",
+             "What went wrong the last time you worked on {}?", "How would you explain {} to a new teammate?",
+             "Where would {} break first?", "How did you measure the impact of {}?"]
+TOPICS = ["the caching layer", "a schema migration", "the retry policy", "an on-call incident", "the API design",
+          "a flaky test suite", "the deployment pipeline", "a slow query", "the data model", "rate limiting",
+          "a code review disagreement", "the search feature", "a memory leak", "the queue consumers", "feature flags"]
+
+def _tokens(text: str) -> int:
+    return max(1, len(text) // 4)
+
+class _Response:
+    def __init__(self, text: str, prompt: str = None):
+        self.text = text
+        self.usage_metadata = None
+        if prompt is not None:
+            self.usage_metadata = types.SimpleNamespace(
+                prompt_token_count=_tokens(prompt), candidates_token_count=_tokens(text)
+            )
+
+class FakeGemini:
+    """
+    Stands in for genai.Client: client.models.generate_content(_stream). Replies
+    are shaped after the prompt (research JSON, roadmap on first turns,
+    interviewer turns, evaluations). rate_limit_rate of attempts fail with the
+    SDK's 429 error before any output.
+    """
+    def __init__(self, latency: Latency, chunk_ms: float = 30, rate_limit_rate: float = 0.0, seed: int = 0):
+        self.latency = latency
+        self.chunk_ms = chunk_ms
+        self.rate_limit_rate = rate_limit_rate
+        self.dice = _Dice(seed)
+        self.models = self
+
+    def generate_content(self, model, contents, config=None, **kwargs):
+        self._maybe_rate_limit()
+        text = self._reply(contents)
+        self.dice.sleep(self.latency)
+        return _Response(text, contents)
+
+    def generate_content_stream(self, model, contents, config=None, **kwargs):
+        self._maybe_rate_limit()
+        text = self._reply(contents)
+        # Time to first token is most of a turn's latency; the rest trickles in
+        self.dice.sleep(self.latency)
+        pieces = [text[i:i + 40] for i in range(0, len(text), 40)]
+        for i, piece in enumerate(pieces):
+            if i:
+                time.sleep(self.chunk_ms / 1000)
+            yield _Response(piece, contents if i == len(pieces) - 1 else None)
+
+    def _maybe_rate_limit(self):
+        if self.rate_limit_rate and self.dice.chance(self.rate_limit_rate):
+            from google.genai import errors
+            self.dice.sleep(Latency(self.latency.median_ms / 10))
+            raise errors.ClientError(429, {"error": {"code": 429, "status": "RESOURCE_EXHAUSTED",
+                                                     "message": "Resource has been exhausted (e.g. check quota)."}})
+
+    def _reply(self, prompt: str) -> str:
+        if "Return ONLY the JSON" in prompt:
+            return json.dumps({
+                "description": "Recruiter screen, a coding round, a system design round and a behavioral round.",
+                "steps": [
+                    {"type": "screening", "title": "Recruiter Call", "description": "Background and motivation."},
+                    {"type": "technical", "title": "Coding Interview", "description": "Data structures and algorithms."},
+                    {"type": "system_design", "title": "System Design", "description": "Design a scalable service."},
+                    {"type": "behavioral", "title": "Hiring Manager", "description": "Leadership principles."},
+                ],
+            })
+        if "Research Assistant" in prompt:
+            return "\n".join(
+                f"## {heading}\n" + " ".join(self.dice.sample(OPENERS, 4)) * 3
+                for heading in ("Core Values & Mission", "Engineering Culture & Tech Stack", "Recent News")
+            )
+        if "REMAINING TIME" in prompt:
+            topics = self.dice.sample(TOPICS, 2)
+            reply = f"{self.dice.choice(OPENERS)} {self.dice.choice(QUESTIONS).format(topics[0])} " \
+                    f"Also, {self.dice.choice(QUESTIONS).format(topics[1]).lower()}"
+            if "<roadmap>Item 1" in prompt:
+                reply = f"<roadmap>{', '.join(self.dice.sample(TOPICS, 4))}</roadmap>Hi, thanks for joining. {reply}"
+            return reply
+        # Evaluations and hiring manager feedback
+        return "### Evaluation\n" + "\n".join(
+            f"- **{topic.capitalize()}**: {' '.join(self.dice.sample(OPENERS, 3))}" for topic in self.dice.sample(TOPICS, 6)
+        )
+
+# --- TTS ---
+
+def _audio(text: str) -> bytes:
+    # Roughly MP3 at 32 kbps for speech: ~250 bytes per character
+    seed = hashlib.sha256(text.encode()).digest()
+    return (b"\xff\xf3" + seed * (len(text) * 250 // len(seed) + 1))[:len(text) * 250]
+
+def fake_tts(real_class, latency: Latency, seed: int = 0):
+    """
+    Subclass of a real provider with the network call replaced. Provider name,
+    voice and concurrency limit are inherited, so caching and limiting behave as
+    in production.
+    """
+    from ...services.tts import TTSService
+    dice = _Dice(seed)
+
+    class FakeTTS(real_class):
+        def __init__(self):
+            TTSService.__init__(self)
+
+        def health_check(self):
+            pass
+
+        def _synthesize(self, text: str) -> bytes:
+            dice.sleep(latency)
+            return _audio(text)
+
+        def _stream(self, text: str):
+            yield self._synthesize(text)
+
+    FakeTTS.__name__ = f"Fake{real_class.__name__}"
+    return FakeTTS
+
+# --- DuckDuckGo ---
+
+def fake_duckduckgo(latency: Latency, seed: int = 0) -> types.ModuleType:
+    dice = _Dice(seed)
+
+    class DDGS:
+        def __enter__(self):
+            return self
+
+        def __exit__(self, *exc):
+            return False
+
+        def text(self, query: str, max_results: int = 5):
+            dice.sleep(latency)
+            return [{"title": f"{query} - result {i + 1}", "href": f"https://example.com/{i}",
+                     "body": " ".join(dice.sample(OPENERS, 3))} for i in range(max_results)]
+
+    module = types.ModuleType("duckduckgo_search")
+    module.DDGS = DDGS
+    return module
+
+# --- S3 ---
+
+class FakeS3:
+    """
+    In-memory object store covering the boto3 calls StorageService makes.
+    """
+    def __init__(self, latency: Latency, seed: int = 0):
+        self.latency = latency
+        self.dice = _Dice(seed)
+        self.objects = {}
+        self._lock = threading.Lock()
+
+    def head_object(self, Bucket, Key):
+        from botocore.exceptions import ClientError
+        self.dice.sleep(self.latency)
+        with self._lock:
+            if (Bucket, Key) not in self.objects:
+                raise ClientError({"Error": {"Code": "404", "Message": "Not Found"}}, "HeadObject")
+            return {"ContentLength": len(self.objects[(Bucket, Key)])}
+
+    def upload_file(self, Filename, Bucket, Key, ExtraArgs=None):
+        with open(Filename, "rb") as f:
+            body = f.read()
+        self.dice.sleep(self.latency)
+        with self._lock:
+            self.objects[(Bucket, Key)] = body
+
+    def download_fileobj(self, Bucket, Key, Fileobj):
+        self.dice.sleep(self.latency)
+        with self._lock:
+            body = self.objects[(Bucket, Key)]
+        Fileobj.write(body)
+
+    def generate_presigned_url(self, ClientMethod, Params, ExpiresIn=3600):
+        return f"http://s3.fake/{Params['Bucket']}/{Params['Key']}?X-Amz-Expires={ExpiresIn}"
+
+# --- LeetCode CSV ---
+
+LEETCODE_CSV = (
+    "id,title,url,difficulty\n"
+    "1,Two Sum,https://leetcode.com/problems/two-sum,Easy\n"
+    "20,Valid Parentheses,https://leetcode.com/problems/valid-parentheses,Easy\n"
+    "70,Climbing Stairs,https://leetcode.com/problems/climbing-stairs,Easy\n"
+    "146,LRU Cache,https://leetcode.com/problems/lru-cache,Medium\n"
+)
+
+class FakeRequests:
+    """
+    Replaces the requests module inside services.leetcode; every company gets
+    the same CSV.
+    """
+    def __init__(self, latency: Latency, seed: int = 0):
+        self.latency = latency
+        self.dice = _Dice(seed)
+
+    def get(self, url, **kwargs):
+        self.dice.sleep(self.latency)
+        return types.SimpleNamespace(status_code=200, content=LEETCODE_CSV.encode())
+
+# --- Resumes ---
+
+def resume_docx(index: int) -> bytes:
+    # Distinct bytes per index so content-addressed storage and parsing aren't all cache hits
+    from docx import Document
+    document = Document()
+    document.add_heading(f"Candidate {index}", 0)
+    for heading, lines in (("Experience", 6), ("Skills", 3), ("Education", 2), ("Projects", 4)):
+        document.add_heading(heading, 1)
+        for line in range(lines):
+            document.add_paragraph(f"{heading} item {line} for candidate {index}: " + " ".join(TOPICS[line:line + 5]))
+    buffer = io.BytesIO()
+    document.save(buffer)
+    return buffer.getvalue()
+
+class Fakes:
+    """
+    What install() patched in; shutdown() stops the stand-in Celery worker.
+    """
+    def __init__(self, gemini: FakeGemini, s3: FakeS3, worker: ThreadPoolExecutor):
+        self.gemini = gemini
+        self.s3 = s3
+        self.worker = worker
+
+    def shutdown(self):
+        self.worker.shutdown(wait=True)
+
+def install(seed: int = 0, llm_latency: Latency = Latency(800, 0.5), llm_chunk_ms: float = 30,
+            llm_rate_limit: float = 0.0, tts_latency: Latency = Latency(250), search_latency: Latency = Latency(400),
+            storage_latency: Latency = Latency(30), csv_latency: Latency = Latency(150), workers: int = 4) -> Fakes:
+    """
+    Patches the stand-ins into the backend modules. Call after DATABASE_URL and
+    friends are set and before the app starts. Celery tasks run on a local
+    thread pool of `workers` threads, as a worker process would run them.
+    """
+    sys.modules["duckduckgo_search"] = fake_duckduckgo(search_latency, seed + 1)
+
+    from ... import tasks
+    from ...services import ai, leetcode, storage, tts
+
+    gemini = FakeGemini(llm_latency, llm_chunk_ms, llm_rate_limit, seed)
+    ai.client = gemini
+    tasks.client = gemini
+
+    tts.tts_registry.PROVIDERS = {
+        tier: fake_tts(real_class, tts_latency, seed + 2 + i)
+        for i, (tier, real_class) in enumerate(tts.TTSProviderRegistry.PROVIDERS.items())
+    }
+
+    s3 = FakeS3(storage_latency, seed + 5)
+    storage.storage_service.s3_client = s3
+    storage.storage_service.s3_bucket = "loadtest"
+    storage.storage_service.endpoint_url = "http://s3.fake"
+
+    leetcode.requests = FakeRequests(csv_latency, seed + 6)
+
+    worker = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="fake-celery")
+    for task in (tasks.perform_interview_research, tasks.perform_context_research, tasks.parse_uploaded_resume):
+        task.delay = partial(worker.submit, task)
+
+    return Fakes(gemini, s3, worker)
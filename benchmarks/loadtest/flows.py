@@ -0,0 +1,180 @@
+"""
+One simulated candidate going through a full interview, and the latency
+recorder the flows report into.
+"""
+import time
+import asyncio
+from collections import defaultdict
+from typing import Dict, List
+
+import httpx
+
+SOLUTIONS = {
+    "two sum": """
+def twoSum(nums, target):
+    seen = {}
+    for i, n in enumerate(nums):
+        if target - n in seen:
+            return [seen[target - n], i]
+        seen[n] = i
+""",
+    "valid parentheses": """
+def isValid(s):
+    pairs = {")": "(", "]": "[", "}": "{"}
+    stack = []
+    for c in s:
+        if c in pairs:
+            if not stack or stack.pop() != pairs[c]:
+                return False
+        else:
+            stack.append(c)
+    return not stack
+""",
+    "climbing stairs": """
+def climbStairs(n):
+    a, b = 1, 1
+    for _ in range(n):
+        a, b = b, a + b
+    return a
+""",
+}
+
+ANSWERS = [
+    "I led the migration of our billing service to an event-driven design and cut p99 latency by half.",
+    "We added a read-through cache in front of the catalogue and invalidated it on writes.",
+    "I would start by measuring, then look at the slowest queries and the N+1 patterns.",
+    "The trade-off was consistency versus latency, so we picked bounded staleness for reads.",
+    "I paired with the on-call engineer, wrote the postmortem and added alerts on queue depth.",
+]
+
+def percentile(sorted_values: List[float], q: float) -> float:
+    # Nearest-rank percentile
+    if not sorted_values:
+        return 0.0
+    index = max(0, min(len(sorted_values) - 1, int(round(q / 100 * len(sorted_values) + 0.5)) - 1))
+    return sorted_values[index]
+
+class Recorder:
+    """
+    Latency samples per endpoint (method + route template) and error counts.
+    """
+    def __init__(self):
+        self.samples: Dict[str, List[float]] = defaultdict(list)
+        self.errors: Dict[str, int] = defaultdict(int)
+
+    def record(self, endpoint: str, seconds: float, ok: bool):
+        self.samples[endpoint].append(seconds)
+        if not ok:
+            self.errors[endpoint] += 1
+
+    @property
+    def requests(self) -> int:
+        return sum(len(samples) for samples in self.samples.values())
+
+    def summary(self, elapsed: float) -> List[Dict]:
+        rows = []
+        for endpoint, samples in sorted(self.samples.items(), key=lambda item: -sum(item[1])):
+            ordered = sorted(samples)
+            rows.append({
+                "endpoint": endpoint,
+                "count": len(ordered),
+                "errors": self.errors[endpoint],
+                "p50_ms": percentile(ordered, 50) * 1000,
+                "p95_ms": percentile(ordered, 95) * 1000,
+                "p99_ms": percentile(ordered, 99) * 1000,
+                "max_ms": ordered[-1] * 1000,
+                "rps": len(ordered) / elapsed if elapsed else 0.0,
+            })
+        return rows
+
+class FlowError(Exception):
+    pass
+
+class InterviewFlow:
+    """
+    signup -> create session -> upload resume -> update -> research (polled) ->
+    start -> per step: N interacts, voice turn, replayed TTS, code runs on the
+    technical step, transcript -> complete -> close.
+    """
+    def __init__(self, http: httpx.AsyncClient, recorder: Recorder, index: int, turns: int, steps: int,
+                 voice: bool, resume: bytes, research_timeout: float, run_id: str):
+        self.http = http
+        self.recorder = recorder
+        self.index = index
+        self.turns = turns
+        self.steps = steps
+        self.voice = voice
+        self.resume = resume
+        self.research_timeout = research_timeout
+        self.run_id = run_id
+        self.headers = {}
+
+    async def call(self, method: str, endpoint: str, url: str, **kwargs) -> httpx.Response:
+        started = time.perf_counter()
+        try:
+            # Reads the whole body, so streamed audio is timed to its last byte
+            response = await self.http.request(method, url, headers=self.headers, **kwargs)
+        except Exception:
+            self.recorder.record(f"{method} {endpoint}", time.perf_counter() - started, ok=False)
+            raise
+        ok = response.status_code < 400
+        self.recorder.record(f"{method} {endpoint}", time.perf_counter() - started, ok=ok)
+        if not ok:
+            raise FlowError(f"{method} {url} -> {response.status_code}: {response.text[:200]}")
+        return response
+
+    async def run(self):
+        email = f"loadtest-{self.run_id}-{self.index}@example.com"
+        token = (await self.call("POST", "/auth/signup", "/auth/signup",
+                                 json={"email": email, "password": "load-test-password"})).json()["access_token"]
+        self.headers = {"Authorization": f"Bearer {token}"}
+
+        session_id = (await self.call("POST", "/sessions", "/sessions")).json()["id"]
+        base = f"/sessions/{session_id}"
+        await self.call("POST", "/sessions/{session_id}/resume", f"{base}/resume",
+                        files={"resume": (f"resume-{self.index}.docx", self.resume,
+                                          "application/vnd.openxmlformats-officedocument.wordprocessingml.document")})
+        await self.call("PATCH", "/sessions/{session_id}", base, json={
+            "company_name": "Google", "job_title": "Backend Engineer", "role_level": "senior", "duration_minutes": 60,
+        })
+
+        await self.call("POST", "/sessions/{session_id}/research", f"{base}/research")
+        deadline = time.monotonic() + self.research_timeout
+        while True:
+            status = (await self.call("GET", "/sessions/{session_id}/research/status", f"{base}/research/status")).json()
+            if status.get("status") in ("completed", "failed") or time.monotonic() > deadline:
+                break
+            await asyncio.sleep(0.5)
+
+        await self.call("POST", "/sessions/{session_id}/start", f"{base}/start")
+        await self.call("GET", "/sessions", "/sessions")
+        steps = (await self.call("GET", "/sessions/{session_id}/steps", f"{base}/steps")).json()
+
+        for number, step in enumerate(steps[:self.steps]):
+            step_base = f"{base}/steps/{step['id']}"
+            reply = "Thanks, let's get started."
+            for turn in range(self.turns):
+                answer = ANSWERS[(self.index + number + turn) % len(ANSWERS)]
+                reply = (await self.call("POST", "/sessions/{session_id}/steps/{step_id}/interact",
+                                         f"{step_base}/interact", json={"message": answer})).json()["response"]
+            if self.voice:
+                await self.call("POST", "/sessions/{session_id}/steps/{step_id}/voice", f"{step_base}/voice",
+                                json={"message": ANSWERS[(self.index + number) % len(ANSWERS)]})
+                # The client replays the last text reply as audio
+                await self.call("GET", "/speech/generate", "/speech/generate", params={"text": reply[:500], "chunked": True})
+            if step["step_type"] == "technical":
+                await self.run_code(base, step_base)
+            await self.call("GET", "/sessions/{session_id}/steps/{step_id}/messages", f"{step_base}/messages")
+            await self.call("POST", "/sessions/{session_id}/steps/{step_id}/complete", f"{step_base}/complete")
+
+        await self.call("GET", "/sessions/{session_id}/details", f"{base}/details")
+        await self.call("POST", "/sessions/{session_id}/close", f"{base}/close")
+
+    async def run_code(self, base: str, step_base: str):
+        steps = (await self.call("GET", "/sessions/{session_id}/steps", f"{base}/steps", params={"fields": "id,problem"})).json()
+        problem = next((s["problem"] for s in steps if f"/steps/{s['id']}" in step_base), None) or {}
+        # Per-candidate comment so runs aren't all result-cache hits
+        code = SOLUTIONS.get(problem.get("title", "").lower(), SOLUTIONS["two sum"]) + f"# candidate {self.index}\n"
+        await self.call("POST", "/code/run", "/code/run", json={"code": code + "print('ok')\n"})
+        if problem.get("test_cases"):
+            await self.call("POST", "/sessions/{session_id}/steps/{step_id}/tests", f"{step_base}/tests", json={"code": code})
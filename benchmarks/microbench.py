@@ -0,0 +1,200 @@
+"""
+Microbenchmarks for the per-turn CPU work: context/history/roadmap handling in
+SessionService, strategy prompt assembly, PDF parsing, scraper text cleanup and
+JWT encode/decode. Inputs come in typical and worst-case sizes (benchmarks.fixtures).
+
+    python -m backend.benchmarks.microbench run                        # print timings
+    python -m backend.benchmarks.microbench run -k prompt --output results.json
+    python -m backend.benchmarks.microbench run --save-baseline        # overwrite the stored baseline
+    python -m backend.benchmarks.microbench compare --threshold 0.25   # run, then compare to the baseline
+    python -m backend.benchmarks.microbench compare --results results.json
+
+Timings are the best of --repeat runs (timeit autorange loops each), per call.
+Baselines are only comparable on the machine and Python that produced them;
+refresh the stored one with --save-baseline when either changes.
+compare exits non-zero when a benchmark is slower than baseline * (1 + threshold).
+"""
+import io
+import os
+import sys
+import json
+import uuid
+import random
+import timeit
+import logging
+import argparse
+import platform
+import statistics
+from datetime import datetime, timedelta
+from functools import partial
+from typing import Callable, Dict
+
+from . import fixtures
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baselines", "microbench.json")
+
+# (label, transcript messages, context sources, PDF pages, HTML KiB, reply chars)
+SIZES = [
+    ("typical", 20, 5, 2, 64, 600),
+    ("worst", 400, 50, 20, 1024, 8000),
+]
+
+def _fixture_db():
+    from sqlalchemy.pool import StaticPool
+    from sqlmodel import SQLModel, Session, create_engine
+
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    SQLModel.metadata.create_all(engine)
+    return Session(engine, expire_on_commit=False)
+
+def build_cases() -> Dict[str, Callable[[], object]]:
+    from ..core import models
+    from ..core.security import create_access_token, decode_access_token
+    from ..repositories.session import SessionRepository
+    from ..services.ai import ai_service
+    from ..services.parser import parser_service
+    from ..services.scraper import scraper_service
+    from ..services.session import SessionService
+
+    db = _fixture_db()
+    service = SessionService(SessionRepository(db))
+    cases = {}
+
+    for label, messages, sources, pages, html_kib, reply_chars in SIZES:
+        user = models.User(email=f"{label}@example.com", auth_provider=models.AuthProvider.EMAIL)
+        resume_text = parser_service._parse_pdf(io.BytesIO(fixtures.pdf_document(pages)))
+        sections = parser_service.segment_resume(resume_text)
+        db.add(user)
+        db.add(models.Resume(user_id=user.id, file_path=f"{label}.pdf", content_hash=uuid.uuid4().hex,
+                             parsed_content=resume_text, sections=sections, digest=parser_service.build_digest(sections)))
+        db.commit()
+
+        session = models.Session(user_id=user.id, job_title="Backend Engineer", company_name="Acme",
+                                 jd_content=fixtures.paragraph(random.Random(1), 3000))
+        session.context_data = [models.ContextData(source=source, content=content)
+                                for source, content in fixtures.context_sources(sources)]
+        log = fixtures.transcript(messages)
+        history = service._build_history(log)
+        context = service._build_context_string(session, "technical")
+        step = models.SessionStep(session_id=session.id, step_type=models.StepType.TECHNICAL)
+        problem = {"title": "Two Sum", "difficulty": "Easy", "url": "https://leetcode.com/problems/two-sum"}
+        code_results = {"tests": {"passed": 3, "total": 4, "error": None,
+                                  "cases": [{"index": i, "passed": i != 2, "error": None} for i in range(4)]}}
+        reply = fixtures.assistant_reply(reply_chars)
+        pdf = fixtures.pdf_document(pages)
+        html = fixtures.html_page(html_kib)
+
+        cases[f"session.build_context[{sources} sources]"] = partial(service._build_context_string, session, "technical")
+        cases[f"session.build_history[{messages} messages]"] = partial(service._build_history, log)
+        cases[f"session.process_roadmap[{reply_chars} chars]"] = partial(service._process_roadmap, reply, step)
+        for name, strategy in ai_service.strategies.items():
+            extra = {"problem": problem} if name == "technical" else {}
+            # generate_response only sends the last 10 messages; evaluations get all of them
+            cases[f"strategy.{name}.get_prompt[{label}]"] = partial(strategy.get_prompt, context, history[-10:],
+                                                                   log[-1]["content"], "senior", **extra)
+            extra = {"code_results": code_results} if name == "technical" else {}
+            cases[f"strategy.{name}.evaluate[{messages} messages]"] = partial(strategy.evaluate, context, history, **extra)
+        cases[f"parser.parse_pdf[{pages} pages]"] = lambda pdf=pdf: parser_service._parse_pdf(io.BytesIO(pdf))
+        cases[f"parser.segment_resume[{pages} pages]"] = partial(parser_service.segment_resume, resume_text)
+        cases[f"scraper.extract_text[{html_kib} KiB]"] = partial(scraper_service.extract_text, html)
+
+    claims = {"sub": str(uuid.uuid4()), "email": "candidate@example.com", "tier": "free"}
+    token = create_access_token(claims, timedelta(days=1))
+    cases["security.create_access_token"] = partial(create_access_token, claims, timedelta(minutes=30))
+    cases["security.decode_access_token"] = partial(decode_access_token, token)
+    return cases
+
+def measure(fn: Callable[[], object], repeat: int) -> Dict:
+    timer = timeit.Timer(fn)
+    loops, _ = timer.autorange()
+    runs = [elapsed / loops for elapsed in timer.repeat(repeat, loops)]
+    return {"best": min(runs), "median": statistics.median(runs), "loops": loops}
+
+def _format(seconds: float) -> str:
+    for unit, scale in (("s", 1), ("ms", 1e-3), ("us", 1e-6)):
+        if seconds >= scale:
+            return f"{seconds / scale:.2f} {unit}"
+    return f"{seconds / 1e-9:.0f} ns"
+
+def environment() -> Dict:
+    return {"python": platform.python_version(), "implementation": platform.python_implementation(),
+            "machine": platform.machine(), "platform": platform.platform(), "cpus": os.cpu_count()}
+
+def run(pattern: str, repeat: int) -> Dict:
+    cases = {name: fn for name, fn in build_cases().items() if pattern in name}
+    results = {}
+    for name, fn in cases.items():
+        results[name] = measure(fn, repeat)
+        print(f"{name:<52} {_format(results[name]['best']):>11} best {_format(results[name]['median']):>11} median")
+    return {"environment": environment(), "created_at": datetime.utcnow().isoformat(timespec="seconds"), "results": results}
+
+def compare(current: Dict, baseline: Dict, threshold: float) -> int:
+    """
+    Prints current vs baseline per benchmark; returns the number of regressions.
+    """
+    if baseline["environment"] != current["environment"]:
+        print(f"warning: baseline is from a different environment ({baseline['environment']}), "
+              f"ratios may reflect the machine rather than the code", file=sys.stderr)
+
+    regressions = 0
+    print(f"\n{'benchmark':<52} {'baseline':>11} {'current':>11} {'change':>8}")
+    for name, result in current["results"].items():
+        before = baseline["results"].get(name)
+        if before is None:
+            print(f"{name:<52} {'-':>11} {_format(result['best']):>11} {'new':>8}")
+            continue
+        ratio = result["best"] / before["best"]
+        flag = ""
+        if ratio > 1 + threshold:
+            flag = "  REGRESSION"
+            regressions += 1
+        elif ratio < 1 - threshold:
+            flag = "  faster"
+        print(f"{name:<52} {_format(before['best']):>11} {_format(result['best']):>11} {ratio - 1:>+8.0%}{flag}")
+    missing = sorted(set(baseline["results"]) - set(current["results"]))
+    if missing:
+        print(f"not run: {', '.join(missing)}")
+    print(f"\n{regressions} regression(s) beyond {threshold:.0%}")
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest="command", required=True)
+    run_parser = commands.add_parser("run", help="run the benchmarks and print timings")
+    run_parser.add_argument("--output", help="write the results to this file")
+    run_parser.add_argument("--save-baseline", action="store_true", help=f"write the results to {BASELINE_PATH}")
+    compare_parser = commands.add_parser("compare", help="compare against the baseline; non-zero exit on regressions")
+    compare_parser.add_argument("--baseline", default=BASELINE_PATH)
+    compare_parser.add_argument("--results", help="compare this results file instead of running now")
+    compare_parser.add_argument("--threshold", type=float, default=0.25, help="allowed slowdown, as a fraction")
+    for sub in (run_parser, compare_parser):
+        sub.add_argument("-k", dest="pattern", default="", help="only benchmarks whose name contains this")
+        sub.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    # The app's modules create their engine at import time; keep it off any real database
+    os.environ["DATABASE_URL"] = "sqlite://"
+    logging.disable(logging.WARNING)
+
+    if args.command == "run":
+        current = run(args.pattern, args.repeat)
+        for path in filter(None, [args.output, BASELINE_PATH if args.save_baseline else None]):
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+            with open(path, "w") as f:
+                json.dump(current, f, indent=2, sort_keys=True)
+                f.write("\n")
+        return
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    baseline["results"] = {name: r for name, r in baseline["results"].items() if args.pattern in name}
+    if args.results:
+        with open(args.results) as f:
+            current = json.load(f)
+        current["results"] = {name: r for name, r in current["results"].items() if args.pattern in name}
+    else:
+        current = run(args.pattern, args.repeat)
+    sys.exit(1 if compare(current, baseline, args.threshold) else 0)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,163 @@
+"""
+Seeds a synthetic dataset and checks that the hot queries are served by indexes.
+
+    python -m backend.benchmarks.query_plans                      # throwaway SQLite file
+    python -m backend.benchmarks.query_plans --database-url postgresql://.../scratch
+
+Writes data: only point --database-url at a scratch database.
+Exits non-zero if any query falls back to a full scan or an explicit sort.
+"""
+import os
+import sys
+import json
+import time
+import uuid
+import random
+import argparse
+import tempfile
+import statistics
+from datetime import datetime, timedelta
+
+from sqlalchemy import insert, select
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.expression import ClauseElement, Executable
+
+class Explain(Executable, ClauseElement):
+    inherit_cache = False
+
+    def __init__(self, statement):
+        self.statement = statement
+
+@compiles(Explain, "sqlite")
+def _explain_sqlite(element, compiler, **kw):
+    return "EXPLAIN QUERY PLAN " + compiler.process(element.statement, **kw)
+
+@compiles(Explain, "postgresql")
+def _explain_postgresql(element, compiler, **kw):
+    return "EXPLAIN (FORMAT JSON) " + compiler.process(element.statement, **kw)
+
+INDEX_NODES = {"Index Scan", "Index Only Scan", "Bitmap Index Scan"}
+
+def seed(connection, models, users: int, rng: random.Random):
+    now = datetime.utcnow()
+    user_rows, resume_rows, session_rows, step_rows, context_rows = [], [], [], [], []
+    step_types = list(models.StepType)
+    for u in range(users):
+        user_id = uuid.uuid4()
+        user_rows.append({"id": user_id, "email": f"user{u}@example.com", "auth_provider": models.AuthProvider.EMAIL,
+                          "subscription_tier": "free", "created_at": now})
+        for r in range(2):
+            resume_rows.append({"id": uuid.uuid4(), "user_id": user_id, "file_path": f"r/{u}/{r}.pdf",
+                                "content_hash": uuid.uuid4().hex, "parsed_content": "resume text" if r else "",
+                                "created_at": now - timedelta(days=rng.randint(0, 365))})
+        for _ in range(10):
+            session_id = uuid.uuid4()
+            session_rows.append({"id": session_id, "user_id": user_id, "job_title": "Software Engineer",
+                                 "company_name": "Acme", "jd_content": "JD", "role_level": "mid", "duration_minutes": 15,
+                                 "status": models.SessionStatus.COMPLETED, "research_status": "completed",
+                                 "current_step": 0, "created_at": now - timedelta(minutes=rng.randint(0, 10 ** 6))})
+            for step_type in step_types:
+                step_rows.append({"id": uuid.uuid4(), "session_id": session_id, "step_type": step_type,
+                                  "status": rng.choice(list(models.StepStatus)), "interaction_log": []})
+            for c in range(2):
+                context_rows.append({"id": uuid.uuid4(), "session_id": session_id, "source": f"source {c}", "content": "context"})
+
+    for model, rows in [(models.User, user_rows), (models.Resume, resume_rows), (models.Session, session_rows),
+                        (models.SessionStep, step_rows), (models.ContextData, context_rows)]:
+        for start in range(0, len(rows), 5000):
+            connection.execute(insert(model.__table__), rows[start:start + 5000])
+    return user_rows, session_rows
+
+def hot_queries(models, user_id, session_id, content_hash, cursor):
+    from ..repositories.session import _summary_statement
+
+    Session, SessionStep, Resume, ContextData = models.Session, models.SessionStep, models.Resume, models.ContextData
+    return {
+        "sessions for user, newest first": select(Session).where(Session.user_id == user_id).order_by(Session.created_at.desc()),
+        "session list page (first)": _summary_statement(user_id, 21, None),
+        "session list page (keyset)": _summary_statement(user_id, 21, cursor),
+        "steps of a session": select(SessionStep).where(SessionStep.session_id == session_id),
+        "in-progress step of a session": select(SessionStep).where(
+            SessionStep.session_id == session_id, SessionStep.status == models.StepStatus.IN_PROGRESS),
+        "latest parsed resume for user": select(Resume).where(
+            Resume.user_id == user_id, Resume.parsed_content != "").order_by(Resume.created_at.desc()).limit(1),
+        "resume by content hash": select(Resume).where(Resume.content_hash == content_hash),
+        "context data of a session": select(ContextData).where(ContextData.session_id == session_id),
+    }
+
+def check_plan(connection, statement):
+    """
+    Returns (uses_index, plan_summary).
+    """
+    # Raw rows: the wrapped SELECT's result types don't apply to EXPLAIN output
+    rows = connection.execute(Explain(statement)).cursor.fetchall()
+    if connection.dialect.name == "sqlite":
+        details = [row[-1] for row in rows]
+        full_scan = any(d.startswith("SCAN") and "USING" not in d for d in details)
+        extra_sort = any("TEMP B-TREE" in d for d in details)
+        return not full_scan and not extra_sort, "; ".join(details)
+
+    plan = rows[0][0]
+    plan = json.loads(plan) if isinstance(plan, str) else plan
+    nodes = []
+    stack = [plan[0]["Plan"]]
+    while stack:
+        node = stack.pop()
+        nodes.append(node["Node Type"])
+        stack.extend(node.get("Plans", []))
+    uses_index = bool(INDEX_NODES & set(nodes)) and "Seq Scan" not in nodes and "Sort" not in nodes
+    return uses_index, " > ".join(nodes)
+
+def time_query(connection, statement, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        connection.execute(statement).all()
+        timings.append(time.perf_counter() - started)
+    return statistics.median(timings)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", help="scratch database (default: a temporary SQLite file)")
+    parser.add_argument("--users", type=int, default=2000, help="users to seed (10 sessions, 4 steps each)")
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    if args.database_url:
+        os.environ["DATABASE_URL"] = args.database_url
+    else:
+        os.environ["DATABASE_URL"] = f"sqlite:///{tempfile.mkdtemp()}/query_plans.db"
+    os.environ["DB_ECHO"] = "false"
+
+    # Imported after DATABASE_URL is set; the engine is created at import time
+    from ..core import models
+    from ..core.database import engine, init_db
+
+    init_db()
+    rng = random.Random(0)
+    with engine.begin() as connection:
+        started = time.perf_counter()
+        users, sessions = seed(connection, models, args.users, rng)
+        print(f"Seeded {len(users)} users / {len(sessions)} sessions in {time.perf_counter() - started:.1f}s")
+
+    with engine.begin() as connection:
+        # Fresh statistics, as the planner would have on a long-lived database
+        connection.exec_driver_sql("ANALYZE")
+
+        user_id = rng.choice(users)["id"]
+        session_id = rng.choice(sessions)["id"]
+        content_hash = connection.execute(select(models.Resume.content_hash).limit(1)).scalar()
+        middle = sorted((s for s in sessions if s["user_id"] == user_id), key=lambda s: s["created_at"])[5]
+        cursor = (middle["created_at"], middle["id"])
+
+        failures = 0
+        for name, statement in hot_queries(models, user_id, session_id, content_hash, cursor).items():
+            uses_index, summary = check_plan(connection, statement)
+            median = time_query(connection, statement, args.repeat)
+            failures += not uses_index
+            print(f"{'OK  ' if uses_index else 'FAIL'} {name:<34} {median * 1000:8.3f} ms  {summary}")
+
+    sys.exit(1 if failures else 0)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,168 @@
+import os
+import json
+import time
+import uuid
+import threading
+from collections import OrderedDict
+from typing import Any, Optional
+from .logger import get_logger
+
+logger = get_logger(__name__)
+
+# Optional shared tier; without it every cache is process-local
+CACHE_REDIS_URL = os.getenv("CACHE_REDIS_URL")
+CACHE_REDIS_TIMEOUT = float(os.getenv("CACHE_REDIS_TIMEOUT", 0.2))
+
+_MISSING = object()
+
+class LRUCache:
+    """
+    Thread-safe bounded LRU with an optional per-entry TTL (seconds).
+    """
+    def __init__(self, maxsize: int = 1024, ttl: Optional[float] = None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: "OrderedDict[Any, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._data.get(key, _MISSING)
+            if entry is _MISSING:
+                return default
+            value, expires_at = entry
+            if expires_at is not None and expires_at <= time.monotonic():
+                del self._data[key]
+                return default
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl: Optional[float] = None):
+        ttl = self.ttl if ttl is None else ttl
+        expires_at = time.monotonic() + ttl if ttl else None
+        with self._lock:
+            self._data[key] = (value, expires_at)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+class TieredCache:
+    """
+    In-process LRU in front of an optional Redis tier shared by all API processes.
+    Values must be JSON-serializable. Redis errors are logged and treated as misses,
+    so a cache outage never fails a request.
+    """
+    def __init__(self, namespace: str, maxsize: int = 1024, ttl: Optional[float] = None, redis_url: Optional[str] = CACHE_REDIS_URL):
+        self.namespace = namespace
+        self.ttl = ttl
+        self.local = LRUCache(maxsize=maxsize, ttl=ttl)
+        self._redis = None
+        if redis_url:
+            try:
+                import redis
+                self._redis = redis.Redis.from_url(
+                    redis_url, socket_timeout=CACHE_REDIS_TIMEOUT, socket_connect_timeout=CACHE_REDIS_TIMEOUT
+                )
+            except Exception as e:
+                logger.warning(f"Redis cache tier disabled for '{namespace}': {e}")
+
+    def get(self, key: str, default=None):
+        value = self.local.get(key, _MISSING)
+        if value is not _MISSING:
+            return value
+        if self._redis is None:
+            return default
+        try:
+            raw = self._redis.get(self._redis_key(key))
+        except Exception as e:
+            logger.warning(f"Redis cache get failed for '{self.namespace}': {e}")
+            return default
+        if raw is None:
+            return default
+        value = json.loads(raw)
+        self.local.set(key, value)
+        return value
+
+    def set(self, key: str, value, ttl: Optional[float] = None):
+        self.local.set(key, value, ttl)
+        if self._redis is None:
+            return
+        ttl = self.ttl if ttl is None else ttl
+        try:
+            self._redis.set(self._redis_key(key), json.dumps(value), ex=int(ttl) if ttl else None)
+        except Exception as e:
+            logger.warning(f"Redis cache set failed for '{self.namespace}': {e}")
+
+    def delete(self, key: str):
+        self.local.delete(key)
+        if self._redis is None:
+            return
+        try:
+            self._redis.delete(self._redis_key(key))
+        except Exception as e:
+            logger.warning(f"Redis cache delete failed for '{self.namespace}': {e}")
+
+    def _redis_key(self, key: str) -> str:
+        return f"{self.namespace}:{key}"
+
+class VersionedCache:
+    """
+    Read-through cache for several views of one entity (e.g. a session and its
+    steps). View keys embed the entity's current version token, which lives in
+    Redis so every API process and worker sees the same one; invalidate() swaps
+    the token and old views simply age out. Without Redis there's no shared
+    version, so nothing is cached.
+    """
+    def __init__(self, namespace: str, maxsize: int = 1024, ttl: Optional[float] = None,
+                 version_ttl: int = 30 * 86400, redis_url: Optional[str] = CACHE_REDIS_URL):
+        self.namespace = namespace
+        self.version_ttl = version_ttl
+        self.views = TieredCache(namespace, maxsize=maxsize, ttl=ttl, redis_url=redis_url)
+
+    @property
+    def enabled(self) -> bool:
+        return self.views._redis is not None
+
+    def version(self, entity_id: str) -> Optional[str]:
+        """
+        Current version token ("0" until the first invalidation), or None if Redis
+        can't be reached (callers then bypass the cache).
+        """
+        if not self.enabled:
+            return None
+        try:
+            token = self.views._redis.get(self._version_key(entity_id))
+        except Exception as e:
+            logger.warning(f"Redis version read failed for '{self.namespace}': {e}")
+            return None
+        return token.decode() if token else "0"
+
+    def get(self, entity_id: str, view: str, version: str):
+        return self.views.get(f"{entity_id}:{version}:{view}")
+
+    def set(self, entity_id: str, view: str, version: str, value):
+        self.views.set(f"{entity_id}:{version}:{view}", value)
+
+    def invalidate(self, entity_id: str):
+        if not self.enabled:
+            return
+        # A fresh random token rather than a counter: if the version key expires,
+        # views cached under an older token can never become current again
+        try:
+            self.views._redis.set(self._version_key(entity_id), uuid.uuid4().hex[:16], ex=self.version_ttl)
+        except Exception as e:
+            logger.warning(f"Redis invalidation failed for '{self.namespace}' {entity_id}: {e}")
+
+    def _version_key(self, entity_id: str) -> str:
+        return f"{self.namespace}:version:{entity_id}"
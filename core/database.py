@@ -1,19 +1,245 @@
-from sqlmodel import SQLModel, create_engine, Session
-from typing import Generator
+from sqlmodel import create_engine, Session
+from sqlalchemy import event, inspect, text
+from sqlalchemy.exc import DBAPIError
+from fastapi import Request
+from typing import TYPE_CHECKING, AsyncGenerator, Generator, List
 import os
+import time
+import itertools
 from dotenv import load_dotenv
+from .cache import TieredCache
+from .logger import get_logger
+
+if TYPE_CHECKING:
+    from sqlmodel.ext.asyncio.session import AsyncSession
 
 load_dotenv()
 
-DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./database.db")
-if DATABASE_URL and DATABASE_URL.startswith("postgres://"):
-    DATABASE_URL = DATABASE_URL.replace("postgres://", "postgresql://", 1)
+logger = get_logger(__name__)
+
+def _normalize_url(url: str) -> str:
+    if url and url.startswith("postgres://"):
+        return url.replace("postgres://", "postgresql://", 1)
+    return url
+
+DATABASE_URL = _normalize_url(os.getenv("DATABASE_URL", "sqlite:///./database.db"))
+
+# Read replicas (comma-separated); read-only routes go through get_read_session
+DATABASE_REPLICA_URLS = [_normalize_url(url.strip()) for url in os.getenv("DATABASE_REPLICA_URLS", "").split(",") if url.strip()]
+DB_REPLICA_RETRY_SECONDS = float(os.getenv("DB_REPLICA_RETRY_SECONDS", 30)) # a replica that failed sits out this long
+# Read-your-writes: a user's reads stay on the primary this long after their last write.
+# Keep it above the worst replica lag; needs CACHE_REDIS_URL to span processes.
+DB_PRIMARY_PIN_SECONDS = int(os.getenv("DB_PRIMARY_PIN_SECONDS", 5))
+
+# Engine profile; defaults suit one API process behind a managed Postgres.
+# Size the pool so (pool size + overflow) * processes stays under the server's max_connections.
+DB_ECHO = os.getenv("DB_ECHO", "false").lower() == "true"
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", 5))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", 10))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", 30))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", 1800)) # seconds; below typical proxy/LB idle cutoffs
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "true").lower() == "true"
+DB_STATEMENT_TIMEOUT_MS = int(os.getenv("DB_STATEMENT_TIMEOUT_MS", 30000)) # Postgres only; 0 disables
+SQLITE_BUSY_TIMEOUT_MS = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", 5000))
+
+def _is_sqlite(url: str) -> bool:
+    return url.startswith("sqlite")
+
+def _async_url(url: str) -> str:
+    if url.startswith("sqlite:"):
+        return url.replace("sqlite:", "sqlite+aiosqlite:", 1)
+    if url.startswith("postgresql:") or url.startswith("postgresql+psycopg2:"):
+        return "postgresql+asyncpg:" + url.split(":", 1)[1]
+    return url
+
+ASYNC_DATABASE_URL = os.getenv("ASYNC_DATABASE_URL") or _async_url(DATABASE_URL)
+
+def _engine_options(url: str, is_async: bool = False) -> dict:
+    options = {"echo": DB_ECHO, "pool_pre_ping": DB_POOL_PRE_PING}
+    if _is_sqlite(url):
+        # Sessions are handed between threadpool threads; SQLite serializes writes itself
+        options["connect_args"] = {"check_same_thread": False}
+        return options
+
+    options.update(
+        pool_size=DB_POOL_SIZE,
+        max_overflow=DB_MAX_OVERFLOW,
+        pool_timeout=DB_POOL_TIMEOUT,
+        pool_recycle=DB_POOL_RECYCLE,
+    )
+    if DB_STATEMENT_TIMEOUT_MS:
+        if is_async:
+            options["connect_args"] = {"server_settings": {"statement_timeout": str(DB_STATEMENT_TIMEOUT_MS)}}
+        else:
+            options["connect_args"] = {"options": f"-c statement_timeout={DB_STATEMENT_TIMEOUT_MS}"}
+    return options
+
+def _set_sqlite_pragmas(dbapi_connection, connection_record):
+    # WAL lets readers run alongside the single writer; NORMAL sync is safe with WAL
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.execute(f"PRAGMA busy_timeout={SQLITE_BUSY_TIMEOUT_MS}")
+    cursor.execute("PRAGMA temp_store=MEMORY")
+    cursor.close()
+
+def _create_engine(url: str):
+    new_engine = create_engine(url, **_engine_options(url))
+    if _is_sqlite(url):
+        event.listen(new_engine, "connect", _set_sqlite_pragmas)
+    return new_engine
+
+def _create_async_engine(url: str):
+    from sqlalchemy.ext.asyncio import create_async_engine
+    new_engine = create_async_engine(url, **_engine_options(url, is_async=True))
+    if _is_sqlite(url):
+        event.listen(new_engine.sync_engine, "connect", _set_sqlite_pragmas)
+    return new_engine
+
+engine = _create_engine(DATABASE_URL)
+
+# Created on first use so processes that only use the sync engine (Celery) don't need the async drivers
+_async_engine = None
+
+def get_async_engine():
+    global _async_engine
+    if _async_engine is None:
+        _async_engine = _create_async_engine(ASYNC_DATABASE_URL)
+    return _async_engine
+
+class ReplicaSet:
+    """
+    Read replicas picked round-robin. A replica that fails to connect sits out
+    for DB_REPLICA_RETRY_SECONDS; the first pick after that is its health check.
+    """
+    def __init__(self, urls: List[str]):
+        self.urls = urls
+        self.engines = [_create_engine(url) for url in urls]
+        self._async_engines = {}
+        self._down_until = [0.0] * len(urls)
+        self._turn = itertools.count()
+
+    def __bool__(self) -> bool:
+        return bool(self.urls)
 
-engine = create_engine(DATABASE_URL, echo=True)
+    def candidates(self) -> List[int]:
+        """
+        Replica indexes to try, in round-robin order, skipping those sitting out.
+        """
+        now = time.monotonic()
+        start = next(self._turn)
+        order = [(start + i) % len(self.urls) for i in range(len(self.urls))]
+        return [i for i in order if self._down_until[i] <= now]
+
+    def mark_down(self, index: int, error: Exception):
+        logger.warning(f"Read replica {index} unavailable, using others for {DB_REPLICA_RETRY_SECONDS}s: {error}")
+        self._down_until[index] = time.monotonic() + DB_REPLICA_RETRY_SECONDS
+
+    def async_engine(self, index: int):
+        if index not in self._async_engines:
+            self._async_engines[index] = _create_async_engine(_async_url(self.urls[index]))
+        return self._async_engines[index]
+
+    async def dispose(self):
+        for replica_engine in self.engines:
+            replica_engine.dispose()
+        for replica_engine in self._async_engines.values():
+            await replica_engine.dispose()
+
+read_replicas = ReplicaSet(DATABASE_REPLICA_URLS)
+
+# Users (JWT subjects) who wrote recently, see ReadYourWritesMiddleware
+_primary_pins = TieredCache("db:primary-pin", maxsize=8192, ttl=DB_PRIMARY_PIN_SECONDS)
+
+def pin_to_primary(user_id: str):
+    if read_replicas:
+        _primary_pins.set(user_id, True)
+
+def is_pinned_to_primary(user_id: str) -> bool:
+    return bool(read_replicas) and bool(_primary_pins.get(user_id))
+
+MIGRATIONS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "migrations")
+# Schema that create_all produced before migrations existed
+BASELINE_REVISION = "0001"
+MIGRATION_LOCK_KEY = 720340 # arbitrary pg advisory lock id
 
 def init_db():
-    SQLModel.metadata.create_all(engine)
+    """
+    Upgrades the schema to the latest migration. Databases created by the old
+    create_all (tables but no alembic_version) are stamped at the baseline first.
+    """
+    from alembic import command
+    from alembic.config import Config
+
+    config = Config()
+    config.set_main_option("script_location", MIGRATIONS_DIR)
+    with engine.begin() as connection:
+        if connection.dialect.name == "postgresql":
+            # Several API processes start at once; only one migrates, the rest wait
+            connection.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": MIGRATION_LOCK_KEY})
+        config.attributes["connection"] = connection
+
+        tables = inspect(connection).get_table_names()
+        if tables and "alembic_version" not in tables:
+            command.stamp(config, BASELINE_REVISION)
+        command.upgrade(config, "head")
 
 def get_session() -> Generator[Session, None, None]:
-    with Session(engine) as session:
+    # Request-scoped: objects keep their state after commit instead of re-SELECTing on next access
+    with Session(engine, expire_on_commit=False) as session:
+        yield session
+
+async def get_async_session() -> AsyncGenerator["AsyncSession", None]:
+    # Imported here so sync-only processes (the Celery worker) never load the asyncio extension
+    from sqlmodel.ext.asyncio.session import AsyncSession
+    # No expire on commit: attribute access after commit would need implicit (sync) IO
+    async with AsyncSession(get_async_engine(), expire_on_commit=False) as session:
         yield session
+
+# Set in session.info for sessions on a read replica, whose data may lag the primary
+ON_REPLICA = "on_replica"
+
+def _use_replica(request: Request) -> bool:
+    return bool(read_replicas) and not getattr(request.state, "use_primary", False)
+
+def get_read_session(request: Request) -> Generator[Session, None, None]:
+    """
+    Session for read-only routes: the next healthy replica, or the primary when
+    there are none, all are down, or the user wrote within the pin window.
+    """
+    if _use_replica(request):
+        for index in read_replicas.candidates():
+            session = Session(read_replicas.engines[index], expire_on_commit=False, info={ON_REPLICA: True})
+            try:
+                session.connection()
+            except DBAPIError as e:
+                session.close()
+                read_replicas.mark_down(index, e)
+                continue
+            with session:
+                yield session
+            return
+    yield from get_session()
+
+async def get_async_read_session(request: Request) -> AsyncGenerator["AsyncSession", None]:
+    from sqlmodel.ext.asyncio.session import AsyncSession
+    if _use_replica(request):
+        for index in read_replicas.candidates():
+            session = AsyncSession(read_replicas.async_engine(index), expire_on_commit=False, info={ON_REPLICA: True})
+            try:
+                await session.connection()
+            except DBAPIError as e:
+                await session.close()
+                read_replicas.mark_down(index, e)
+                continue
+            async with session:
+                yield session
+            return
+    async for session in get_async_session():
+        yield session
+
+async def dispose_engines():
+    engine.dispose()
+    if _async_engine is not None:
+        await _async_engine.dispose()
+    await read_replicas.dispose()
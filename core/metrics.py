@@ -0,0 +1,108 @@
+import os
+import time
+import asyncio
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Optional, Tuple
+from prometheus_client import CONTENT_TYPE_LATEST, CollectorRegistry, Counter, Histogram, generate_latest, REGISTRY
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+# With several worker processes, set PROMETHEUS_MULTIPROC_DIR (an empty dir per deploy)
+# so /metrics aggregates all of them
+PROMETHEUS_MULTIPROC_DIR = os.getenv("PROMETHEUS_MULTIPROC_DIR")
+
+# LLM calls and voice turns run for seconds; the default buckets stop at 10s
+SLOW_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2, 5, 10, 20, 30, 60, 120)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 89)
+
+HTTP_REQUEST_SECONDS = Histogram(
+    "http_request_duration_seconds", "Request latency by route template",
+    ["method", "route", "status"], buckets=SLOW_BUCKETS,
+)
+DB_QUERIES_PER_REQUEST = Histogram(
+    "db_queries_per_request", "SQL statements executed per request",
+    ["method", "route"], buckets=QUERY_COUNT_BUCKETS,
+)
+DB_SECONDS_PER_REQUEST = Histogram(
+    "db_seconds_per_request", "Time spent in SQL statements per request",
+    ["method", "route"],
+)
+LLM_CALL_SECONDS = Histogram(
+    "llm_call_duration_seconds", "Gemini call latency per attempt (streams: until the last chunk)",
+    ["call_site", "step_type", "outcome"], buckets=SLOW_BUCKETS,
+)
+LLM_FIRST_CHUNK_SECONDS = Histogram(
+    "llm_first_chunk_seconds", "Time to the first streamed chunk",
+    ["call_site", "step_type"], buckets=SLOW_BUCKETS,
+)
+LLM_RETRIES = Counter("llm_retries", "Failed Gemini attempts (each is retried until attempts run out)", ["call_site", "step_type"])
+LLM_TOKENS = Counter("llm_tokens", "Gemini tokens by direction", ["call_site", "step_type", "kind"])
+TTS_SECONDS = Histogram(
+    "tts_synthesis_duration_seconds", "TTS synthesis latency per call",
+    ["provider", "outcome"], buckets=SLOW_BUCKETS,
+)
+SCRAPER_SECONDS = Histogram(
+    "scraper_duration_seconds", "Scraper and search latency",
+    ["operation", "outcome"], buckets=SLOW_BUCKETS,
+)
+CODE_RUN_SECONDS = Histogram(
+    "code_run_duration_seconds", "Sandbox job latency, including the wait for a worker",
+    ["kind", "outcome"], buckets=SLOW_BUCKETS,
+)
+
+@contextmanager
+def observe(histogram: Histogram, **labels):
+    """
+    Times the block into a histogram with an "outcome" label: "ok", "error"
+    when the block raises, or "cancelled" when a consumer stopped a stream
+    early (closed generator, client disconnect).
+    """
+    start = time.perf_counter()
+    outcome = "ok"
+    try:
+        yield
+    except (GeneratorExit, asyncio.CancelledError):
+        outcome = "cancelled"
+        raise
+    except BaseException:
+        outcome = "error"
+        raise
+    finally:
+        histogram.labels(outcome=outcome, **labels).observe(time.perf_counter() - start)
+
+def record_llm_usage(call_site: str, step_type: str, response):
+    usage = getattr(response, "usage_metadata", None)
+    if usage is None:
+        return
+    LLM_TOKENS.labels(call_site, step_type, "prompt").inc(usage.prompt_token_count or 0)
+    LLM_TOKENS.labels(call_site, step_type, "response").inc(usage.candidates_token_count or 0)
+
+# [statement count, seconds] for the current request; set by MetricsMiddleware.
+# Threadpool work copies the context, so the same list is updated from there.
+_request_db_stats: ContextVar[Optional[list]] = ContextVar("request_db_stats", default=None)
+
+def start_request_db_stats() -> list:
+    stats = [0, 0.0]
+    _request_db_stats.set(stats)
+    return stats
+
+# On the Engine class, so the primary, replicas and async engines are all covered
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    context._metrics_started = time.perf_counter()
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = _request_db_stats.get()
+    if stats is not None:
+        stats[0] += 1
+        stats[1] += time.perf_counter() - context._metrics_started
+
+def render_metrics() -> Tuple[bytes, str]:
+    if PROMETHEUS_MULTIPROC_DIR:
+        from prometheus_client import multiprocess
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return generate_latest(registry), CONTENT_TYPE_LATEST
+    return generate_latest(REGISTRY), CONTENT_TYPE_LATEST
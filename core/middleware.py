@@ -0,0 +1,87 @@
+import time
+from typing import Optional
+from jose import JWTError
+from .database import read_replicas, pin_to_primary, is_pinned_to_primary
+from .metrics import HTTP_REQUEST_SECONDS, DB_QUERIES_PER_REQUEST, DB_SECONDS_PER_REQUEST, start_request_db_stats
+from .security import decode_access_token
+
+SAFE_METHODS = {"GET", "HEAD", "OPTIONS"}
+
+def _token_subject(scope) -> Optional[str]:
+    for name, value in scope.get("headers", []):
+        if name == b"authorization":
+            scheme, _, token = value.decode("latin-1").partition(" ")
+            if scheme.lower() != "bearer" or not token:
+                return None
+            try:
+                return str(decode_access_token(token)["sub"])
+            except (JWTError, KeyError):
+                return None
+    return None
+
+class ReadYourWritesMiddleware:
+    """
+    Keeps a user's reads on the primary for DB_PRIMARY_PIN_SECONDS after their
+    writes, so replica lag never hides what they just changed. A write pins the
+    user when it starts and again when it ends (commits can land late, e.g. after
+    an LLM call or a streamed reply); pinned reads set request.state.use_primary,
+    which get_read_session honours.
+    """
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not read_replicas:
+            await self.app(scope, receive, send)
+            return
+
+        user_id = _token_subject(scope)
+        if user_id is None:
+            await self.app(scope, receive, send)
+            return
+
+        if scope["method"] in SAFE_METHODS:
+            if is_pinned_to_primary(user_id):
+                scope.setdefault("state", {})["use_primary"] = True
+            await self.app(scope, receive, send)
+            return
+
+        pin_to_primary(user_id)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            pin_to_primary(user_id)
+
+class MetricsMiddleware:
+    """
+    Per-route latency (until the last body chunk, so streamed audio counts in
+    full) and the number/time of SQL statements each request ran. Routes are
+    labelled by template, e.g. /sessions/{session_id}/steps.
+    """
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        db_stats = start_request_db_stats()
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            route = scope.get("route")
+            # Unmatched paths share one label so scanners can't blow up cardinality
+            route_path = route.path if route is not None else "unmatched"
+            method = scope["method"]
+            HTTP_REQUEST_SECONDS.labels(method, route_path, str(status)).observe(time.perf_counter() - start)
+            DB_QUERIES_PER_REQUEST.labels(method, route_path).observe(db_stats[0])
+            DB_SECONDS_PER_REQUEST.labels(method, route_path).observe(db_stats[1])
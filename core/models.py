@@ -3,7 +3,22 @@ from typing import Optional, List, Dict
 from datetime import datetime
 from enum import Enum
 import uuid
+from sqlalchemy import Index
 from sqlalchemy.dialects.postgresql import JSON
+from sqlalchemy.orm import declared_attr, deferred
+
+# Deferred column group: not selected unless a query undefers it (see the loader
+# profiles in repositories/session.py); otherwise loaded on first attribute access
+HEAVY = "heavy"
+
+def _heavy_columns(*names: str):
+    """
+    __mapper_args__ marking the named (large JSON/text) columns as deferred.
+    """
+    @declared_attr.directive
+    def __mapper_args__(cls):
+        return {"properties": {name: deferred(cls.__table__.c[name], group=HEAVY) for name in names}}
+    return __mapper_args__
 
 class AuthProvider(str, Enum):
     EMAIL = "email"
@@ -38,11 +53,32 @@ class User(SQLModel, table=True):
     resumes: List["Resume"] = Relationship(back_populates="user")
     sessions: List["Session"] = Relationship(back_populates="user")
 
+class UserPrincipal(SQLModel):
+    # Read model for authentication (and its cache); no password hash
+    id: uuid.UUID
+    email: str
+    auth_provider: AuthProvider
+    subscription_tier: str
+    created_at: datetime
+
 class Resume(SQLModel, table=True):
+    # Latest resumes for a user; a B-tree is read backwards for ORDER BY created_at DESC
+    __table_args__ = (Index("ix_resume_user_id_created_at", "user_id", "created_at"),)
+    __mapper_args__ = _heavy_columns("parsed_content", "sections")
+
     id: uuid.UUID = Field(default_factory=uuid.uuid4, primary_key=True)
     user_id: uuid.UUID = Field(foreign_key="user.id")
     file_path: str
+    # SHA-256 of the file bytes; identical uploads share one stored object
+    content_hash: Optional[str] = Field(default=None, index=True)
     parsed_content: str
+    # Post-parse index: section name -> bounded text, plus a compact digest for prompts
+    sections: Optional[Dict] = Field(default=None, sa_type=JSON)
+    digest: Optional[str] = Field(default=None)
+    # Direct uploads are parsed on the worker
+    parse_status: str = Field(default="completed") # processing, completed, failed
+    parse_error: Optional[str] = Field(default=None)
+    created_at: datetime = Field(default_factory=datetime.utcnow)
     
     user: User = Relationship(back_populates="resumes")
 
@@ -55,6 +91,10 @@ class RoleLevel(str, Enum):
     MANAGER = "manager"
 
 class Session(SQLModel, table=True):
+    # A user's sessions, newest first (and keyset pagination on created_at, id)
+    __table_args__ = (Index("ix_session_user_id_created_at", "user_id", "created_at", "id"),)
+    __mapper_args__ = _heavy_columns("jd_content", "research_data")
+
     id: uuid.UUID = Field(default_factory=uuid.uuid4, primary_key=True)
     user_id: uuid.UUID = Field(foreign_key="user.id")
     job_title: str
@@ -70,27 +110,71 @@ class Session(SQLModel, table=True):
 
     current_step: int = Field(default=0)
     created_at: datetime = Field(default_factory=datetime.utcnow)
+    # Bumped by any write to the session, its steps or its context (repositories/session.py); drives ETags
+    updated_at: datetime = Field(default_factory=datetime.utcnow)
     
     user: User = Relationship(back_populates="sessions")
     steps: List["SessionStep"] = Relationship(back_populates="session")
     context_data: List["ContextData"] = Relationship(back_populates="session")
 
+class SessionSummary(SQLModel):
+    # Read model for session lists; no heavy columns
+    id: uuid.UUID
+    company_name: str
+    job_title: str
+    role_level: str
+    status: SessionStatus
+    current_step: int
+    created_at: datetime
+    total_steps: int
+    completed_steps: int
+
 class SessionStep(SQLModel, table=True):
+    # Also serves plain lookups by session_id
+    __table_args__ = (Index("ix_sessionstep_session_id_status", "session_id", "status"),)
+    __mapper_args__ = _heavy_columns("interaction_log", "feedback", "roadmap", "problem", "code_results")
+
     id: uuid.UUID = Field(default_factory=uuid.uuid4, primary_key=True)
     session_id: uuid.UUID = Field(foreign_key="session.id")
     step_type: StepType
     status: StepStatus = Field(default=StepStatus.PENDING)
     interaction_log: List = Field(default=[], sa_type=JSON)
+    # Kept in step with interaction_log on flush, so step lists never load the log
+    message_count: int = Field(default=0)
     feedback: Optional[str] = None
     started_at: Optional[datetime] = Field(default=None)
     title: Optional[str] = Field(default=None)
     roadmap: Optional[List[str]] = Field(default=None, sa_type=JSON)
+    # Technical steps: the problem pinned for the step (with its test suite) and the latest test results
+    problem: Optional[Dict] = Field(default=None, sa_type=JSON)
+    code_results: Optional[Dict] = Field(default=None, sa_type=JSON)
     
     session: Session = Relationship(back_populates="steps")
 
+class StepSummary(SQLModel):
+    # Read model for step lists; the transcript is paged separately
+    id: uuid.UUID
+    session_id: uuid.UUID
+    step_type: StepType
+    status: StepStatus
+    started_at: Optional[datetime] = None
+    title: Optional[str] = None
+    feedback: Optional[str] = None
+    roadmap: Optional[List[str]] = None
+    problem: Optional[Dict] = None
+    code_results: Optional[Dict] = None
+    message_count: int
+
+class StepMessages(SQLModel):
+    messages: List[Dict]
+    message_count: int
+    has_older: bool
+    has_newer: bool
+
 class ContextData(SQLModel, table=True):
+    __mapper_args__ = _heavy_columns("content")
     id: uuid.UUID = Field(default_factory=uuid.uuid4, primary_key=True)
-    session_id: uuid.UUID = Field(foreign_key="session.id")
+    session_id: uuid.UUID = Field(foreign_key="session.id", index=True)
     source: str
     content: str
     
@@ -1,10 +1,11 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, Header
 # Trigger reload
 from contextlib import asynccontextmanager
 from .core.database import init_db
 from .routers import auth, sessions, context, speech, code
 
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
@@ -19,7 +20,24 @@ async def lifespan(app: FastAPI):
     init_db()
     from .services.knowledge_base import seed_knowledge_base
     seed_knowledge_base()
+
+    # Open TTS channels and load credentials before the first request needs them
+    if os.getenv("TTS_WARMUP", "true").lower() == "true":
+        from fastapi.concurrency import run_in_threadpool
+        from .services.tts import tts_registry
+        await run_in_threadpool(tts_registry.warmup)
+
+    # Pre-fork code sandbox workers so the first run doesn't pay for process startup
+    from .services.sandbox import sandbox_pool
+    sandbox_pool.start()
     yield
+    sandbox_pool.shutdown()
+
+    from .core.security import password_hasher
+    password_hasher.shutdown()
+
+    from .core.database import dispose_engines
+    await dispose_engines()
 
 app = FastAPI(title="Recruiting Practice API", lifespan=lifespan)
 
@@ -38,6 +56,20 @@ app.add_middleware(
 from uvicorn.middleware.proxy_headers import ProxyHeadersMiddleware
 app.add_middleware(ProxyHeadersMiddleware, trusted_hosts="*")
 
+# Transcripts and feedback compress well. Starlette's default exclusions (starlette>=1.5)
+# skip audio, which is already compressed, and event streams, which gzip would buffer
+COMPRESS_MIN_BYTES = int(os.getenv("COMPRESS_MIN_BYTES", 1024))
+COMPRESS_LEVEL = int(os.getenv("COMPRESS_LEVEL", 6))
+app.add_middleware(GZipMiddleware, minimum_size=COMPRESS_MIN_BYTES, compresslevel=COMPRESS_LEVEL)
+
+# Routes reads to the primary for users who just wrote (no-op without read replicas)
+from .core.middleware import ReadYourWritesMiddleware
+app.add_middleware(ReadYourWritesMiddleware)
+
+# Outermost, so its timings include the other middleware
+from .core.middleware import MetricsMiddleware
+app.add_middleware(MetricsMiddleware)
+
 app.include_router(auth.router)
 app.include_router(sessions.router)
 app.include_router(context.router)
@@ -47,3 +79,16 @@ app.include_router(code.router)
 @app.get("/")
 def read_root():
     return {"message": "Welcome to the Recruiting Practice API"}
+
+# The app is public, so scrapers send this as a bearer token; without it /metrics is off
+METRICS_TOKEN = os.getenv("METRICS_TOKEN")
+
+@app.get("/metrics", include_in_schema=False)
+def metrics(authorization: str = Header("")):
+    import hmac
+    from fastapi import HTTPException, Response
+    from .core.metrics import render_metrics
+    if not METRICS_TOKEN or not hmac.compare_digest(authorization.encode(), f"Bearer {METRICS_TOKEN}".encode()):
+        raise HTTPException(status_code=404, detail="Not Found")
+    body, content_type = render_metrics()
+    return Response(body, media_type=content_type)
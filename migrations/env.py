@@ -0,0 +1,37 @@
+import os
+import sys
+import importlib
+from logging.config import fileConfig
+from alembic import context
+from sqlmodel import SQLModel
+
+config = context.config
+
+def _load_app():
+    # CLI runs: import the app package (the directory above migrations/) for its models and engine
+    package_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    sys.path.insert(0, os.path.dirname(package_dir))
+    package = os.path.basename(package_dir)
+    importlib.import_module(f"{package}.core.models")
+    return importlib.import_module(f"{package}.core.database").engine
+
+def run_migrations(connection):
+    context.configure(
+        connection=connection,
+        target_metadata=SQLModel.metadata,
+        # SQLite can't ALTER most things in place; batch mode recreates the table
+        render_as_batch=connection.dialect.name == "sqlite",
+    )
+    with context.begin_transaction():
+        context.run_migrations()
+
+# init_db passes its own connection (and holds the migration lock)
+connection = config.attributes.get("connection")
+if connection is not None:
+    run_migrations(connection)
+else:
+    if config.config_file_name:
+        fileConfig(config.config_file_name)
+    with _load_app().connect() as connection:
+        run_migrations(connection)
+        connection.commit()
@@ -0,0 +1,99 @@
+"""baseline schema (what init_db's create_all produced before migrations)
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0001"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    op.create_table(
+        "user",
+        sa.Column("id", sa.Uuid(), nullable=False),
+        sa.Column("email", sa.String(), nullable=False),
+        sa.Column("auth_provider", sa.Enum("EMAIL", "GOOGLE", "APPLE", name="authprovider"), nullable=False),
+        sa.Column("hashed_password", sa.String(), nullable=True),
+        sa.Column("subscription_tier", sa.String(), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_user_email", "user", ["email"], unique=True)
+
+    op.create_table(
+        "knowledgebase",
+        sa.Column("id", sa.Uuid(), nullable=False),
+        sa.Column("category", sa.String(), nullable=False),
+        sa.Column("title", sa.String(), nullable=False),
+        sa.Column("content", sa.String(), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+    )
+
+    op.create_table(
+        "resume",
+        sa.Column("id", sa.Uuid(), nullable=False),
+        sa.Column("user_id", sa.Uuid(), nullable=False),
+        sa.Column("file_path", sa.String(), nullable=False),
+        sa.Column("parsed_content", sa.String(), nullable=False),
+        sa.ForeignKeyConstraint(["user_id"], ["user.id"]),
+        sa.PrimaryKeyConstraint("id"),
+    )
+
+    op.create_table(
+        "session",
+        sa.Column("id", sa.Uuid(), nullable=False),
+        sa.Column("user_id", sa.Uuid(), nullable=False),
+        sa.Column("job_title", sa.String(), nullable=False),
+        sa.Column("company_name", sa.String(), nullable=False),
+        sa.Column("jd_content", sa.String(), nullable=False),
+        sa.Column("role_level", sa.String(), nullable=False),
+        sa.Column("duration_minutes", sa.Integer(), nullable=False),
+        sa.Column("status", sa.Enum("PLANNING", "READY", "IN_PROGRESS", "COMPLETED", name="sessionstatus"), nullable=False),
+        sa.Column("research_status", sa.String(), nullable=False),
+        sa.Column("research_data", sa.JSON(), nullable=True),
+        sa.Column("current_step", sa.Integer(), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(["user_id"], ["user.id"]),
+        sa.PrimaryKeyConstraint("id"),
+    )
+
+    op.create_table(
+        "contextdata",
+        sa.Column("id", sa.Uuid(), nullable=False),
+        sa.Column("session_id", sa.Uuid(), nullable=False),
+        sa.Column("source", sa.String(), nullable=False),
+        sa.Column("content", sa.String(), nullable=False),
+        sa.ForeignKeyConstraint(["session_id"], ["session.id"]),
+        sa.PrimaryKeyConstraint("id"),
+    )
+
+    op.create_table(
+        "sessionstep",
+        sa.Column("id", sa.Uuid(), nullable=False),
+        sa.Column("session_id", sa.Uuid(), nullable=False),
+        sa.Column("step_type", sa.Enum("SCREENING", "BEHAVIORAL", "TECHNICAL", "SYSTEM_DESIGN", name="steptype"), nullable=False),
+        sa.Column("status", sa.Enum("PENDING", "IN_PROGRESS", "COMPLETED", name="stepstatus"), nullable=False),
+        sa.Column("interaction_log", sa.JSON(), nullable=False),
+        sa.Column("feedback", sa.String(), nullable=True),
+        sa.Column("started_at", sa.DateTime(), nullable=True),
+        sa.Column("title", sa.String(), nullable=True),
+        sa.Column("roadmap", sa.JSON(), nullable=True),
+        sa.ForeignKeyConstraint(["session_id"], ["session.id"]),
+        sa.PrimaryKeyConstraint("id"),
+    )
+
+def downgrade():
+    op.drop_table("sessionstep")
+    op.drop_table("contextdata")
+    op.drop_table("session")
+    op.drop_table("resume")
+    op.drop_table("knowledgebase")
+    op.drop_index("ix_user_email", table_name="user")
+    op.drop_table("user")
+    for enum_name in ("authprovider", "sessionstatus", "steptype", "stepstatus"):
+        sa.Enum(name=enum_name).drop(op.get_bind(), checkfirst=True)
@@ -0,0 +1,45 @@
+"""resume content hash / sections / digest, step problem and code results
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0002"
+down_revision = "0001"
+branch_labels = None
+depends_on = None
+
+NEW_COLUMNS = {
+    "resume": [
+        sa.Column("content_hash", sa.String(), nullable=True),
+        sa.Column("sections", sa.JSON(), nullable=True),
+        sa.Column("digest", sa.String(), nullable=True),
+    ],
+    "sessionstep": [
+        sa.Column("problem", sa.JSON(), nullable=True),
+        sa.Column("code_results", sa.JSON(), nullable=True),
+    ],
+}
+
+def upgrade():
+    # Databases stamped at the baseline may have been created with some of these already
+    inspector = sa.inspect(op.get_bind())
+    for table, columns in NEW_COLUMNS.items():
+        existing = {column["name"] for column in inspector.get_columns(table)}
+        for column in columns:
+            if column.name not in existing:
+                op.add_column(table, column)
+
+    existing_indexes = {index["name"] for index in inspector.get_indexes("resume")}
+    if "ix_resume_content_hash" not in existing_indexes:
+        op.create_index("ix_resume_content_hash", "resume", ["content_hash"])
+
+def downgrade():
+    op.drop_index("ix_resume_content_hash", table_name="resume")
+    for table, columns in NEW_COLUMNS.items():
+        with op.batch_alter_table(table) as batch:
+            for column in columns:
+                batch.drop_column(column.name)
@@ -0,0 +1,33 @@
+"""resume.created_at and indexes for foreign keys / hot queries
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0003"
+down_revision = "0002"
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    # Existing resumes have no upload time; they get the migration time
+    op.add_column("resume", sa.Column("created_at", sa.DateTime(), nullable=True))
+    op.execute("UPDATE resume SET created_at = CURRENT_TIMESTAMP WHERE created_at IS NULL")
+    with op.batch_alter_table("resume") as batch:
+        batch.alter_column("created_at", existing_type=sa.DateTime(), nullable=False)
+
+    op.create_index("ix_resume_user_id_created_at", "resume", ["user_id", "created_at"])
+    op.create_index("ix_session_user_id_created_at", "session", ["user_id", "created_at", "id"])
+    op.create_index("ix_sessionstep_session_id_status", "sessionstep", ["session_id", "status"])
+    op.create_index("ix_contextdata_session_id", "contextdata", ["session_id"])
+
+def downgrade():
+    op.drop_index("ix_contextdata_session_id", table_name="contextdata")
+    op.drop_index("ix_sessionstep_session_id_status", table_name="sessionstep")
+    op.drop_index("ix_session_user_id_created_at", table_name="session")
+    op.drop_index("ix_resume_user_id_created_at", table_name="resume")
+    with op.batch_alter_table("resume") as batch:
+        batch.drop_column("created_at")
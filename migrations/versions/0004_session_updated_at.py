@@ -0,0 +1,23 @@
+"""session.updated_at
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0004"
+down_revision = "0003"
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    op.add_column("session", sa.Column("updated_at", sa.DateTime(), nullable=True))
+    op.execute("UPDATE session SET updated_at = created_at WHERE updated_at IS NULL")
+    with op.batch_alter_table("session") as batch:
+        batch.alter_column("updated_at", existing_type=sa.DateTime(), nullable=False)
+
+def downgrade():
+    with op.batch_alter_table("session") as batch:
+        batch.drop_column("updated_at")
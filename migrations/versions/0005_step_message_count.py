@@ -0,0 +1,36 @@
+"""sessionstep.message_count
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0005"
+down_revision = "0004"
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    op.add_column("sessionstep", sa.Column("message_count", sa.Integer(), nullable=True))
+
+    # Counted in Python: early logs may be JSON objects rather than arrays
+    step = sa.table("sessionstep", sa.column("id"), sa.column("interaction_log", sa.JSON), sa.column("message_count", sa.Integer))
+    connection = op.get_bind()
+    counts = [
+        {"step_id": step_id, "count": len(log) if isinstance(log, (list, dict)) else 0}
+        for step_id, log in connection.execute(sa.select(step.c.id, step.c.interaction_log))
+    ]
+    if counts:
+        connection.execute(
+            step.update().where(step.c.id == sa.bindparam("step_id")).values(message_count=sa.bindparam("count")),
+            counts,
+        )
+
+    with op.batch_alter_table("sessionstep") as batch:
+        batch.alter_column("message_count", existing_type=sa.Integer(), nullable=False)
+
+def downgrade():
+    with op.batch_alter_table("sessionstep") as batch:
+        batch.drop_column("message_count")
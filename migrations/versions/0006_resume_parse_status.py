@@ -0,0 +1,24 @@
+"""resume.parse_status, resume.parse_error
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0006"
+down_revision = "0005"
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    op.add_column("resume", sa.Column("parse_status", sa.String(), nullable=False, server_default="completed"))
+    op.add_column("resume", sa.Column("parse_error", sa.String(), nullable=True))
+    # Unparsed rows from before: a parse still running will overwrite this when it finishes
+    op.execute("UPDATE resume SET parse_status = 'failed' WHERE parsed_content = ''")
+
+def downgrade():
+    with op.batch_alter_table("resume") as batch:
+        batch.drop_column("parse_error")
+        batch.drop_column("parse_status")
@@ -1,10 +1,53 @@
-from typing import Generic, TypeVar, Type, Optional, List, Any
+from typing import TYPE_CHECKING, Generic, TypeVar, Type, Optional, List, Any, Iterable
 from uuid import UUID
 from sqlmodel import Session, select, SQLModel
 
+if TYPE_CHECKING:
+    # Only the async routes create these; sync-only processes never load the asyncio extension
+    from sqlmodel.ext.asyncio.session import AsyncSession
+
 T = TypeVar("T", bound=SQLModel)
 
+# Set in session.info while a UnitOfWork is open on that session
+_UNIT_OF_WORK = "unit_of_work"
+
+class UnitOfWork:
+    """
+    One transaction across every repository sharing a DB session. Inside the
+    block repository writes are only staged; it commits once on exit or rolls
+    back on error. Nested blocks join the outermost one.
+
+    Autoflush is off inside the block, so everything goes out in the single
+    flush at commit (and no write transaction is held open during slow calls
+    like the LLM); queries inside the block don't see staged rows.
+    """
+    def __init__(self, session: Session):
+        self.session = session
+        self._outermost = False
+        self._autoflush = session.autoflush
+
+    def __enter__(self) -> "UnitOfWork":
+        self._outermost = not self.session.info.get(_UNIT_OF_WORK)
+        if self._outermost:
+            self.session.info[_UNIT_OF_WORK] = True
+            self._autoflush = self.session.autoflush
+            self.session.autoflush = False
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if not self._outermost:
+            return False
+        self.session.info.pop(_UNIT_OF_WORK, None)
+        self.session.autoflush = self._autoflush
+        if exc_type is None:
+            self.session.commit()
+        else:
+            self.session.rollback()
+        return False
+
 class BaseRepository(Generic[T]):
+    # Ids and timestamps are generated client-side, so written rows are never
+    # refreshed; request sessions don't expire on commit (see get_session)
     def __init__(self, session: Session, model_cls: Type[T]):
         self.session = session
         self.model_cls = model_cls
@@ -16,12 +59,19 @@ class BaseRepository(Generic[T]):
         statement = select(self.model_cls)
         return self.session.exec(statement).all()
 
-    def create(self, entity: T) -> T:
+    def add(self, entity: SQLModel) -> SQLModel:
         self.session.add(entity)
-        self.session.commit()
-        self.session.refresh(entity)
+        self._commit()
         return entity
 
+    def add_all(self, entities: Iterable[SQLModel]):
+        # Rows of one table are sent as a single batched INSERT at flush
+        self.session.add_all(entities)
+        self._commit()
+
+    def create(self, entity: T) -> T:
+        return self.add(entity)
+
     def update(self, id: UUID, data: dict) -> Optional[T]:
         entity = self.get(id)
         if not entity:
@@ -30,10 +80,7 @@ class BaseRepository(Generic[T]):
         for key, value in data.items():
             setattr(entity, key, value)
             
-        self.session.add(entity)
-        self.session.commit()
-        self.session.refresh(entity)
-        return entity
+        return self.add(entity)
 
     def delete(self, id: UUID) -> bool:
         entity = self.get(id)
@@ -41,5 +88,64 @@ class BaseRepository(Generic[T]):
             return False
         
         self.session.delete(entity)
-        self.session.commit()
+        self._commit()
+        return True
+
+    def unit_of_work(self) -> UnitOfWork:
+        return UnitOfWork(self.session)
+
+    def release_connection(self):
+        """
+        Ends the open (read) transaction so its pooled connection goes back
+        before a slow call. Loaded objects stay usable: request sessions don't
+        expire on commit. Anything staged is committed, so call it before writing.
+        """
+        self._commit()
+
+    def _commit(self):
+        # Within a unit of work the commit belongs to the block
+        if not self.session.info.get(_UNIT_OF_WORK):
+            self.session.commit()
+
+
+class AsyncBaseRepository(Generic[T]):
+    """
+    Async counterpart of BaseRepository for routes that use get_async_session.
+    The session must not expire on commit (lazy refreshes would need sync IO).
+    """
+    def __init__(self, session: "AsyncSession", model_cls: Type[T]):
+        self.session = session
+        self.model_cls = model_cls
+
+    async def get(self, id: UUID) -> Optional[T]:
+        return await self.session.get(self.model_cls, id)
+
+    async def get_all(self) -> List[T]:
+        statement = select(self.model_cls)
+        return (await self.session.exec(statement)).all()
+
+    async def create(self, entity: T) -> T:
+        self.session.add(entity)
+        await self.session.commit()
+        return entity
+
+    async def update(self, id: UUID, data: dict) -> Optional[T]:
+        entity = await self.get(id)
+        if not entity:
+            return None
+        
+        for key, value in data.items():
+            setattr(entity, key, value)
+            
+        self.session.add(entity)
+        await self.session.commit()
+        return entity
+
+    async def delete(self, id: UUID) -> bool:
+        entity = await self.get(id)
+        if not entity:
+            return False
+        
+        await self.session.delete(entity)
+        await self.session.commit()
         return True
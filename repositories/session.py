@@ -1,8 +1,166 @@
-from typing import List
+import os
+import json
+import base64
+import binascii
+from datetime import datetime
+from itertools import chain
+from typing import TYPE_CHECKING, Callable, Dict, List, Optional, Tuple
+from sqlalchemy import event, func, tuple_, update
+from sqlalchemy.orm import Session as OrmSession, selectinload, undefer, undefer_group
+from sqlalchemy.orm.util import identity_key
 from sqlmodel import Session, select
 from uuid import UUID
-from ..core.models import Session as DbSession
-from .base import BaseRepository
+from ..core.models import Session as DbSession, SessionStep, SessionSummary, StepSummary, StepStatus, ContextData, HEAVY
+from ..core.cache import VersionedCache
+from ..core.database import ON_REPLICA
+from .base import BaseRepository, AsyncBaseRepository
+
+if TYPE_CHECKING:
+    from sqlmodel.ext.asyncio.session import AsyncSession
+
+SESSION_VIEW_CACHE_SIZE = int(os.getenv("SESSION_VIEW_CACHE_SIZE", 2048))
+SESSION_VIEW_CACHE_TTL = int(os.getenv("SESSION_VIEW_CACHE_TTL", 300))
+
+# Serialized session, steps and research views, keyed by session id and version
+session_views = VersionedCache("sessions:view", maxsize=SESSION_VIEW_CACHE_SIZE, ttl=SESSION_VIEW_CACHE_TTL)
+
+_STALE_SESSIONS = "stale_session_ids"
+
+def log_entries(interaction_log) -> List[Dict]:
+    # Some early logs were stored as {index: entry} objects
+    if isinstance(interaction_log, dict):
+        return list(interaction_log.values())
+    if isinstance(interaction_log, list):
+        return list(interaction_log)
+    return []
+
+@event.listens_for(OrmSession, "before_flush")
+def _count_messages(db, flush_context, instances):
+    for obj in chain(db.new, db.dirty):
+        # Only steps whose log is loaded can have changed it
+        if isinstance(obj, SessionStep) and "interaction_log" in obj.__dict__:
+            count = len(log_entries(obj.interaction_log))
+            if obj.message_count != count:
+                obj.message_count = count
+
+@event.listens_for(OrmSession, "before_flush")
+def _touch_sessions(db, flush_context, instances):
+    # Session.updated_at covers the session's steps and context too
+    now = datetime.utcnow()
+    touched, parents = set(), set()
+    for obj in chain(db.new, db.dirty):
+        if isinstance(obj, DbSession) and (obj in db.new or db.is_modified(obj)):
+            obj.updated_at = now
+            touched.add(obj.id)
+    for obj in chain(db.new, db.dirty, db.deleted):
+        if isinstance(obj, (SessionStep, ContextData)) and (obj in db.new or obj in db.deleted or db.is_modified(obj)):
+            session_id = obj.session_id
+            if session_id is None:
+                # Appended to parent.steps / parent.context_data; the key is only set during the flush
+                parent = obj.__dict__.get("session")
+                session_id = parent.id if parent is not None else None
+            if session_id is not None:
+                parents.add(UUID(str(session_id))) # may have been set from a str
+
+    unloaded = []
+    for session_id in parents - touched:
+        parent = db.identity_map.get(identity_key(DbSession, session_id))
+        if parent is not None:
+            parent.updated_at = now
+        else:
+            unloaded.append(session_id)
+    if unloaded:
+        db.connection().execute(update(DbSession.__table__).where(DbSession.__table__.c.id.in_(unloaded)).values(updated_at=now))
+
+# Invalidation hangs off the ORM so every writer is covered: service mutations,
+# the streamed voice reply and the Celery tasks (any process importing this module).
+# Ids are collected at flush and invalidated only after commit, so a concurrent
+# read can't re-cache the old state under the new version.
+@event.listens_for(OrmSession, "after_flush")
+def _collect_stale_sessions(db, flush_context):
+    stale = db.info.setdefault(_STALE_SESSIONS, set())
+    for obj in chain(db.new, db.dirty, db.deleted):
+        if isinstance(obj, DbSession):
+            stale.add(obj.id)
+        elif isinstance(obj, (SessionStep, ContextData)):
+            stale.add(obj.session_id)
+
+@event.listens_for(OrmSession, "after_commit")
+def _invalidate_stale_sessions(db):
+    for session_id in db.info.pop(_STALE_SESSIONS, ()):
+        session_views.invalidate(str(session_id))
+
+@event.listens_for(OrmSession, "after_rollback")
+def _discard_stale_sessions(db):
+    db.info.pop(_STALE_SESSIONS, None)
+
+# Keyset position in a user's session list: (created_at, id) of the last row returned
+SessionCursor = Tuple[datetime, UUID]
+
+def encode_cursor(created_at: datetime, id: UUID) -> str:
+    raw = json.dumps([created_at.isoformat(), str(id)]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+def decode_cursor(cursor: str) -> SessionCursor:
+    # Raises ValueError on anything that isn't a cursor we issued
+    try:
+        created_at, id = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        return datetime.fromisoformat(created_at), UUID(id)
+    except (TypeError, json.JSONDecodeError, binascii.Error) as e:
+        raise ValueError("Invalid cursor") from e
+
+# Named loader profiles: the deferred (heavy) columns each use case reads up front.
+# Anything left out still loads on first access, at the cost of an extra query.
+SESSION_PROFILES = {
+    "list": [],
+    "turn": [
+        undefer(DbSession.jd_content),
+        selectinload(DbSession.context_data).undefer(ContextData.content),
+    ],
+    "research": [undefer(DbSession.research_data)],
+    # Everything; for responses that serialize the whole row (unloaded columns would be left out)
+    "detail": [undefer_group(HEAVY)],
+}
+
+STEP_PROFILES = {
+    "list": [],
+    "turn": [undefer(SessionStep.interaction_log), undefer(SessionStep.roadmap), undefer(SessionStep.problem)],
+    "code": [undefer(SessionStep.problem), undefer(SessionStep.code_results)],
+    "evaluate": [undefer(SessionStep.interaction_log), undefer(SessionStep.code_results)],
+    "messages": [undefer(SessionStep.interaction_log)],
+    # Everything but the transcript
+    "summary": [undefer(SessionStep.feedback), undefer(SessionStep.roadmap), undefer(SessionStep.problem), undefer(SessionStep.code_results)],
+    "detail": [undefer_group(HEAVY)],
+}
+
+def _summary_statement(user_id: UUID, limit: int, after: Optional[SessionCursor]):
+    """
+    Newest-first page of list columns plus step counts, walked along the
+    (user_id, created_at, id) index; the counts are per-row index lookups.
+    """
+    total_steps = (
+        select(func.count())
+        .where(SessionStep.session_id == DbSession.id)
+        .scalar_subquery()
+    )
+    completed_steps = (
+        select(func.count())
+        .where(SessionStep.session_id == DbSession.id, SessionStep.status == StepStatus.COMPLETED)
+        .scalar_subquery()
+    )
+    statement = (
+        select(
+            DbSession.id, DbSession.company_name, DbSession.job_title, DbSession.role_level,
+            DbSession.status, DbSession.current_step, DbSession.created_at,
+            total_steps.label("total_steps"), completed_steps.label("completed_steps"),
+        )
+        .where(DbSession.user_id == user_id)
+        .order_by(DbSession.created_at.desc(), DbSession.id.desc())
+        .limit(limit)
+    )
+    if after:
+        statement = statement.where(tuple_(DbSession.created_at, DbSession.id) < tuple_(*after))
+    return statement
 
 class SessionRepository(BaseRepository[DbSession]):
     def __init__(self, session: Session):
@@ -11,3 +169,85 @@ class SessionRepository(BaseRepository[DbSession]):
     def get_by_user_id(self, user_id: UUID) -> List[DbSession]:
         statement = select(DbSession).where(DbSession.user_id == user_id)
         return self.session.exec(statement).all()
+
+    def list_summaries(self, user_id: UUID, limit: int, after: Optional[SessionCursor] = None) -> List[SessionSummary]:
+        rows = self.session.exec(_summary_statement(user_id, limit, after)).all()
+        return [SessionSummary.model_validate(row._mapping) for row in rows]
+
+    def get_loaded(self, id: UUID, profile: str = "detail") -> Optional[DbSession]:
+        return self._get_profiled(DbSession, id, SESSION_PROFILES[profile])
+
+    def get_step(self, step_id: UUID, profile: str = "turn") -> Optional[SessionStep]:
+        return self._get_profiled(SessionStep, step_id, STEP_PROFILES[profile])
+
+    def _get_profiled(self, model, id: UUID, options):
+        # An instance already in the identity map comes back as-is, without the
+        # profile's columns, unless it's re-populated. Re-populating would also
+        # overwrite unflushed changes, so a modified instance is left alone; its
+        # deferred columns still load on first access.
+        existing = self.session.identity_map.get(identity_key(model, id))
+        populate = existing is not None and not self.session.is_modified(existing)
+        return self.session.get(model, id, options=options, populate_existing=populate)
+
+    def get_steps(self, session_id: UUID, profile: str = "list") -> List[SessionStep]:
+        statement = select(SessionStep).where(SessionStep.session_id == session_id).options(*STEP_PROFILES[profile])
+        return self.session.exec(statement).all()
+
+    # Cached JSON views for the polled read routes; None when the session doesn't exist
+
+    def get_version(self, session_id: UUID) -> Optional[str]:
+        # Just updated_at, for conditional GETs that may never need the payload
+        def load():
+            updated_at = self.session.exec(select(DbSession.updated_at).where(DbSession.id == session_id)).first()
+            return updated_at.isoformat() if updated_at else None
+        return self._read_through(session_id, "version", load)
+
+    def get_view(self, session_id: UUID) -> Optional[Dict]:
+        def load():
+            session = self.get_loaded(session_id, "detail")
+            return session.model_dump(mode="json") if session else None
+        return self._read_through(session_id, "session", load)
+
+    def get_steps_view(self, session_id: UUID) -> Optional[List[Dict]]:
+        def load():
+            if not self.get_loaded(session_id, "list"):
+                return None
+            return [
+                StepSummary.model_validate(step, from_attributes=True).model_dump(mode="json")
+                for step in self.get_steps(session_id, "summary")
+            ]
+        return self._read_through(session_id, "steps", load)
+
+    def get_research_view(self, session_id: UUID) -> Optional[Dict]:
+        def load():
+            session = self.get_loaded(session_id, "research")
+            return {"status": session.research_status, "data": session.research_data} if session else None
+        return self._read_through(session_id, "research", load)
+
+    def _read_through(self, session_id: UUID, view: str, load: Callable[[], Optional[object]]):
+        # The version is read before the DB, so a write committed in between
+        # leaves this result under a version that is already stale
+        version = session_views.version(str(session_id))
+        if version is not None:
+            cached = session_views.get(str(session_id), view, version)
+            if cached is not None:
+                return cached
+        value = load()
+        # A replica may not have the write that bumped the version yet; caching what
+        # it returned would serve (and ETag) the old state until the TTL runs out
+        if value is not None and version is not None and not self.session.info.get(ON_REPLICA):
+            session_views.set(str(session_id), view, version, value)
+        return value
+
+
+class AsyncSessionRepository(AsyncBaseRepository[DbSession]):
+    def __init__(self, session: "AsyncSession"):
+        super().__init__(session, DbSession)
+
+    async def get_by_user_id(self, user_id: UUID) -> List[DbSession]:
+        statement = select(DbSession).where(DbSession.user_id == user_id)
+        return (await self.session.exec(statement)).all()
+
+    async def list_summaries(self, user_id: UUID, limit: int, after: Optional[SessionCursor] = None) -> List[SessionSummary]:
+        rows = (await self.session.exec(_summary_statement(user_id, limit, after))).all()
+        return [SessionSummary.model_validate(row._mapping) for row in rows]
@@ -1,7 +1,22 @@
-from typing import Optional
+import os
+from typing import TYPE_CHECKING, Optional
+from uuid import UUID
 from sqlmodel import Session, select
-from ..core.models import User
-from .base import BaseRepository
+from ..core.models import User, UserPrincipal
+from ..core.cache import TieredCache
+from .base import BaseRepository, AsyncBaseRepository
+
+if TYPE_CHECKING:
+    from sqlmodel.ext.asyncio.session import AsyncSession
+
+USER_CACHE_SIZE = int(os.getenv("USER_CACHE_SIZE", 4096))
+USER_CACHE_TTL = int(os.getenv("USER_CACHE_TTL", 60)) # bounds staleness in other processes
+
+# Auth principals keyed by user id, as UserPrincipal JSON
+_principals = TieredCache("auth:user", maxsize=USER_CACHE_SIZE, ttl=USER_CACHE_TTL)
+
+def _principal_data(user: User) -> dict:
+    return UserPrincipal.model_validate(user, from_attributes=True).model_dump(mode="json")
 
 class UserRepository(BaseRepository[User]):
     def __init__(self, session: Session):
@@ -10,3 +25,57 @@ class UserRepository(BaseRepository[User]):
     def get_by_email(self, email: str) -> Optional[User]:
         statement = select(User).where(User.email == email)
         return self.session.exec(statement).first()
+
+    def get_principal(self, id: UUID) -> Optional[UserPrincipal]:
+        """
+        Read-through cached principal for authentication. A plain read model
+        (validated, so timestamps come back as datetimes), not a session-bound User.
+        """
+        data = _principals.get(str(id))
+        if data is None:
+            user = self.get(id)
+            if user is None:
+                return None
+            data = _principal_data(user)
+            _principals.set(str(id), data)
+        return UserPrincipal.model_validate(data)
+
+    def update(self, id: UUID, data: dict) -> Optional[User]:
+        user = super().update(id, data)
+        _principals.delete(str(id))
+        return user
+
+    def delete(self, id: UUID) -> bool:
+        deleted = super().delete(id)
+        _principals.delete(str(id))
+        return deleted
+
+
+class AsyncUserRepository(AsyncBaseRepository[User]):
+    def __init__(self, session: "AsyncSession"):
+        super().__init__(session, User)
+
+    async def get_by_email(self, email: str) -> Optional[User]:
+        statement = select(User).where(User.email == email)
+        return (await self.session.exec(statement)).first()
+
+    async def get_principal(self, id: UUID) -> Optional[UserPrincipal]:
+        # Shares the principal cache with UserRepository
+        data = _principals.get(str(id))
+        if data is None:
+            user = await self.get(id)
+            if user is None:
+                return None
+            data = _principal_data(user)
+            _principals.set(str(id), data)
+        return UserPrincipal.model_validate(data)
+
+    async def update(self, id: UUID, data: dict) -> Optional[User]:
+        user = await super().update(id, data)
+        _principals.delete(str(id))
+        return user
+
+    async def delete(self, id: UUID) -> bool:
+        deleted = await super().delete(id)
+        _principals.delete(str(id))
+        return deleted
@@ -1,11 +1,13 @@
 from fastapi import APIRouter, Depends
+from typing import Optional
+import uuid
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
 from sqlmodel import Session
 from ..core.database import get_session
-from ..core.models import User
+from ..core.models import UserPrincipal
 from pydantic import BaseModel
 from ..repositories.user import UserRepository
-from ..services.auth import AuthService
+from ..services.auth import AuthService, decode_token
 
 router = APIRouter(prefix="/auth", tags=["auth"])
 
@@ -22,6 +24,11 @@ class Token(BaseModel):
 class GoogleToken(BaseModel):
     token: str
 
+class Principal(BaseModel):
+    id: uuid.UUID
+    email: Optional[str] = None
+    tier: str = "free"
+
 def get_user_repository(session: Session = Depends(get_session)) -> UserRepository:
     return UserRepository(session)
 
@@ -30,18 +37,27 @@ def get_auth_service(user_repo: UserRepository = Depends(get_user_repository)) -
 
 @router.post("/signup", response_model=Token)
 async def signup(user_data: UserCreate, auth_service: AuthService = Depends(get_auth_service)):
-    access_token = auth_service.signup(user_data.email, user_data.password)
+    access_token = await auth_service.signup(user_data.email, user_data.password)
     return {"access_token": access_token, "token_type": "bearer"}
 
 @router.post("/token", response_model=Token)
 async def login_for_access_token(form_data: OAuth2PasswordRequestForm = Depends(), auth_service: AuthService = Depends(get_auth_service)):
-    access_token = auth_service.login(form_data.username, form_data.password)
+    access_token = await auth_service.login(form_data.username, form_data.password)
     return {"access_token": access_token, "token_type": "bearer"}
 
 @router.post("/google", response_model=Token)
 async def google_login(token_data: GoogleToken, auth_service: AuthService = Depends(get_auth_service)):
-    access_token = auth_service.google_login(token_data.token)
+    access_token = await auth_service.google_login(token_data.token)
     return {"access_token": access_token, "token_type": "bearer"}
 
-async def get_current_user(token: str = Depends(oauth2_scheme), auth_service: AuthService = Depends(get_auth_service)):
+def get_current_user(token: str = Depends(oauth2_scheme), auth_service: AuthService = Depends(get_auth_service)) -> UserPrincipal:
+    # Confirms the account still exists; cached, so the DB is only hit on a miss (sync: runs in the threadpool)
     return auth_service.get_current_user(token)
+
+async def get_current_principal(token: str = Depends(oauth2_scheme)) -> Principal:
+    # Token claims only; no database access
+    claims = decode_token(token)
+    return Principal(id=claims["sub"], email=claims.get("email"), tier=claims.get("tier") or "free")
+
+async def get_current_user_id(principal: Principal = Depends(get_current_principal)) -> uuid.UUID:
+    return principal.id
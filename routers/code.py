@@ -1,4 +1,6 @@
 from fastapi import APIRouter, Depends
+from typing import Any, List, Optional
+from fastapi.concurrency import run_in_threadpool
 from pydantic import BaseModel
 from ..services.code import CodeService
 
@@ -7,10 +9,39 @@ router = APIRouter(prefix="/code", tags=["code"])
 class CodeRequest(BaseModel):
     code: str
 
+class TestCase(BaseModel):
+    args: List[Any] = []
+    expected: Any = None
+
+class TestRunRequest(BaseModel):
+    code: str
+    function_name: str
+    test_cases: List[TestCase]
+    unordered: Optional[bool] = False
+
+class ProfileRequest(BaseModel):
+    code: str
+    function_name: str
+    input_kind: str = "int_list"
+
 def get_code_service() -> CodeService:
     return CodeService()
 
 @router.post("/run")
 async def run_code(request: CodeRequest, code_service: CodeService = Depends(get_code_service)):
-    output = code_service.run_code(request.code)
+    # Waiting on the sandbox worker blocks, so keep it off the event loop
+    output = await run_in_threadpool(code_service.run_code, request.code)
     return {"output": output}
+
+@router.post("/test")
+async def run_tests(request: TestRunRequest, code_service: CodeService = Depends(get_code_service)):
+    test_cases = [case.dict() for case in request.test_cases]
+    return await run_in_threadpool(
+        code_service.run_tests, request.code, request.function_name, test_cases, request.unordered
+    )
+
+@router.post("/profile")
+async def profile_code(request: ProfileRequest, code_service: CodeService = Depends(get_code_service)):
+    return await run_in_threadpool(
+        code_service.profile_complexity, request.code, request.function_name, request.input_kind
+    )
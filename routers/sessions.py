@@ -1,13 +1,17 @@
-from fastapi import APIRouter, Depends, File, UploadFile
+from fastapi import APIRouter, Depends, File, HTTPException, Query, Request, Response, UploadFile
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import JSONResponse, StreamingResponse
 from sqlmodel import Session
-from typing import List, Optional
+from typing import Callable, List, Optional
 import uuid
+import hashlib
 from pydantic import BaseModel
 
-from ..core.database import get_session
-from ..core.models import User, Session as DbSession, SessionStep
-from .auth import get_current_user
-from ..repositories.session import SessionRepository
+from sqlmodel.ext.asyncio.session import AsyncSession
+from ..core.database import get_session, get_async_read_session, get_read_session
+from ..core.models import Session as DbSession, SessionSummary, StepSummary, StepMessages, UserPrincipal
+from .auth import get_current_user, get_current_user_id
+from ..repositories.session import SessionRepository, AsyncSessionRepository, encode_cursor, decode_cursor
 from ..services.session import SessionService
 
 router = APIRouter(prefix="/sessions", tags=["sessions"])
@@ -15,9 +19,16 @@ router = APIRouter(prefix="/sessions", tags=["sessions"])
 def get_session_repository(session: Session = Depends(get_session)) -> SessionRepository:
     return SessionRepository(session)
 
+def get_async_session_repository(session: AsyncSession = Depends(get_async_read_session)) -> AsyncSessionRepository:
+    return AsyncSessionRepository(session)
+
 def get_session_service(session_repo: SessionRepository = Depends(get_session_repository)) -> SessionService:
     return SessionService(session_repo)
 
+# Read-only routes: replica-backed when replicas are configured
+def get_read_session_service(session: Session = Depends(get_read_session)) -> SessionService:
+    return SessionService(SessionRepository(session))
+
 class SessionUpdate(BaseModel):
     role_level: Optional[str] = None
     duration_minutes: Optional[int] = None
@@ -27,27 +38,107 @@ class SessionUpdate(BaseModel):
 class InteractionRequest(BaseModel):
     message: str
 
+class StepTestRequest(BaseModel):
+    code: str
+
+class VoiceTurnRequest(BaseModel):
+    message: str
+    tier: Optional[str] = "free"
+
+class ResumeUploadRequest(BaseModel):
+    filename: str
+    content_type: str
+    content_hash: str
+
+class ResumeUploadComplete(BaseModel):
+    filename: str
+    content_hash: str
+
+class SessionPage(BaseModel):
+    items: List[SessionSummary]
+    next_cursor: Optional[str] = None
+
+FIELDS_QUERY = Query(None, description="Comma-separated fields to return (default: all)")
+
+def _parse_fields(fields: Optional[str], model) -> List[str]:
+    if not fields:
+        return []
+    selected = sorted({name.strip() for name in fields.split(",") if name.strip()})
+    unknown = [name for name in selected if name not in model.model_fields]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(unknown)}")
+    return selected
+
+def _etag_matches(request: Request, etag: str) -> bool:
+    # If-None-Match uses weak comparison
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    tags = [tag.strip().removeprefix("W/") for tag in header.split(",")]
+    return "*" in tags or etag in tags
+
+def _conditional_view(request: Request, session_service: SessionService, session_id: uuid.UUID,
+                      view: str, fields: List[str], load: Callable[[uuid.UUID], object]) -> Response:
+    """
+    Serves a session view with an ETag from the session's updated_at (plus the
+    fieldset). A matching If-None-Match gets a 304 before the view is loaded.
+    """
+    version = session_service.get_version(session_id)
+    etag = '"' + hashlib.sha1(f"{view}:{session_id}:{version}:{','.join(fields)}".encode()).hexdigest() + '"'
+    # Clients may keep it but must revalidate; the 304 is cheap
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if _etag_matches(request, etag):
+        return Response(status_code=304, headers=headers)
+
+    # The view is already JSON-ready, so it skips response_model validation
+    content = load(session_id)
+    if fields:
+        if isinstance(content, list):
+            content = [{name: item[name] for name in fields} for item in content]
+        else:
+            content = {name: content[name] for name in fields}
+    return JSONResponse(content, headers=headers)
+
 @router.post("")
 async def create_session(
-    current_user: User = Depends(get_current_user),
+    # The cached user, not just the claims: a deleted account gets a 401 rather than a failed insert
+    user: UserPrincipal = Depends(get_current_user),
     session_service: SessionService = Depends(get_session_service)
 ):
-    db_session = session_service.create_session(current_user)
+    db_session = session_service.create_session(user.id)
     return {"id": str(db_session.id)}
 
-@router.get("", response_model=List[DbSession])
+@router.get("", response_model=SessionPage)
 async def get_sessions(
-    current_user: User = Depends(get_current_user),
-    session_service: SessionService = Depends(get_session_service)
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = Query(None),
+    user_id: uuid.UUID = Depends(get_current_user_id),
+    session_repo: AsyncSessionRepository = Depends(get_async_session_repository)
 ):
-    return session_service.get_user_sessions(current_user.id)
+    try:
+        after = decode_cursor(cursor) if cursor else None
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+    # One extra row tells us whether there's a next page
+    # Pure read: async session, so it doesn't tie up a threadpool thread
+    items = await session_repo.list_summaries(user_id, limit + 1, after)
+    next_cursor = None
+    if len(items) > limit:
+        items = items[:limit]
+        next_cursor = encode_cursor(items[-1].created_at, items[-1].id)
+    return {"items": items, "next_cursor": next_cursor}
 
 @router.get("/{session_id}", response_model=DbSession)
 async def get_session_by_id(
     session_id: uuid.UUID, 
-    session_service: SessionService = Depends(get_session_service)
+    request: Request,
+    fields: Optional[str] = FIELDS_QUERY,
+    session_service: SessionService = Depends(get_read_session_service)
 ):
-    return session_service.get_session(session_id)
+    return _conditional_view(
+        request, session_service, session_id, "session", _parse_fields(fields, DbSession), session_service.get_session_view
+    )
 
 @router.patch("/{session_id}")
 async def update_session(
@@ -63,7 +154,37 @@ async def upload_resume(
     resume: UploadFile = File(...),
     session_service: SessionService = Depends(get_session_service)
 ):
-    return session_service.upload_resume(session_id, resume)
+    # Hashing, storage and parsing are blocking I/O; keep them off the event loop
+    return await run_in_threadpool(session_service.upload_resume, session_id, resume)
+
+@router.post("/{session_id}/resume/upload-url")
+async def create_resume_upload(
+    session_id: uuid.UUID,
+    request: ResumeUploadRequest,
+    session_service: SessionService = Depends(get_session_service)
+):
+    return await run_in_threadpool(
+        session_service.create_resume_upload, session_id, request.filename, request.content_type, request.content_hash
+    )
+
+@router.post("/{session_id}/resume/complete")
+async def complete_resume_upload(
+    session_id: uuid.UUID,
+    request: ResumeUploadComplete,
+    session_service: SessionService = Depends(get_session_service)
+):
+    return await run_in_threadpool(
+        session_service.complete_resume_upload, session_id, request.filename, request.content_hash
+    )
+
+@router.get("/{session_id}/resume/{resume_id}/status")
+async def get_resume_status(
+    session_id: uuid.UUID,
+    resume_id: uuid.UUID,
+    session_service: SessionService = Depends(get_read_session_service)
+):
+    # Polled after /resume/complete: processing, completed or failed (with the error)
+    return await run_in_threadpool(session_service.get_resume_status, session_id, resume_id)
 
 @router.post("/{session_id}/start")
 async def start_session(
@@ -75,17 +196,42 @@ async def start_session(
 @router.get("/{session_id}/details", response_model=DbSession)
 async def get_session_details(
     session_id: uuid.UUID, 
-    session_service: SessionService = Depends(get_session_service)
+    request: Request,
+    fields: Optional[str] = FIELDS_QUERY,
+    session_service: SessionService = Depends(get_read_session_service)
 ):
-    return session_service.get_session(session_id)
+    return _conditional_view(
+        request, session_service, session_id, "session", _parse_fields(fields, DbSession), session_service.get_session_view
+    )
 
-@router.get("/{session_id}/steps", response_model=List[SessionStep])
+@router.get("/{session_id}/steps", response_model=List[StepSummary])
 async def get_session_steps(
     session_id: uuid.UUID, 
-    session_service: SessionService = Depends(get_session_service)
+    request: Request,
+    fields: Optional[str] = FIELDS_QUERY,
+    session_service: SessionService = Depends(get_read_session_service)
+):
+    # Metadata and message counts; transcripts come from /messages
+    return _conditional_view(
+        request, session_service, session_id, "steps", _parse_fields(fields, StepSummary), session_service.get_steps_view
+    )
+
+@router.get("/{session_id}/steps/{step_id}/messages", response_model=StepMessages)
+async def get_step_messages(
+    session_id: uuid.UUID,
+    step_id: uuid.UUID,
+    request: Request,
+    limit: int = Query(50, ge=1, le=200),
+    before: Optional[str] = Query(None, description="Message id; return the messages before it"),
+    after: Optional[str] = Query(None, description="Message id; return the messages after it"),
+    since: Optional[int] = Query(None, ge=0, description="Last seen message_count; return what was added since"),
+    session_service: SessionService = Depends(get_read_session_service)
 ):
-    session = session_service.get_session(session_id)
-    return session.steps
+    view = f"messages:{step_id}:{limit}:{before}:{after}:{since}"
+    return _conditional_view(
+        request, session_service, session_id, view, [],
+        lambda _: session_service.get_step_messages(session_id, step_id, limit, before=before, after=after, since=since)
+    )
 
 @router.post("/{session_id}/steps/{step_id}/interact")
 async def interact_step(
@@ -96,6 +242,36 @@ async def interact_step(
 ):
     return session_service.interact_step(session_id, step_id, request.message)
 
+@router.post("/{session_id}/steps/{step_id}/voice")
+async def voice_turn(
+    session_id: uuid.UUID,
+    step_id: uuid.UUID,
+    request: VoiceTurnRequest,
+    session_service: SessionService = Depends(get_session_service)
+):
+    audio_stream = await run_in_threadpool(
+        session_service.voice_turn, session_id, step_id, request.message, request.tier
+    )
+    return StreamingResponse(audio_stream, media_type="audio/mpeg")
+
+@router.post("/{session_id}/steps/{step_id}/tests")
+async def run_step_tests(
+    session_id: uuid.UUID,
+    step_id: uuid.UUID,
+    request: StepTestRequest,
+    session_service: SessionService = Depends(get_session_service)
+):
+    return await run_in_threadpool(session_service.run_step_tests, session_id, step_id, request.code)
+
+@router.post("/{session_id}/steps/{step_id}/profile")
+async def profile_step_code(
+    session_id: uuid.UUID,
+    step_id: uuid.UUID,
+    request: StepTestRequest,
+    session_service: SessionService = Depends(get_session_service)
+):
+    return await run_in_threadpool(session_service.profile_step_code, session_id, step_id, request.code)
+
 @router.post("/{session_id}/steps/{step_id}/complete")
 async def complete_step(
     session_id: uuid.UUID,
@@ -114,13 +290,9 @@ async def research_session(
 @router.get("/{session_id}/research/status")
 async def get_research_status(
     session_id: uuid.UUID,
-    session_service: SessionService = Depends(get_session_service)
+    session_service: SessionService = Depends(get_read_session_service)
 ):
-    session = session_service.get_session(session_id)
-    return {
-        "status": session.research_status,
-        "data": session.research_data
-    }
+    return session_service.get_research_view(session_id)
 
 @router.post("/{session_id}/close")
 async def close_session(
@@ -1,7 +1,11 @@
-from fastapi import APIRouter, HTTPException, Query
-from fastapi.responses import StreamingResponse
-from typing import Optional
-from ..services.tts import get_tts_service
+from fastapi import APIRouter, HTTPException, Query, Request, Response
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import FileResponse, StreamingResponse
+from starlette.background import BackgroundTask
+from typing import Iterator, Optional
+import os
+from ..services.tts import get_tts_service, TTSBusyError
+from ..services.audio_cache import audio_cache
 
 router = APIRouter(
     prefix="/speech",
@@ -9,14 +13,70 @@ router = APIRouter(
     responses={404: {"description": "Not found"}},
 )
 
+AUDIO_MAX_AGE = int(os.getenv("AUDIO_CACHE_MAX_AGE", 30 * 24 * 3600))
+
+def _stream_and_cache(audio_generator: Iterator[bytes], key: str) -> Iterator[bytes]:
+    chunks = []
+    for chunk in audio_generator:
+        chunks.append(chunk)
+        yield chunk
+    # Only cache complete audio; a disconnect closes the generator before this point
+    audio_cache.put(key, b"".join(chunks))
+
 @router.get("/generate")
-async def generate_speech(text: str = Query(...), tier: Optional[str] = Query("free")):
+async def generate_speech(
+    request: Request,
+    text: str = Query(...),
+    tier: Optional[str] = Query("free"),
+    chunked: bool = Query(False)
+):
     try:
-        tts_service = get_tts_service(tier)
-        audio_generator = tts_service.generate_speech(text)
-        return StreamingResponse(audio_generator, media_type="audio/mpeg")
+        tts_service = await run_in_threadpool(get_tts_service, tier)
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=f"Configuration Error: {e}")
+
+    # Chunked audio is a concatenation of per-sentence renders, so it gets its own key
+    audio_format = f"{tts_service.audio_format}+chunked" if chunked else tts_service.audio_format
+    key = audio_cache.make_key(text, tts_service.provider, tts_service.voice, audio_format)
+    headers = {
+        "ETag": f'"{key}"',
+        # The key covers everything that affects the audio, so it never changes
+        "Cache-Control": f"public, max-age={AUDIO_MAX_AGE}, immutable",
+    }
+
+    if request.headers.get("if-none-match") == headers["ETag"]:
+        return Response(status_code=304, headers=headers)
+
+    # Off the event loop: a local miss may go to S3
+    cached_path = await run_in_threadpool(audio_cache.checkout, key)
+    if cached_path:
+        # FileResponse honors Range / If-Range. It serves a private link to the entry,
+        # removed afterwards, so eviction by any worker can't cut the response short.
+        return FileResponse(cached_path, media_type=tts_service.media_type, headers=headers,
+                            background=BackgroundTask(os.remove, cached_path))
+
+    # Capacity is settled before the response starts, so a saturated provider is a 503
+    # rather than a 200 cut off mid-body
+    release = None
+    try:
+        if chunked:
+            # Each sentence takes its own slot as it is synthesized
+            if not tts_service.has_capacity():
+                raise TTSBusyError(f"{tts_service.provider} TTS is at capacity")
+            # Sentences are cached individually too, so shared boilerplate hits across replies
+            audio_generator = tts_service.generate_speech_chunked(text, cache=audio_cache)
+        else:
+            release = await run_in_threadpool(tts_service.reserve)
+            audio_generator = tts_service.generate_speech(text, release=release)
+    except TTSBusyError as e:
+        raise HTTPException(status_code=503, detail=str(e))
     except Exception as e:
         error_msg = str(e)
         if "OPENAI_API_KEY" in error_msg or "DefaultCredentialsError" in error_msg:
              raise HTTPException(status_code=400, detail=f"Configuration Error: {error_msg}")
         raise HTTPException(status_code=500, detail=str(e))
+
+    # The generator releases the slot when it ends; the background task covers
+    # a stream that is dropped before it is first iterated
+    return StreamingResponse(_stream_and_cache(audio_generator, key), media_type=tts_service.media_type, headers=headers,
+                             background=BackgroundTask(release) if release else None)
@@ -14,12 +14,18 @@ if GEMINI_API_KEY:
 
 from .strategies import ScreeningStrategy, BehavioralStrategy, TechnicalStrategy, SystemDesignStrategy
 from ..core.logger import get_logger
+from ..core.metrics import LLM_CALL_SECONDS, LLM_FIRST_CHUNK_SECONDS, LLM_RETRIES, observe, record_llm_usage
 
 logger = get_logger(__name__)
 
 import time
+from typing import Iterator
 from google.api_core import exceptions
 
+def _step_label(step_type) -> str:
+    # StepType members format as "StepType.X"; metrics want the plain value
+    return getattr(step_type, "value", step_type)
+
 class AIService:
     def __init__(self):
         self.model_name = 'gemini-2.0-flash'
@@ -30,10 +36,83 @@ class AIService:
             "system_design": SystemDesignStrategy()
         }
 
-    def generate_response(self, context: str, history: list, user_message: str, step_type: str = "screening", role_level: str = "mid", roadmap: list = None, remaining_time: int = None) -> str:
+    def generate_response(self, context: str, history: list, user_message: str, step_type: str = "screening", role_level: str = "mid", roadmap: list = None, remaining_time: int = None, problem: dict = None) -> str:
         if not client:
             return "Gemini API Key not configured. Mock response."
             
+        prompt = self._build_prompt(context, history, user_message, step_type, role_level, roadmap, remaining_time, problem)
+        
+        retries = 3
+        for attempt in range(retries):
+            try:
+                logger.info(f"Generating AI response for step: {step_type} (Attempt {attempt + 1})...")
+                return self._generate("generate", _step_label(step_type), prompt)
+            except Exception as e:
+                LLM_RETRIES.labels("generate", _step_label(step_type)).inc()
+                # Basic retry logic, catching general exception as genai exceptions might differ
+                wait_time = (2 ** attempt) + 1 # 2, 3, 5 seconds
+                logger.warning(f"Error or quota exceeded. Retrying in {wait_time} seconds... Error: {e}")
+                time.sleep(wait_time)
+        
+        return "Sorry, the AI service is currently busy. Please try again later."
+
+    def generate_response_stream(self, context: str, history: list, user_message: str, step_type: str = "screening", role_level: str = "mid", roadmap: list = None, remaining_time: int = None, problem: dict = None) -> Iterator[str]:
+        """
+        Same as generate_response, but yields text as Gemini produces it.
+        Retries only happen before the first chunk has been yielded.
+        """
+        if not client:
+            yield "Gemini API Key not configured. Mock response."
+            return
+            
+        prompt = self._build_prompt(context, history, user_message, step_type, role_level, roadmap, remaining_time, problem)
+        step_label = _step_label(step_type)
+        
+        retries = 3
+        for attempt in range(retries):
+            started = False
+            last_chunk = None
+            try:
+                logger.info(f"Streaming AI response for step: {step_type} (Attempt {attempt + 1})...")
+                # Covers the time the consumer spends between chunks too, i.e. the whole turn
+                with observe(LLM_CALL_SECONDS, call_site="stream", step_type=step_label):
+                    attempt_start = time.perf_counter()
+                    for chunk in client.models.generate_content_stream(
+                        model=self.model_name,
+                        contents=prompt
+                    ):
+                        last_chunk = chunk
+                        if chunk.text:
+                            if not started:
+                                LLM_FIRST_CHUNK_SECONDS.labels("stream", step_label).observe(time.perf_counter() - attempt_start)
+                            started = True
+                            yield chunk.text
+                # Usage totals arrive on the final chunk
+                record_llm_usage("stream", step_label, last_chunk)
+                return
+            except Exception as e:
+                if started:
+                    # Part of the reply is already out; a retry would repeat it
+                    logger.error(f"AI stream interrupted: {e}")
+                    return
+                LLM_RETRIES.labels("stream", step_label).inc()
+                wait_time = (2 ** attempt) + 1 # 2, 3, 5 seconds
+                logger.warning(f"Error or quota exceeded. Retrying in {wait_time} seconds... Error: {e}")
+                time.sleep(wait_time)
+        
+        yield "Sorry, the AI service is currently busy. Please try again later."
+
+    def _generate(self, call_site: str, step_type: str, prompt: str) -> str:
+        # One attempt, timed and token-counted per call site
+        with observe(LLM_CALL_SECONDS, call_site=call_site, step_type=step_type):
+            response = client.models.generate_content(
+                model=self.model_name,
+                contents=prompt
+            )
+        record_llm_usage(call_site, step_type, response)
+        return response.text
+
+    def _build_prompt(self, context: str, history: list, user_message: str, step_type: str, role_level: str, roadmap: list = None, remaining_time: int = None, problem: dict = None) -> str:
         strategy = self.strategies.get(step_type, self.strategies["screening"])
         
         # Construct prompt
@@ -55,43 +134,28 @@ class AIService:
         elif len(history) == 0: # First turn
             roadmap_instruction = "\nTASK: Create a concise 3-5 item roadmap for this interview step based on the duration. List the roadmap items at the start of your response in a block like <roadmap>Item 1, Item 2, Item 3</roadmap>.\n"
 
-        prompt = strategy.get_prompt(context, truncated_history, user_message, role_level)
+        # Only the technical strategy takes a pinned problem
+        strategy_args = {"problem": problem} if problem else {}
+        prompt = strategy.get_prompt(context, truncated_history, user_message, role_level, **strategy_args)
         prompt += time_instruction + roadmap_instruction
-        
-        retries = 3
-        for attempt in range(retries):
-            try:
-                logger.info(f"Generating AI response for step: {step_type} (Attempt {attempt + 1})...")
-                response = client.models.generate_content(
-                    model=self.model_name,
-                    contents=prompt
-                )
-                return response.text
-            except Exception as e:
-                # Basic retry logic, catching general exception as genai exceptions might differ
-                wait_time = (2 ** attempt) + 1 # 2, 3, 5 seconds
-                logger.warning(f"Error or quota exceeded. Retrying in {wait_time} seconds... Error: {e}")
-                time.sleep(wait_time)
-        
-        return "Sorry, the AI service is currently busy. Please try again later."
+        return prompt
 
-    def evaluate_step(self, context: str, history: list, step_type: str) -> str:
+    def evaluate_step(self, context: str, history: list, step_type: str, code_results: dict = None) -> str:
         if not client:
             return "Gemini API Key not configured. Mock evaluation."
             
         strategy = self.strategies.get(step_type, self.strategies["screening"])
-        prompt = strategy.evaluate(context, history)
+        # Objective code results only exist for technical steps
+        strategy_args = {"code_results": code_results} if code_results else {}
+        prompt = strategy.evaluate(context, history, **strategy_args)
         
         retries = 3
         for attempt in range(retries):
             try:
                 logger.info(f"Generating evaluation for step: {step_type} (Attempt {attempt + 1})...")
-                response = client.models.generate_content(
-                    model=self.model_name,
-                    contents=prompt
-                )
-                return response.text
+                return self._generate("evaluate", _step_label(step_type), prompt)
             except Exception as e:
+                LLM_RETRIES.labels("evaluate", _step_label(step_type)).inc()
                 logger.error(f"Error generating evaluation: {e}")
                 time.sleep(2 ** attempt)
         
@@ -138,12 +202,9 @@ class AIService:
         for attempt in range(retries):
             try:
                 logger.info(f"Generating HM feedback (Attempt {attempt + 1})...")
-                response = client.models.generate_content(
-                    model=self.model_name,
-                    contents=prompt
-                )
-                return response.text
+                return self._generate("hiring_manager", "none", prompt)
             except Exception as e:
+                LLM_RETRIES.labels("hiring_manager", "none").inc()
                 logger.error(f"Error generating HM feedback: {e}")
                 time.sleep(2 ** attempt)
         
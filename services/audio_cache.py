@@ -0,0 +1,195 @@
+import os
+import uuid
+import hashlib
+import tempfile
+import time
+import fcntl
+from contextlib import contextmanager
+from typing import Optional
+from ..core.logger import get_logger
+
+logger = get_logger(__name__)
+
+AUDIO_CACHE_DIR = os.getenv("AUDIO_CACHE_DIR", "backend/audio_cache")
+AUDIO_CACHE_MAX_BYTES = int(os.getenv("AUDIO_CACHE_MAX_BYTES", 512 * 1024 * 1024))
+# Optional shared tier in object storage so all API replicas reuse each other's audio
+AUDIO_CACHE_S3 = os.getenv("AUDIO_CACHE_S3", "false").lower() == "true"
+AUDIO_CACHE_S3_PREFIX = "audio"
+CHECKOUT_SUFFIX = ".out"
+# Checkout links and partial writes this old were left by processes that died mid-request
+STALE_FILE_SECONDS = 3600
+# Eviction goes below the bound so the next puts don't each trigger a directory scan
+EVICT_TO_FRACTION = 0.9
+LEDGER_NAME = ".ledger"
+
+class AudioCache:
+    """
+    Disk-backed LRU cache of synthesized audio, bounded by total size in bytes.
+    Entries are immutable: the key hashes everything that affects the audio.
+
+    The directory is the index, so every process sharing it (API workers,
+    replicas on one volume) sees the others' entries. A hit bumps the entry's
+    mtime; the running size total lives in a ledger file updated under flock,
+    and eviction rescans the directory and removes the oldest mtimes.
+    """
+    def __init__(self, cache_dir: str = AUDIO_CACHE_DIR, max_bytes: int = AUDIO_CACHE_MAX_BYTES):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        os.makedirs(self.cache_dir, exist_ok=True)
+        with self._ledger() as ledger:
+            total = self._evict(ledger, self.max_bytes, clean_stale=True)
+        logger.info(f"Audio cache ready: {total} bytes in {self.cache_dir}")
+
+    @staticmethod
+    def make_key(text: str, provider: str, voice: str, audio_format: str) -> str:
+        payload = "\x1f".join([provider, voice, audio_format, text])
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def path_for(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key[:2], key)
+
+    def get(self, key: str) -> Optional[str]:
+        """
+        Returns the local path of a cached entry, or None on a miss.
+        """
+        path = self.path_for(key)
+        try:
+            os.utime(path) # Most recently used, for every process's eviction
+            return path
+        except FileNotFoundError:
+            pass
+
+        if AUDIO_CACHE_S3:
+            data = self._fetch_s3(key)
+            if data is not None:
+                return self.put(key, data, replicate=False)
+        return None
+
+    def checkout(self, key: str) -> Optional[str]:
+        """
+        Like get, but returns a private hard link to the entry, which eviction
+        (in this or another process sharing the directory) can't remove while
+        it's being served. The caller deletes the link when done. Blocking:
+        may fetch from S3.
+        """
+        path = self.get(key)
+        if path is None:
+            return None
+        link = f"{path}.{uuid.uuid4().hex}{CHECKOUT_SUFFIX}"
+        try:
+            os.link(path, link)
+        except FileNotFoundError:
+            return None # Evicted by another process since the lookup
+        return link
+
+    def put(self, key: str, data: bytes, replicate: bool = True) -> str:
+        path = self.path_for(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        try:
+            previous = os.path.getsize(path)
+        except FileNotFoundError:
+            previous = 0
+
+        # Write-then-rename so readers never see a partial file
+        fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".part")
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(temp_path, path)
+
+        with self._ledger() as ledger:
+            total = ledger.read() + len(data) - previous
+            if total > self.max_bytes:
+                self._evict(ledger, int(self.max_bytes * EVICT_TO_FRACTION))
+            else:
+                ledger.write(total)
+
+        if replicate and AUDIO_CACHE_S3:
+            self._store_s3(key, data)
+        return path
+
+    @contextmanager
+    def _ledger(self):
+        # Exclusive across processes and threads: each call opens its own descriptor
+        fd = os.open(os.path.join(self.cache_dir, LEDGER_NAME), os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX)
+            yield _Ledger(fd)
+        finally:
+            os.close(fd)
+
+    def _evict(self, ledger: "_Ledger", target_bytes: int, clean_stale: bool = False) -> int:
+        # Caller holds the ledger lock. The scan also corrects any drift in the ledger
+        # (e.g. two processes writing the same key at once).
+        now = time.time()
+        found = []
+        for root, _, files in os.walk(self.cache_dir):
+            for name in files:
+                file_path = os.path.join(root, name)
+                try:
+                    stat = os.stat(file_path)
+                except FileNotFoundError:
+                    continue
+                if name.endswith((CHECKOUT_SUFFIX, ".part")):
+                    # Links share the entry's inode, so they add no size of their own
+                    if clean_stale and now - stat.st_ctime > STALE_FILE_SECONDS:
+                        _remove(file_path)
+                    continue
+                if name.startswith("."):
+                    continue
+                found.append((stat.st_mtime, file_path, stat.st_size))
+
+        total = sum(size for _, _, size in found)
+        # Least recently used first
+        for _, file_path, size in sorted(found):
+            if total <= target_bytes:
+                break
+            _remove(file_path)
+            total -= size
+        ledger.write(total)
+        return total
+
+    def _fetch_s3(self, key: str) -> Optional[bytes]:
+        from .storage import storage_service
+        if not storage_service.s3_client:
+            return None
+        try:
+            response = storage_service.s3_client.get_object(
+                Bucket=storage_service.s3_bucket, Key=f"{AUDIO_CACHE_S3_PREFIX}/{key}"
+            )
+            return response["Body"].read()
+        except Exception:
+            return None
+
+    def _store_s3(self, key: str, data: bytes):
+        from .storage import storage_service
+        if not storage_service.s3_client:
+            return
+        try:
+            storage_service.s3_client.put_object(
+                Bucket=storage_service.s3_bucket, Key=f"{AUDIO_CACHE_S3_PREFIX}/{key}", Body=data
+            )
+        except Exception as e:
+            logger.warning(f"Failed to replicate audio cache entry to S3: {e}")
+
+class _Ledger:
+    """Running total of the cache's bytes, in a file shared by every process."""
+    def __init__(self, fd: int):
+        self.fd = fd
+
+    def read(self) -> int:
+        os.lseek(self.fd, 0, os.SEEK_SET)
+        raw = os.read(self.fd, 32)
+        return int(raw) if raw.strip().isdigit() else 0
+
+    def write(self, total: int):
+        os.lseek(self.fd, 0, os.SEEK_SET)
+        os.ftruncate(self.fd, 0)
+        os.write(self.fd, str(max(total, 0)).encode())
+
+def _remove(path: str):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+audio_cache = AudioCache()
@@ -1,24 +1,87 @@
-from typing import Optional
+from typing import Dict, Optional
 import os
+import re
+import time
+import uuid
+import threading
 from google.oauth2 import id_token
+from google.auth import transport
 from google.auth.transport import requests
 from fastapi import HTTPException, status
-from jose import jwt, JWTError
+from fastapi.concurrency import run_in_threadpool
+from jose import JWTError
 
-from ..core.models import User, AuthProvider
+from ..core.models import User, UserPrincipal, AuthProvider
 from ..repositories.user import UserRepository
-from ..core.security import get_password_hash, verify_password, create_access_token, SECRET_KEY, ALGORITHM
+from ..core.security import create_access_token, decode_access_token, password_hasher, PasswordHasherBusyError
+
+_MAX_AGE = re.compile(r"max-age=(\d+)")
+
+class CachingRequest(transport.Request):
+    """
+    google-auth transport that keeps one pooled HTTP session and caches GET
+    responses (Google's signing certs) for as long as their Cache-Control max-age allows.
+    """
+    def __init__(self):
+        self._request = requests.Request()
+        self._cache: Dict[str, tuple] = {}
+        self._lock = threading.Lock()
+
+    def __call__(self, url, method="GET", body=None, headers=None, timeout=None, **kwargs):
+        if method != "GET":
+            return self._request(url, method=method, body=body, headers=headers, timeout=timeout, **kwargs)
+
+        with self._lock:
+            cached = self._cache.get(url)
+        if cached and cached[0] > time.monotonic():
+            return cached[1]
+
+        response = self._request(url, method=method, body=body, headers=headers, timeout=timeout, **kwargs)
+        match = _MAX_AGE.search(response.headers.get("cache-control", ""))
+        if response.status == 200 and match:
+            with self._lock:
+                self._cache[url] = (time.monotonic() + int(match.group(1)), response)
+        return response
+
+_google_request = CachingRequest()
+
+def _credentials_exception() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Could not validate credentials",
+        headers={"WWW-Authenticate": "Bearer"},
+    )
+
+def issue_token(user: User) -> str:
+    # Identity claims ride in the token so most routes can authorize without the DB.
+    # They're a snapshot: a tier change shows up in tokens issued after it.
+    return create_access_token(data={
+        "sub": str(user.id),
+        "email": user.email,
+        "tier": user.subscription_tier,
+    })
+
+def decode_token(token: str) -> Dict:
+    """
+    Verifies the JWT and returns its claims, with "sub" parsed into a UUID.
+    """
+    try:
+        payload = decode_access_token(token)
+        payload["sub"] = uuid.UUID(payload["sub"])
+    except (JWTError, KeyError, TypeError, ValueError):
+        raise _credentials_exception()
+    return payload
 
 class AuthService:
     def __init__(self, user_repository: UserRepository):
         self.user_repository = user_repository
 
-    def signup(self, email: str, password: str) -> str:
+    async def signup(self, email: str, password: str) -> str:
         existing_user = self.user_repository.get_by_email(email)
         if existing_user:
             raise HTTPException(status_code=400, detail="Email already registered")
         
-        hashed_pw = get_password_hash(password)
+        hashed_pw = await self._hash_call(password_hasher.hash, password)
         new_user = User(
             email=email, 
             hashed_password=hashed_pw,
@@ -26,23 +89,24 @@ class AuthService:
         )
         self.user_repository.create(new_user)
         
-        return create_access_token(data={"sub": str(new_user.id)})
+        return issue_token(new_user)
 
-    def login(self, email: str, password: str) -> str:
+    async def login(self, email: str, password: str) -> str:
         user = self.user_repository.get_by_email(email)
-        if not user or not user.hashed_password or not verify_password(password, user.hashed_password):
+        if not user or not user.hashed_password or not await self._hash_call(password_hasher.verify, password, user.hashed_password):
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Incorrect username or password",
                 headers={"WWW-Authenticate": "Bearer"},
             )
         
-        return create_access_token(data={"sub": str(user.id)})
+        return issue_token(user)
 
-    def google_login(self, token: str) -> str:
+    async def google_login(self, token: str) -> str:
         try:
             client_id = os.getenv("GOOGLE_CLIENT_ID")
-            id_info = id_token.verify_oauth2_token(token, requests.Request(), client_id)
+            # Cert fetches (on cache miss) and RSA verification are blocking
+            id_info = await run_in_threadpool(id_token.verify_oauth2_token, token, _google_request, client_id)
             email = id_info['email']
             
             user = self.user_repository.get_by_email(email)
@@ -54,26 +118,20 @@ class AuthService:
                 )
                 self.user_repository.create(user)
             
-            return create_access_token(data={"sub": str(user.id)})
+            return issue_token(user)
             
         except ValueError as e:
             raise HTTPException(status_code=400, detail=f"Invalid Google token: {str(e)}")
 
-    def get_current_user(self, token: str) -> User:
-        credentials_exception = HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Could not validate credentials",
-            headers={"WWW-Authenticate": "Bearer"},
-        )
-        try:
-            payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-            user_id: str = payload.get("sub")
-            if user_id is None:
-                raise credentials_exception
-        except JWTError:
-            raise credentials_exception
-            
-        user = self.user_repository.get(user_id)
+    def get_current_user(self, token: str) -> UserPrincipal:
+        user_id = decode_token(token)["sub"]
+        user = self.user_repository.get_principal(user_id)
         if user is None:
-            raise credentials_exception
+            raise _credentials_exception()
         return user
+
+    async def _hash_call(self, fn, *args):
+        try:
+            return await fn(*args)
+        except PasswordHasherBusyError as e:
+            raise HTTPException(status_code=503, detail=str(e))
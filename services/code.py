@@ -1,6 +1,50 @@
-import io
-import contextlib
-import builtins
+import os
+import re
+import ast
+import hashlib
+from typing import Dict, List
+from ..core.cache import TieredCache
+from .sandbox import sandbox_pool, SandboxBusyError, SANDBOX_WALL_SECONDS, SANDBOX_CPU_SECONDS, PROFILE_INPUT_KINDS
+from .complexity import fit_complexity
+
+MAX_TEST_CASES = 50
+# Wall clock for a whole test batch; per-case CPU limits alone would allow minutes on one worker
+SANDBOX_TESTS_WALL_SECONDS = float(os.getenv("SANDBOX_TESTS_WALL_SECONDS", 30))
+PROFILE_CPU_SECONDS = 10
+PROFILE_BUDGET_SECONDS = 5
+# Peak memory below this is interpreter noise (frames, small temporaries), not growth
+PROFILE_SPACE_FLOOR_BYTES = 1024
+
+# Runs take no input and the sandbox exposes no clock, randomness or I/O, so a
+# submission's result is a function of its source. Limit hits are not cached
+# (they depend on load and on the configured limits).
+CODE_RESULT_CACHE_SIZE = int(os.getenv("CODE_RESULT_CACHE_SIZE", 2048))
+CODE_RESULT_CACHE_TTL = int(os.getenv("CODE_RESULT_CACHE_TTL", 24 * 3600))
+UNCACHEABLE_ERRORS = (
+    "Time limit exceeded", "CPU time limit exceeded", "Memory limit exceeded",
+    "Output limit exceeded", "Code runner crashed",
+)
+
+# Generator, coroutine, frame, traceback and code object internals: a running generator's
+# gi_frame.f_back is the sandbox worker's own frame, and its f_globals/f_builtins are unrestricted
+BLOCKED_ATTRIBUTES = frozenset({
+    "gi_frame", "gi_code", "gi_yieldfrom", "cr_frame", "cr_code", "cr_await", "cr_origin",
+    "ag_frame", "ag_code", "ag_await", "f_back", "f_globals", "f_locals", "f_builtins", "f_code",
+    "f_trace", "tb_frame", "tb_next", "co_code", "co_consts", "mro",
+})
+# Not in the sandbox's builtins, but rejected too in case they're reached some other way
+BLOCKED_CALLS = frozenset({
+    "getattr", "setattr", "delattr", "vars", "type", "dir", "globals", "locals", "compile", "breakpoint",
+})
+_BLOCKED_IN_STRING = re.compile(r"(?!__main__\b)__\w+__|\b(?:%s)\b" % "|".join(sorted(BLOCKED_ATTRIBUTES)))
+
+def _is_dunder(name: str) -> bool:
+    return name.startswith("__") and name.endswith("__")
+
+def _is_blocked_attribute(name: str) -> bool:
+    return _is_dunder(name) or name in BLOCKED_ATTRIBUTES
+
+_run_results = TieredCache("code:run", maxsize=CODE_RESULT_CACHE_SIZE, ttl=CODE_RESULT_CACHE_TTL)
 
 class CodeService:
     def _is_safe_code(self, code: str) -> bool:
@@ -13,44 +57,114 @@ class CodeService:
         for keyword in dangerous_keywords:
             if keyword in code:
                 return False
-        return True
+        return not self._has_unsafe_access(code)
+
+    def _has_unsafe_access(self, code: str) -> bool:
+        # obj.__class__, gen.gi_frame.f_back.f_globals etc. walk from any value to unrestricted
+        # objects. Attribute lookups by string name are rejected with them, including the ones
+        # str.format does for "{0.gi_frame}"
+        try:
+            tree = ast.parse(code)
+        except SyntaxError:
+            return False # Reported by the sandbox
+        for node in ast.walk(tree):
+            if isinstance(node, ast.Attribute) and _is_blocked_attribute(node.attr):
+                return True
+            if isinstance(node, ast.Name) and _is_dunder(node.id) and node.id != "__name__":
+                return True
+            if isinstance(node, ast.Call) and isinstance(node.func, ast.Name) and node.func.id in BLOCKED_CALLS:
+                return True
+            if isinstance(node, ast.Constant) and isinstance(node.value, str) and _BLOCKED_IN_STRING.search(node.value):
+                return True
+        return False
 
     def run_code(self, code: str) -> str:
         if not self._is_safe_code(code):
             return "Error: Security violation. Dangerous keywords detected."
 
-        output = io.StringIO()
+        key = hashlib.sha256(code.encode()).hexdigest()
+        result = _run_results.get(key)
+        if result is None:
+            # Runs in a sandbox worker process with restricted builtins and resource limits
+            try:
+                result = sandbox_pool.execute({"kind": "run", "code": code})
+            except SandboxBusyError as e:
+                return f"Error: {str(e)}"
+            if result["error"] not in UNCACHEABLE_ERRORS:
+                _run_results.set(key, {"output": result["output"], "error": result["error"]})
+
+        if result["error"]:
+            return f"Error: {result['error']}"
+        return result["output"]
+
+    def run_tests(self, code: str, function_name: str, test_cases: List[Dict], unordered: bool = False) -> Dict:
+        """
+        Runs a batch of test cases against one function in a single sandbox job.
+        Returns per-case pass/fail, output and wall/CPU times.
+        """
+        failure = {"results": [], "passed": 0, "total": len(test_cases)}
+        if not self._is_safe_code(code):
+            return {**failure, "error": "Security violation. Dangerous keywords detected."}
+        if len(test_cases) > MAX_TEST_CASES:
+            return {**failure, "error": f"Too many test cases (max {MAX_TEST_CASES})."}
+
+        job = {
+            "kind": "tests",
+            "code": code,
+            "function_name": function_name,
+            "test_cases": test_cases,
+            "unordered": unordered,
+        }
+        # Each case has its own CPU budget (rounded up a second by the rlimit);
+        # the wall clock covers the whole batch, up to a fixed cap
+        wall_seconds = min(SANDBOX_WALL_SECONDS + len(test_cases) * (SANDBOX_CPU_SECONDS + 1), SANDBOX_TESTS_WALL_SECONDS)
+        try:
+            result = sandbox_pool.execute(job, wall_seconds=wall_seconds)
+        except SandboxBusyError as e:
+            return {**failure, "error": str(e)}
+
+        if "results" not in result:
+            # The worker was killed or crashed before reporting
+            return {**failure, "error": result["error"]}
+        return result
+
+    def profile_complexity(self, code: str, function_name: str, input_kind: str) -> Dict:
+        """
+        Measures runtime and peak memory on inputs of growing size and fits them
+        against O(1)..O(n^2) to estimate time and space complexity.
+        """
+        failure = {"time_complexity": None, "space_complexity": None, "samples": []}
+        if not self._is_safe_code(code):
+            return {**failure, "error": "Security violation. Dangerous keywords detected."}
+        if input_kind not in PROFILE_INPUT_KINDS:
+            return {**failure, "error": f"Unknown input kind '{input_kind}'."}
+
+        job = {
+            "kind": "profile",
+            "code": code,
+            "function_name": function_name,
+            "input_kind": input_kind,
+            "cpu_seconds": PROFILE_CPU_SECONDS,
+            "budget_seconds": PROFILE_BUDGET_SECONDS,
+        }
         try:
-            # Capture stdout
-            with contextlib.redirect_stdout(output):
-                # Restricted globals
-                safe_globals = {
-                    "__name__": "__main__",
-                    "__builtins__": {
-                        "print": builtins.print,
-                        "range": builtins.range,
-                        "len": builtins.len,
-                        "int": builtins.int,
-                        "str": builtins.str,
-                        "list": builtins.list,
-                        "dict": builtins.dict,
-                        "set": builtins.set,
-                        "bool": builtins.bool,
-                        "float": builtins.float,
-                        "sum": builtins.sum,
-                        "min": builtins.min,
-                        "max": builtins.max,
-                        "abs": builtins.abs,
-                        "round": builtins.round,
-                        "sorted": builtins.sorted,
-                        "enumerate": builtins.enumerate,
-                        "zip": builtins.zip,
-                        "map": builtins.map,
-                        "filter": builtins.filter,
-                    }
-                }
-                exec(code, safe_globals)
-                
-            return output.getvalue()
-        except Exception as e:
-            return f"Error: {str(e)}"
+            result = sandbox_pool.execute(job, wall_seconds=PROFILE_CPU_SECONDS + SANDBOX_WALL_SECONDS)
+        except SandboxBusyError as e:
+            return {**failure, "error": str(e)}
+
+        samples = result.get("samples", [])
+        if result["error"] and not samples:
+            return {**failure, "error": result["error"]}
+
+        sizes = [sample["n"] for sample in samples]
+        time_fit = fit_complexity(sizes, [sample["time"] for sample in samples])
+        space_fit = fit_complexity(sizes, [sample["peak_bytes"] + PROFILE_SPACE_FLOOR_BYTES for sample in samples])
+        return {
+            "error": result["error"],
+            "time_complexity": time_fit["estimate"],
+            "space_complexity": space_fit["estimate"],
+            "samples": samples,
+            "fits": {"time": time_fit["residuals"], "space": space_fit["residuals"]},
+        }
+
+code_service = CodeService()
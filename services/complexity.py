@@ -0,0 +1,64 @@
+import numpy as np
+from typing import Dict, List
+
+# Candidate growth models, simplest first (ties go to the simpler model)
+COMPLEXITY_MODELS = {
+    "O(1)": lambda n: np.ones_like(n),
+    "O(log n)": lambda n: np.log2(n),
+    "O(n)": lambda n: n,
+    "O(n log n)": lambda n: n * np.log2(n),
+    "O(n^2)": lambda n: n ** 2,
+}
+
+# A more complex model must beat a simpler one by this margin (relative, or absolute
+# in weighted RMS error) to be chosen; timings and peaks are never perfectly clean
+SIMPLER_MODEL_TOLERANCE = 1.1
+SIMPLER_MODEL_SLACK = 0.1
+
+def fit_complexity(sizes: List[int], values: List[float]) -> Dict:
+    """
+    Fits values ~ a * f(n) + b for every model at once and picks the best.
+    Errors are weighted by 1/value so small and large n count equally,
+    which matters because measurements span several orders of magnitude.
+    """
+    n = np.asarray(sizes, dtype=float)
+    y = np.asarray(values, dtype=float)
+    if len(n) < 3:
+        return {"estimate": None, "residuals": {}}
+
+    names = list(COMPLEXITY_MODELS)
+    features = np.vstack([COMPLEXITY_MODELS[name](n) for name in names]) # (models, samples)
+    weights = 1.0 / np.maximum(y, 1e-12)
+
+    # Weighted least squares per model via the 2x2 normal equations, solved for all models together
+    x1 = features * weights
+    x0 = np.broadcast_to(weights, features.shape)
+    target = np.ones_like(y) # y * weights
+    s11 = (x1 * x1).sum(axis=1)
+    s10 = (x1 * x0).sum(axis=1)
+    s00 = (x0 * x0).sum(axis=1)
+    r1 = (x1 * target).sum(axis=1)
+    r0 = (x0 * target).sum(axis=1)
+    det = s11 * s00 - s10 ** 2
+
+    singular = np.abs(det) <= 1e-12 * np.maximum(s11 * s00, 1e-300)
+    safe_det = np.where(singular, 1.0, det)
+    slope = np.where(singular, 0.0, (r1 * s00 - r0 * s10) / safe_det)
+    intercept = np.where(singular, r0 / s00, (r0 * s11 - r1 * s10) / safe_det)
+
+    # A negative slope means the model doesn't describe growth; fall back to a constant fit
+    negative = slope < 0
+    slope = np.where(negative, 0.0, slope)
+    intercept = np.where(negative, r0 / s00, intercept)
+
+    predicted = slope[:, None] * features + intercept[:, None]
+    residuals = np.sqrt((((predicted - y) * weights) ** 2).mean(axis=1))
+
+    best = int(np.argmin(residuals))
+    threshold = max(residuals[best] * SIMPLER_MODEL_TOLERANCE, residuals[best] + SIMPLER_MODEL_SLACK)
+    best = int(np.argmax(residuals <= threshold)) # first (simplest) model within the threshold
+
+    return {
+        "estimate": names[best],
+        "residuals": {name: round(float(residual), 4) for name, residual in zip(names, residuals)},
+    }
@@ -1,10 +1,28 @@
 import os
+import re
+from typing import Dict, Iterable, Optional
 from pypdf import PdfReader
 from docx import Document
 from ..core.logger import get_logger
 
 logger = get_logger(__name__)
 
+# Heading aliases used to segment a parsed resume into sections
+SECTION_HEADINGS = {
+    "summary": ("summary", "professional summary", "profile", "about", "about me", "objective"),
+    "experience": ("experience", "work experience", "professional experience", "employment", "employment history", "work history"),
+    "skills": ("skills", "technical skills", "core competencies", "technologies", "tech stack"),
+    "projects": ("projects", "personal projects", "selected projects", "side projects", "open source"),
+    "education": ("education", "academic background", "certifications", "education and certifications"),
+}
+
+SECTION_CHAR_LIMIT = 1500
+DIGEST_CHAR_LIMIT = 2000
+DEFAULT_DIGEST_ORDER = ("summary", "experience", "skills", "projects", "education")
+
+_HEADING_LOOKUP = {alias: name for name, aliases in SECTION_HEADINGS.items() for alias in aliases}
+_HEADING_CLEANUP = re.compile(r"[^a-z& ]+")
+
 class ParserService:
     def parse_resume(self, file_input, filename: str = "") -> str:
         """
@@ -53,4 +71,63 @@ class ParserService:
         text = "\n".join([para.text for para in doc.paragraphs])
         return text
 
+    def segment_resume(self, text: str) -> Dict[str, str]:
+        """
+        Splits parsed resume text into known sections (experience, skills, ...).
+        Anything before the first recognised heading is kept as "header".
+        Each section is bounded to SECTION_CHAR_LIMIT characters.
+        """
+        sections: Dict[str, list] = {}
+        current = "header"
+        for raw_line in text.splitlines():
+            line = raw_line.strip()
+            if not line:
+                continue
+            heading = self._match_heading(line)
+            if heading:
+                current = heading
+                sections.setdefault(current, [])
+                continue
+            sections.setdefault(current, []).append(line)
+
+        return {
+            name: self._truncate("\n".join(lines), SECTION_CHAR_LIMIT)
+            for name, lines in sections.items()
+            if lines
+        }
+
+    def build_digest(self, sections: Dict[str, str], order: Optional[Iterable[str]] = None, limit: int = DIGEST_CHAR_LIMIT) -> str:
+        """
+        Assembles a size-bounded digest from resume sections, in the given order of priority.
+        """
+        parts = []
+        remaining = limit
+        for name in order or DEFAULT_DIGEST_ORDER:
+            content = sections.get(name)
+            if not content or remaining <= 0:
+                continue
+            block = self._truncate(f"{name.capitalize()}:\n{content}", remaining)
+            parts.append(block)
+            remaining -= len(block) + 2
+        
+        # No recognised headings: fall back to the leading text
+        if not parts and sections.get("header"):
+            parts.append(self._truncate(sections["header"], limit))
+        return "\n\n".join(parts)
+
+    def _match_heading(self, line: str) -> Optional[str]:
+        # Headings are short lines like "EXPERIENCE" or "Technical Skills:"
+        if len(line) > 40:
+            return None
+        normalized = _HEADING_CLEANUP.sub("", line.lower()).strip()
+        return _HEADING_LOOKUP.get(normalized)
+
+    def _truncate(self, text: str, limit: int) -> str:
+        if len(text) <= limit:
+            return text
+        # Prefer cutting at a line break so we don't end mid-bullet
+        cut = text[:limit]
+        newline = cut.rfind("\n")
+        return cut[:newline] if newline > limit // 2 else cut
+
 parser_service = ParserService()
@@ -0,0 +1,130 @@
+from typing import Dict, Optional
+
+# Test suites for common problems, keyed by lowercase LeetCode title.
+# "unordered" compares sorted results for problems that accept any order;
+# "profile_input" is the generated input shape used by the complexity profiler.
+PROBLEM_TEST_SUITES = {
+    "two sum": {
+        "function_name": "twoSum",
+        "profile_input": "int_list_target",
+        "unordered": True,
+        "test_cases": [
+            {"args": [[2, 7, 11, 15], 9], "expected": [0, 1]},
+            {"args": [[3, 2, 4], 6], "expected": [1, 2]},
+            {"args": [[3, 3], 6], "expected": [0, 1]},
+            {"args": [[-1, -2, -3, -4, -5], -8], "expected": [2, 4]},
+        ],
+    },
+    "valid parentheses": {
+        "function_name": "isValid",
+        "profile_input": "brackets",
+        "test_cases": [
+            {"args": ["()"], "expected": True},
+            {"args": ["()[]{}"], "expected": True},
+            {"args": ["(]"], "expected": False},
+            {"args": ["([)]"], "expected": False},
+            {"args": ["{[]}"], "expected": True},
+            {"args": ["["], "expected": False},
+        ],
+    },
+    "best time to buy and sell stock": {
+        "function_name": "maxProfit",
+        "profile_input": "int_list",
+        "test_cases": [
+            {"args": [[7, 1, 5, 3, 6, 4]], "expected": 5},
+            {"args": [[7, 6, 4, 3, 1]], "expected": 0},
+            {"args": [[1]], "expected": 0},
+            {"args": [[2, 4, 1]], "expected": 2},
+        ],
+    },
+    "contains duplicate": {
+        "function_name": "containsDuplicate",
+        "profile_input": "int_list",
+        "test_cases": [
+            {"args": [[1, 2, 3, 1]], "expected": True},
+            {"args": [[1, 2, 3, 4]], "expected": False},
+            {"args": [[1, 1, 1, 3, 3, 4, 3, 2, 4, 2]], "expected": True},
+            {"args": [[]], "expected": False},
+        ],
+    },
+    "valid anagram": {
+        "function_name": "isAnagram",
+        "profile_input": "string_pair",
+        "test_cases": [
+            {"args": ["anagram", "nagaram"], "expected": True},
+            {"args": ["rat", "car"], "expected": False},
+            {"args": ["a", "ab"], "expected": False},
+        ],
+    },
+    "maximum subarray": {
+        "function_name": "maxSubArray",
+        "profile_input": "int_list",
+        "test_cases": [
+            {"args": [[-2, 1, -3, 4, -1, 2, 1, -5, 4]], "expected": 6},
+            {"args": [[1]], "expected": 1},
+            {"args": [[5, 4, -1, 7, 8]], "expected": 23},
+            {"args": [[-3, -1, -2]], "expected": -1},
+        ],
+    },
+    "climbing stairs": {
+        "function_name": "climbStairs",
+        "profile_input": "int",
+        "test_cases": [
+            {"args": [1], "expected": 1},
+            {"args": [2], "expected": 2},
+            {"args": [3], "expected": 3},
+            {"args": [10], "expected": 89},
+            {"args": [45], "expected": 1836311903},
+        ],
+    },
+    "longest substring without repeating characters": {
+        "function_name": "lengthOfLongestSubstring",
+        "profile_input": "string",
+        "test_cases": [
+            {"args": ["abcabcbb"], "expected": 3},
+            {"args": ["bbbbb"], "expected": 1},
+            {"args": ["pwwkew"], "expected": 3},
+            {"args": [""], "expected": 0},
+            {"args": ["dvdf"], "expected": 3},
+        ],
+    },
+    "product of array except self": {
+        "function_name": "productExceptSelf",
+        "profile_input": "int_list",
+        "test_cases": [
+            {"args": [[1, 2, 3, 4]], "expected": [24, 12, 8, 6]},
+            {"args": [[-1, 1, 0, -3, 3]], "expected": [0, 0, 9, 0, 0]},
+        ],
+    },
+    "merge intervals": {
+        "function_name": "merge",
+        "profile_input": "intervals",
+        "test_cases": [
+            {"args": [[[1, 3], [2, 6], [8, 10], [15, 18]]], "expected": [[1, 6], [8, 10], [15, 18]]},
+            {"args": [[[1, 4], [4, 5]]], "expected": [[1, 5]]},
+            {"args": [[[1, 4], [0, 4]]], "expected": [[0, 4]]},
+        ],
+    },
+    "binary search": {
+        "function_name": "search",
+        "profile_input": "sorted_int_list_target",
+        "test_cases": [
+            {"args": [[-1, 0, 3, 5, 9, 12], 9], "expected": 4},
+            {"args": [[-1, 0, 3, 5, 9, 12], 2], "expected": -1},
+            {"args": [[5], 5], "expected": 0},
+        ],
+    },
+    "group anagrams": {
+        "function_name": "groupAnagrams",
+        "profile_input": "word_list",
+        "unordered": True,
+        "test_cases": [
+            {"args": [["eat", "tea", "tan", "ate", "nat", "bat"]], "expected": [["ate", "eat", "tea"], ["bat"], ["nat", "tan"]]},
+            {"args": [[""]], "expected": [[""]]},
+            {"args": [["a"]], "expected": [["a"]]},
+        ],
+    },
+}
+
+def get_test_suite(title: str) -> Optional[Dict]:
+    return PROBLEM_TEST_SUITES.get((title or "").strip().lower())
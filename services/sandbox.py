@@ -0,0 +1,511 @@
+import gc
+import io
+import os
+import json
+import hashlib
+import time
+import queue
+import random
+import signal
+import string
+import tracemalloc
+import builtins
+import threading
+import contextlib
+import multiprocessing
+from typing import Dict, Optional
+from ..core.logger import get_logger
+from ..core.cache import LRUCache
+from ..core.metrics import CODE_RUN_SECONDS
+
+try:
+    import resource
+except ImportError: # Non-POSIX platforms: no rlimits, wall-clock kill only
+    resource = None
+
+logger = get_logger(__name__)
+
+SANDBOX_WORKERS = int(os.getenv("SANDBOX_WORKERS", os.cpu_count() or 2))
+SANDBOX_MAX_QUEUE = int(os.getenv("SANDBOX_MAX_QUEUE", 32)) # runs allowed to wait for a worker
+SANDBOX_QUEUE_TIMEOUT = float(os.getenv("SANDBOX_QUEUE_TIMEOUT", 10))
+SANDBOX_CPU_SECONDS = int(os.getenv("SANDBOX_CPU_SECONDS", 2))
+SANDBOX_WALL_SECONDS = float(os.getenv("SANDBOX_WALL_SECONDS", 5))
+SANDBOX_MEMORY_MB = int(os.getenv("SANDBOX_MEMORY_MB", 256))
+SANDBOX_MAX_OUTPUT = int(os.getenv("SANDBOX_MAX_OUTPUT", 64 * 1024)) # characters
+SANDBOX_RECYCLE_AFTER = int(os.getenv("SANDBOX_RECYCLE_AFTER", 100)) # runs per worker
+SANDBOX_CODE_CACHE_SIZE = int(os.getenv("SANDBOX_CODE_CACHE_SIZE", 256)) # compiled submissions per worker
+# Workers drop to this user when the API runs as root (default: nobody)
+SANDBOX_UID = int(os.getenv("SANDBOX_UID", 65534))
+SANDBOX_GID = int(os.getenv("SANDBOX_GID", 65534))
+# The only environment variables a worker keeps; the API's secrets must not reach candidate code
+SANDBOX_ENV_ALLOWLIST = ("PATH", "LANG", "LC_ALL", "TZ")
+
+PROFILE_INPUT_KINDS = (
+    "int", "int_list", "int_list_target", "sorted_int_list_target",
+    "string", "string_pair", "brackets", "intervals", "word_list",
+)
+
+SAFE_BUILTINS = {
+    "print": builtins.print,
+    "range": builtins.range,
+    "len": builtins.len,
+    "int": builtins.int,
+    "str": builtins.str,
+    "list": builtins.list,
+    "dict": builtins.dict,
+    "set": builtins.set,
+    "bool": builtins.bool,
+    "float": builtins.float,
+    "sum": builtins.sum,
+    "min": builtins.min,
+    "max": builtins.max,
+    "abs": builtins.abs,
+    "round": builtins.round,
+    "sorted": builtins.sorted,
+    "enumerate": builtins.enumerate,
+    "zip": builtins.zip,
+    "map": builtins.map,
+    "filter": builtins.filter,
+    # Needed for `class Solution:` style submissions; CodeService rejects dunder
+    # attribute access (obj.__class__...), which classes would otherwise add to
+    "__build_class__": builtins.__build_class__,
+}
+
+class SandboxBusyError(Exception):
+    pass
+
+class _CPUTimeExceeded(BaseException):
+    # BaseException so candidate code can't swallow it with `except Exception`
+    pass
+
+class _OutputLimitExceeded(BaseException):
+    pass
+
+class _LimitedOutput(io.StringIO):
+    def __init__(self, limit: int):
+        super().__init__()
+        self.limit = limit
+        self.size = 0
+
+    def write(self, s: str) -> int:
+        self.size += len(s)
+        if self.size > self.limit:
+            raise _OutputLimitExceeded()
+        return super().write(s)
+
+# --- Worker process side ---
+
+def _on_cpu_limit(signum, frame):
+    raise _CPUTimeExceeded()
+
+def _isolate(conn):
+    """
+    Runs before any job: the worker is forked from the API and would otherwise
+    inherit its environment (SECRET_KEY, DATABASE_URL, cloud keys), its open
+    descriptors and its user.
+    """
+    kept = {name: os.environ[name] for name in SANDBOX_ENV_ALLOWLIST if name in os.environ}
+    os.environ.clear()
+    os.environ.update(kept)
+
+    # Everything but stdio and the job pipe
+    keep_fd = conn.fileno()
+    max_fd = resource.getrlimit(resource.RLIMIT_NOFILE)[0] if resource else 1024
+    os.closerange(3, keep_fd)
+    os.closerange(keep_fd + 1, max_fd)
+
+    # Also makes the process non-dumpable, so /proc/self/environ (still the
+    # inherited one) is no longer readable by it
+    if hasattr(os, "getuid") and os.getuid() == 0:
+        os.setgroups([])
+        os.setgid(SANDBOX_GID)
+        os.setuid(SANDBOX_UID)
+
+def _worker_main(conn, memory_mb: int):
+    _isolate(conn)
+    if resource:
+        memory = memory_mb * 1024 * 1024
+        resource.setrlimit(resource.RLIMIT_AS, (memory, memory))
+        resource.setrlimit(resource.RLIMIT_FSIZE, (0, 0))
+        signal.signal(signal.SIGXCPU, _on_cpu_limit)
+
+    # Pre-warm: pay the first-exec costs before a candidate is waiting
+    _run_job({"kind": "run", "code": "print(sum(range(10)))"})
+
+    while True:
+        try:
+            job = conn.recv()
+        except (EOFError, KeyboardInterrupt):
+            return
+        conn.send(_run_job(job))
+
+def _run_job(job: Dict) -> Dict:
+    if job.get("kind") == "tests":
+        return _run_tests(job)
+    if job.get("kind") == "profile":
+        return _run_profile(job)
+    return _run_snippet(job)
+
+# Compiled submissions keyed by source hash; "Run" is usually pressed on unchanged code
+_compiled_code = LRUCache(maxsize=SANDBOX_CODE_CACHE_SIZE)
+
+def _compile_submission(code: str):
+    key = hashlib.sha256(code.encode()).hexdigest()
+    compiled = _compiled_code.get(key)
+    if compiled is None:
+        compiled = compile(code, "<submission>", "exec")
+        _compiled_code.set(key, compiled)
+    return compiled
+
+def _run_snippet(job: Dict) -> Dict:
+    output = _LimitedOutput(job.get("max_output", SANDBOX_MAX_OUTPUT))
+    started_wall = time.perf_counter()
+    started_cpu = time.process_time()
+    error = None
+
+    _arm_cpu_limit(job.get("cpu_seconds", SANDBOX_CPU_SECONDS))
+    try:
+        # The worker runs one job at a time, so redirecting stdout here is isolated
+        with contextlib.redirect_stdout(output):
+            exec(_compile_submission(job["code"]), {"__name__": "__main__", "__builtins__": SAFE_BUILTINS})
+    except _CPUTimeExceeded:
+        error = "CPU time limit exceeded"
+    except _OutputLimitExceeded:
+        error = "Output limit exceeded"
+    except MemoryError:
+        error = "Memory limit exceeded"
+    except Exception as e:
+        error = str(e)
+    finally:
+        _disarm_cpu_limit()
+
+    return {
+        "output": output.getvalue(),
+        "error": error,
+        "wall_time": time.perf_counter() - started_wall,
+        "cpu_time": time.process_time() - started_cpu,
+    }
+
+def _run_tests(job: Dict) -> Dict:
+    """
+    Compiles the submission once, then calls the target function for every case.
+    Each case gets its own CPU budget, output capture and timings.
+    """
+    namespace = {"__name__": "__main__", "__builtins__": SAFE_BUILTINS}
+    cpu_seconds = job.get("cpu_seconds", SANDBOX_CPU_SECONDS)
+
+    _arm_cpu_limit(cpu_seconds)
+    try:
+        with contextlib.redirect_stdout(_LimitedOutput(job.get("max_output", SANDBOX_MAX_OUTPUT))):
+            exec(_compile_submission(job["code"]), namespace)
+        target = _resolve_function(namespace, job["function_name"])
+    except BaseException as e:
+        return {"error": _describe_error(e), "results": [], "passed": 0, "total": len(job["test_cases"])}
+    finally:
+        _disarm_cpu_limit()
+
+    results = []
+    for index, case in enumerate(job["test_cases"]):
+        output = _LimitedOutput(job.get("max_output", SANDBOX_MAX_OUTPUT))
+        actual, error = None, None
+        started_wall = time.perf_counter()
+        started_cpu = time.process_time()
+
+        _arm_cpu_limit(cpu_seconds)
+        try:
+            with contextlib.redirect_stdout(output):
+                actual = target(*case.get("args", []))
+        except BaseException as e:
+            error = _describe_error(e)
+        finally:
+            _disarm_cpu_limit()
+
+        expected = case.get("expected")
+        passed = error is None and _matches(actual, expected, job.get("unordered", False))
+        results.append({
+            "index": index,
+            "passed": passed,
+            "args": case.get("args", []),
+            "expected": expected,
+            "actual": _to_jsonable(actual),
+            "output": output.getvalue(),
+            "error": error,
+            "wall_time": time.perf_counter() - started_wall,
+            "cpu_time": time.process_time() - started_cpu,
+        })
+
+    return {
+        "error": None,
+        "results": results,
+        "passed": sum(1 for r in results if r["passed"]),
+        "total": len(results),
+    }
+
+def _run_profile(job: Dict) -> Dict:
+    """
+    Calls the target function on generated inputs of size 2^k and records the
+    per-call time and peak traced memory. Stops growing n once the next size
+    would be too slow or the time budget is used up.
+    """
+    namespace = {"__name__": "__main__", "__builtins__": SAFE_BUILTINS}
+    samples = []
+    _arm_cpu_limit(job.get("cpu_seconds", SANDBOX_CPU_SECONDS))
+    try:
+        with contextlib.redirect_stdout(_LimitedOutput(job.get("max_output", SANDBOX_MAX_OUTPUT))):
+            exec(_compile_submission(job["code"]), namespace)
+            target = _resolve_function(namespace, job["function_name"])
+
+            rng = random.Random(0)
+            deadline = time.perf_counter() + job.get("budget_seconds", 5)
+            for exponent in range(job.get("min_exponent", 6), job.get("max_exponent", 14) + 1):
+                n = 2 ** exponent
+                per_call, peak = _measure(target, job["input_kind"], n, rng)
+                samples.append({"n": n, "time": per_call, "peak_bytes": peak})
+                # Doubling n at least doubles the work for anything superlinear worth flagging
+                if per_call * 4 > job.get("max_call_seconds", 0.25) or time.perf_counter() > deadline:
+                    break
+    except BaseException as e:
+        # Samples taken before a limit was hit are still usable
+        return {"error": _describe_error(e), "samples": samples}
+    finally:
+        _disarm_cpu_limit()
+        if tracemalloc.is_tracing():
+            tracemalloc.stop()
+
+    return {"error": None, "samples": samples}
+
+def _measure(target, input_kind: str, n: int, rng: random.Random):
+    args = _generate_args(input_kind, n, rng)
+    started = time.perf_counter()
+    target(*args)
+    per_call = time.perf_counter() - started
+
+    # Fast calls are lost in timer noise: time batches instead and keep the best of
+    # three rounds. Fresh inputs per call (functions may mutate them), generated outside
+    # the timed region and capped by n so generation doesn't dominate the budget.
+    if per_call < 0.002:
+        iterations = max(1, min(50, int(0.002 / max(per_call, 1e-7)), 2 ** 16 // n))
+        for _ in range(3):
+            batches = [_generate_args(input_kind, n, rng) for _ in range(iterations)]
+            # Like timeit, keep collector pauses (triggered by the inputs we just built) out of the timing
+            gc.disable()
+            try:
+                started = time.perf_counter()
+                for batch in batches:
+                    target(*batch)
+                per_call = min(per_call, (time.perf_counter() - started) / iterations)
+            finally:
+                gc.enable()
+
+    args = _generate_args(input_kind, n, rng)
+    tracemalloc.start()
+    try:
+        target(*args)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return per_call, peak
+
+def _generate_args(kind: str, n: int, rng: random.Random) -> list:
+    if kind == "int":
+        return [n]
+    if kind == "int_list":
+        return [[rng.randint(-n, n) for _ in range(n)]]
+    if kind == "int_list_target":
+        # Worst case for pair searches: the only valid pair is at the end
+        nums = [rng.randint(0, n) * 2 for _ in range(n)]
+        nums[-2], nums[-1] = 4 * n + 1, 4 * n + 3
+        return [nums, 8 * n + 4]
+    if kind == "sorted_int_list_target":
+        nums = sorted(rng.sample(range(-4 * n, 4 * n), n))
+        return [nums, nums[rng.randrange(n)]]
+    if kind == "string":
+        return ["".join(rng.choice(string.ascii_lowercase) for _ in range(n))]
+    if kind == "string_pair":
+        letters = [rng.choice(string.ascii_lowercase) for _ in range(n)]
+        shuffled = letters[:]
+        rng.shuffle(shuffled)
+        return ["".join(letters), "".join(shuffled)]
+    if kind == "brackets":
+        return ["([{" * (n // 6) + "}])" * (n // 6)]
+    if kind == "intervals":
+        starts = [rng.randint(0, 10 * n) for _ in range(n)]
+        return [[[start, start + rng.randint(0, 10)] for start in starts]]
+    if kind == "word_list":
+        return [["".join(rng.choice("abcde") for _ in range(5)) for _ in range(n)]]
+    raise ValueError(f"Unknown input kind '{kind}'")
+
+def _resolve_function(namespace: Dict, function_name: str):
+    if callable(namespace.get(function_name)):
+        return namespace[function_name]
+    # LeetCode-style `class Solution` with the function as a method
+    solution_cls = namespace.get("Solution")
+    if solution_cls is not None and hasattr(solution_cls, function_name):
+        return getattr(solution_cls(), function_name)
+    raise NameError(f"Function '{function_name}' is not defined")
+
+def _describe_error(e: BaseException) -> str:
+    if isinstance(e, _CPUTimeExceeded):
+        return "CPU time limit exceeded"
+    if isinstance(e, _OutputLimitExceeded):
+        return "Output limit exceeded"
+    if isinstance(e, MemoryError):
+        return "Memory limit exceeded"
+    return f"{type(e).__name__}: {e}"
+
+def _canonical(value):
+    if isinstance(value, (list, tuple)):
+        return sorted((_canonical(v) for v in value), key=repr)
+    return value
+
+def _matches(actual, expected, unordered: bool) -> bool:
+    if isinstance(actual, tuple):
+        actual = list(actual)
+    if unordered:
+        return _canonical(actual) == _canonical(expected)
+    return actual == expected
+
+def _to_jsonable(value):
+    try:
+        json.dumps(value)
+        return value
+    except (TypeError, ValueError):
+        return repr(value)
+
+def _arm_cpu_limit(seconds: int):
+    # RLIMIT_CPU counts the whole process lifetime, so the limit is relative to what's used so far
+    if resource:
+        used = time.process_time()
+        _, hard = resource.getrlimit(resource.RLIMIT_CPU)
+        resource.setrlimit(resource.RLIMIT_CPU, (int(used) + seconds + 1, hard))
+
+def _disarm_cpu_limit():
+    if resource:
+        _, hard = resource.getrlimit(resource.RLIMIT_CPU)
+        resource.setrlimit(resource.RLIMIT_CPU, (hard, hard))
+
+# --- API process side ---
+
+class _SandboxWorker:
+    def __init__(self, ctx):
+        self.conn, child_conn = ctx.Pipe()
+        self.process = ctx.Process(target=_worker_main, args=(child_conn, SANDBOX_MEMORY_MB), daemon=True)
+        self.process.start()
+        child_conn.close()
+        self.runs = 0
+
+    def run(self, job: Dict, timeout: float) -> Optional[Dict]:
+        """
+        Returns the job result, or None if it ran past the wall-clock timeout and was killed.
+        """
+        self.runs += 1
+        try:
+            self.conn.send(job)
+            if self.conn.poll(timeout):
+                return self.conn.recv()
+        except (EOFError, OSError):
+            self.kill()
+            return {"output": "", "error": "Code runner crashed", "wall_time": None, "cpu_time": None}
+        self.kill()
+        return None
+
+    def alive(self) -> bool:
+        return self.process.is_alive()
+
+    def kill(self):
+        if self.process.is_alive():
+            self.process.kill()
+        self.process.join(timeout=1)
+        self.conn.close()
+
+class SandboxPool:
+    """
+    Pool of pre-forked, pre-warmed worker processes for untrusted code.
+    Each run gets CPU/memory/output limits and a wall-clock kill; workers are
+    replaced when killed and recycled after SANDBOX_RECYCLE_AFTER runs.
+    """
+    def __init__(self, size: int = SANDBOX_WORKERS, max_queue: int = SANDBOX_MAX_QUEUE):
+        self.size = size
+        self._idle: "queue.Queue[_SandboxWorker]" = queue.Queue()
+        self._admission = threading.BoundedSemaphore(size + max_queue)
+        self._lock = threading.Lock()
+        self._started = False
+        self._ctx = None
+
+    def start(self):
+        with self._lock:
+            if self._started:
+                return
+            methods = multiprocessing.get_all_start_methods()
+            # forkserver forks from a clean single-threaded parent, not from the threaded API process
+            if "forkserver" in methods:
+                self._ctx = multiprocessing.get_context("forkserver")
+                self._ctx.set_forkserver_preload([__name__])
+            else:
+                self._ctx = multiprocessing.get_context("spawn")
+            for _ in range(self.size):
+                self._idle.put(_SandboxWorker(self._ctx))
+            self._started = True
+            logger.info(f"Sandbox pool started with {self.size} workers")
+            if hasattr(os, "getuid") and os.getuid() != 0:
+                logger.warning("API is not running as root, so sandbox workers keep its user; "
+                               "run them under a dedicated account or container")
+
+    def shutdown(self):
+        with self._lock:
+            while not self._idle.empty():
+                self._idle.get_nowait().kill()
+            self._started = False
+
+    def execute(self, job: Dict, wall_seconds: float = SANDBOX_WALL_SECONDS) -> Dict:
+        start = time.perf_counter()
+        outcome = "crash"
+        try:
+            result = self._execute(job, wall_seconds)
+            if result is None:
+                outcome = "timeout"
+            elif result.get("error"):
+                outcome = "error"
+            else:
+                outcome = "ok"
+        except SandboxBusyError:
+            outcome = "busy"
+            raise
+        finally:
+            CODE_RUN_SECONDS.labels(job.get("kind", "run"), outcome).observe(time.perf_counter() - start)
+
+        if result is None:
+            return {"output": "", "error": "Time limit exceeded", "wall_time": wall_seconds, "cpu_time": None}
+        return result
+
+    def _execute(self, job: Dict, wall_seconds: float) -> Optional[Dict]:
+        if not self._started:
+            self.start()
+
+        if not self._admission.acquire(blocking=False):
+            raise SandboxBusyError("Too many code runs in progress. Please try again shortly.")
+        try:
+            try:
+                worker = self._idle.get(timeout=SANDBOX_QUEUE_TIMEOUT)
+            except queue.Empty:
+                raise SandboxBusyError("No code runner available. Please try again shortly.")
+
+            result = None
+            try:
+                result = worker.run(job, wall_seconds)
+            finally:
+                if result is None or not worker.alive():
+                    worker = self._replace(worker)
+                elif worker.runs >= SANDBOX_RECYCLE_AFTER:
+                    worker = self._replace(worker)
+                self._idle.put(worker)
+
+            return result
+        finally:
+            self._admission.release()
+
+    def _replace(self, worker: _SandboxWorker) -> _SandboxWorker:
+        worker.kill()
+        return _SandboxWorker(self._ctx)
+
+sandbox_pool = SandboxPool()
@@ -1,33 +1,49 @@
+import re
 import uuid
+import random
 import datetime
 import shutil
 import os
-from typing import List, Optional, Dict
+from typing import Iterator, List, Optional, Dict
 from fastapi import UploadFile, HTTPException
+from sqlalchemy.orm import undefer, undefer_group
+from sqlmodel import Session
 
-from ..core.models import Session as DbSession, SessionStep, StepType, StepStatus, SessionStatus, Resume, ContextData, User
-from ..repositories.session import SessionRepository
+from ..core.models import Session as DbSession, SessionStep, StepType, StepStatus, SessionStatus, Resume, ContextData, HEAVY
+from ..repositories.session import SessionRepository, log_entries
 from ..services.ai import ai_service
 from ..services.scraper import scraper_service
 from ..services.parser import parser_service
 from ..services.storage import storage_service
-from ..tasks import perform_interview_research, perform_context_research
+from ..services.tts import get_tts_service, SentenceBuffer, TTSBusyError
+from ..services.audio_cache import audio_cache
+from ..services.code import code_service
+from ..services.leetcode import leetcode_service
+from ..services.problem_tests import get_test_suite
+from ..tasks import perform_interview_research, perform_context_research, parse_uploaded_resume
+from ..core.database import engine
+from ..core.logger import get_logger
+
+logger = get_logger(__name__)
+
+TIME_UP_MESSAGE = "The interview time for this step has ended. Please proceed to the next step."
+ROADMAP_BLOCK = re.compile(r"<roadmap>.*?</roadmap>", re.DOTALL)
+# Markdown that TTS would read out literally
+SPEECH_MARKUP = re.compile(r"[*#`]")
 
 class SessionService:
     def __init__(self, session_repository: SessionRepository):
         self.session_repository = session_repository
 
-    def create_session(self, user: User) -> DbSession:
+    def create_session(self, user_id: uuid.UUID) -> DbSession:
         db_session = DbSession(
-            user_id=user.id, 
+            user_id=user_id, 
             job_title="Software Engineer", # Default
             company_name="Pending", # Default
             jd_content="Standard JD", # Default
             role_level="mid", # Default
             duration_minutes=15 # Default
         )
-        self.session_repository.create(db_session)
-        
         # Initialize steps
         steps = [
             SessionStep(session_id=db_session.id, step_type=StepType.SCREENING, status=StepStatus.PENDING),
@@ -35,111 +51,295 @@ class SessionService:
             SessionStep(session_id=db_session.id, step_type=StepType.TECHNICAL),
             SessionStep(session_id=db_session.id, step_type=StepType.SYSTEM_DESIGN),
         ]
-        for step in steps:
-            self.session_repository.session.add(step)
-        self.session_repository.session.commit()
+        # One transaction: the session insert, then the steps as one batched insert
+        with self.session_repository.unit_of_work():
+            self.session_repository.add(db_session)
+            self.session_repository.add_all(steps)
         
         return db_session
 
     def get_user_sessions(self, user_id: uuid.UUID) -> List[DbSession]:
         return self.session_repository.get_by_user_id(user_id)
 
-    def get_session(self, session_id: uuid.UUID) -> DbSession:
-        session = self.session_repository.get(session_id)
+    def get_session(self, session_id: uuid.UUID, profile: str = "detail") -> DbSession:
+        # profile: a loader profile from repositories/session.py
+        session = self.session_repository.get_loaded(session_id, profile)
         if not session:
             raise HTTPException(status_code=404, detail="Session not found")
         return session
 
-    def update_session(self, session_id: uuid.UUID, update_data: dict) -> DbSession:
-        session = self.session_repository.update(session_id, update_data)
-        if not session:
+    # Polled read routes: cached JSON views (see SessionRepository.get_view)
+
+    def get_version(self, session_id: uuid.UUID) -> str:
+        return self._found(self.session_repository.get_version(session_id))
+
+    def get_session_view(self, session_id: uuid.UUID) -> Dict:
+        return self._found(self.session_repository.get_view(session_id))
+
+    def get_steps_view(self, session_id: uuid.UUID) -> List[Dict]:
+        return self._found(self.session_repository.get_steps_view(session_id))
+
+    def get_research_view(self, session_id: uuid.UUID) -> Dict:
+        return self._found(self.session_repository.get_research_view(session_id))
+
+    def get_step_messages(self, session_id: uuid.UUID, step_id: uuid.UUID, limit: int,
+                          before: Optional[str] = None, after: Optional[str] = None, since: Optional[int] = None) -> Dict:
+        """
+        A window of a step's transcript: the latest `limit` messages, or `limit`
+        messages before/after a message id, or those from position `since` on
+        (a client's last seen message_count) for incremental sync.
+        """
+        if sum(cursor is not None for cursor in (before, after, since)) > 1:
+            raise HTTPException(status_code=400, detail="Use only one of before, after and since")
+        step = self.session_repository.get_step(step_id, profile="messages")
+        if not step or step.session_id != session_id:
+            raise HTTPException(status_code=404, detail="Step not found")
+        
+        log = log_entries(step.interaction_log)
+        if before is not None or after is not None:
+            position = next((i for i, entry in enumerate(log) if entry.get("id") == (before or after)), None)
+            if position is None:
+                raise HTTPException(status_code=400, detail="Unknown message id")
+            start, end = (max(position - limit, 0), position) if before is not None else (position + 1, position + 1 + limit)
+        elif since is not None:
+            start, end = since, since + limit
+        else:
+            start, end = max(len(log) - limit, 0), len(log)
+        
+        end = min(end, len(log))
+        start = min(start, end)
+        return {
+            "messages": log[start:end],
+            "message_count": len(log),
+            "has_older": start > 0,
+            "has_newer": end < len(log),
+        }
+
+    def _found(self, view):
+        if view is None:
             raise HTTPException(status_code=404, detail="Session not found")
+        return view
+
+    def update_session(self, session_id: uuid.UUID, update_data: dict) -> DbSession:
+        # Loaded with every column first (and 404s): the response carries the whole row.
+        # Holding the reference keeps it in the identity map for update() to find.
+        session = self.get_session(session_id)
+        self.session_repository.update(session_id, update_data)
         return session
 
     def upload_resume(self, session_id: uuid.UUID, resume_file: UploadFile) -> Dict:
-        db_session = self.get_session(session_id)
+        db_session = self.get_session(session_id, profile="list")
         
-        # 1. Upload File (S3 or Local)
-        destination_path = f"{db_session.id}_{resume_file.filename}"
-        file_location = storage_service.upload_file(resume_file, destination_path)
+        # 1. Upload File (S3 or Local), content-addressed by SHA-256
+        stored = storage_service.upload_file(resume_file, resume_file.filename)
+        content_hash = stored["content_hash"]
         
-        # 2. Parse Resume
-        # Reset file pointer to read for parsing
-        resume_file.file.seek(0)
-        parsed_text = parser_service.parse_resume(resume_file.file, filename=resume_file.filename)
+        # 2. Parse Resume, unless these exact bytes were parsed before
+        from sqlmodel import select
+        previous = self.session_repository.session.exec(
+            select(Resume)
+            .where(Resume.content_hash == content_hash, Resume.parsed_content != "")
+            .options(undefer_group(HEAVY))
+        ).first()
         
-        db_resume = Resume(user_id=db_session.user_id, file_path=file_location, parsed_content=parsed_text)
-        self.session_repository.session.add(db_resume)
-        self.session_repository.session.commit()
+        if previous:
+            parsed_text, sections, digest = previous.parsed_content, previous.sections, previous.digest
+        else:
+            # Reset file pointer to read for parsing
+            resume_file.file.seek(0)
+            parsed_text = parser_service.parse_resume(resume_file.file, filename=resume_file.filename)
+            
+            # 3. Index sections once so prompts can carry a compact digest
+            sections = parser_service.segment_resume(parsed_text)
+            digest = parser_service.build_digest(sections)
+        
+        db_resume = Resume(
+            user_id=db_session.user_id,
+            file_path=stored["location"],
+            content_hash=content_hash,
+            parsed_content=parsed_text,
+            sections=sections,
+            digest=digest
+        )
+        self.session_repository.add(db_resume)
+        
+        return {
+            "status": "uploaded",
+            "filename": resume_file.filename,
+            "location": stored["location"],
+            "content_hash": content_hash,
+            "deduplicated": previous is not None
+        }
+
+    def create_resume_upload(self, session_id: uuid.UUID, filename: str, content_type: str, content_hash: str) -> Dict:
+        self.get_session(session_id, profile="list")
+        
+        if os.path.splitext(filename)[1].lower() not in (".pdf", ".docx"):
+            raise HTTPException(status_code=400, detail="Only PDF and DOCX resumes are supported")
+        
+        try:
+            return storage_service.create_presigned_upload(content_hash.lower(), filename, content_type)
+        except RuntimeError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+
+    def complete_resume_upload(self, session_id: uuid.UUID, filename: str, content_hash: str) -> Dict:
+        db_session = self.get_session(session_id, profile="list")
+        content_hash = content_hash.lower()
+        
+        if not storage_service.s3_client:
+            raise HTTPException(status_code=400, detail="Direct uploads require object storage to be configured")
         
-        return {"status": "uploaded", "filename": resume_file.filename, "location": file_location}
+        key = storage_service.object_key(content_hash, os.path.splitext(filename)[1].lower())
+        if not storage_service.object_exists(key):
+            raise HTTPException(status_code=400, detail="Uploaded object not found")
+        
+        from sqlmodel import select
+        previous = self.session_repository.session.exec(
+            select(Resume)
+            .where(Resume.content_hash == content_hash, Resume.parsed_content != "")
+            .options(undefer_group(HEAVY))
+        ).first()
+        
+        db_resume = Resume(
+            user_id=db_session.user_id,
+            file_path=storage_service.object_url(key),
+            content_hash=content_hash,
+            parsed_content=previous.parsed_content if previous else "",
+            sections=previous.sections if previous else None,
+            digest=previous.digest if previous else None,
+            parse_status="completed" if previous else "processing"
+        )
+        self.session_repository.add(db_resume)
+        
+        # Parsing happens on the worker so the API never touches the file bytes
+        if not previous:
+            parse_uploaded_resume.delay(str(db_resume.id), key, filename)
+        
+        return {
+            "status": "uploaded" if previous else "processing",
+            "resume_id": str(db_resume.id),
+            "content_hash": content_hash,
+            "deduplicated": previous is not None
+        }
+
+    def get_resume_status(self, session_id: uuid.UUID, resume_id: uuid.UUID) -> Dict:
+        db_session = self.get_session(session_id, profile="list")
+        resume = self.session_repository.session.get(Resume, resume_id)
+        if not resume or resume.user_id != db_session.user_id:
+            raise HTTPException(status_code=404, detail="Resume not found")
+        return {"resume_id": str(resume.id), "status": resume.parse_status, "error": resume.parse_error}
 
     def start_session(self, session_id: uuid.UUID) -> Dict:
-        db_session = self.get_session(session_id)
+        db_session = self.get_session(session_id, profile="turn")
         
-        # Scrape Company Info
-        if not db_session.context_data and db_session.company_name and db_session.company_name != "Pending":
-            company_info = scraper_service.search_company(db_session.company_name)
-            if company_info:
-                context = ContextData(session_id=db_session.id, source="duckduckgo", content=company_info)
-                self.session_repository.session.add(context)
-                self.session_repository.session.commit()
-
         # Find first step
         steps = db_session.steps
         first_step = next((s for s in steps if s.step_type == StepType.SCREENING), None)
+        greet = first_step is not None and first_step.status == StepStatus.PENDING
         
-        if first_step and first_step.status == StepStatus.PENDING:
-            first_step.status = StepStatus.IN_PROGRESS
-            first_step.started_at = datetime.datetime.utcnow()
-            self.session_repository.session.add(first_step)
-            
-            # Initial greeting
-            context_str = self._build_context_string(db_session)
+        # Slow calls (search, LLM with retries) run with no transaction or connection held
+        # Scrape Company Info
+        company_context = None
+        if not db_session.context_data and db_session.company_name and db_session.company_name != "Pending":
+            self.session_repository.release_connection()
+            company_info = scraper_service.search_company(db_session.company_name)
+            if company_info:
+                company_context = ContextData(source="duckduckgo", content=company_info)
+        
+        ai_response = None
+        if greet:
+            # Initial greeting; it sees the company info before it's inserted
+            context_data = list(db_session.context_data) + ([company_context] if company_context else [])
+            context_str = self._build_context_string(db_session, first_step.step_type, context_data)
+            self.session_repository.release_connection()
             
             ai_response = ai_service.generate_response(context_str, [], "Hello", step_type=first_step.step_type, role_level=db_session.role_level)
+        
+        # Then the writes, in one short transaction
+        with self.session_repository.unit_of_work():
+            if company_context:
+                db_session.context_data.append(company_context)
             
-            # Parse Roadmap
-            ai_response = self._process_roadmap(ai_response, first_step)
+            if greet:
+                first_step.status = StepStatus.IN_PROGRESS
+                first_step.started_at = datetime.datetime.utcnow()
+                
+                # Parse Roadmap
+                ai_response = self._process_roadmap(ai_response, first_step)
 
-            log = [{"role": "assistant", "content": ai_response, "id": str(uuid.uuid4())}]
-            first_step.interaction_log = log
-            self.session_repository.session.add(first_step)
-            
-        db_session.status = SessionStatus.IN_PROGRESS
-        self.session_repository.session.add(db_session)
-        self.session_repository.session.commit()
+                log = [{"role": "assistant", "content": ai_response, "id": str(uuid.uuid4())}]
+                first_step.interaction_log = log
+                
+            db_session.status = SessionStatus.IN_PROGRESS
         
         return {"status": "started"}
 
     def interact_step(self, session_id: uuid.UUID, step_id: uuid.UUID, message: str) -> Dict:
-        # Note: We need to fetch step directly or via session
-        # For simplicity, we use the session repository's session to query step
-        step = self.session_repository.session.get(SessionStep, step_id)
+        step, log, prompt_args = self._prepare_turn(session_id, step_id, message)
+        self.session_repository.release_connection()
+        
+        ai_response = ai_service.generate_response(**prompt_args) if prompt_args else None
+        ai_response = self._record_reply(step, log, ai_response, time_up=prompt_args is None)
+        self.session_repository.add(step)
+        
+        return {"response": ai_response}
+
+    def voice_turn(self, session_id: uuid.UUID, step_id: uuid.UUID, message: str, tier: str = "free") -> Iterator[bytes]:
+        """
+        Spoken turn in one round trip: streams the Gemini reply, hands each finished
+        sentence to TTS and returns the audio stream. The full reply is written to
+        the step log once generation ends.
+        """
+        step, log, prompt_args = self._prepare_turn(session_id, step_id, message)
+        
+        try:
+            tts_service = get_tts_service(tier)
+        except Exception as e:
+            raise HTTPException(status_code=400, detail=f"Configuration Error: {e}")
+        
+        # Sentences take TTS slots as they're synthesized; don't start a turn that can't be spoken
+        if not tts_service.has_capacity():
+            raise HTTPException(status_code=503, detail=f"{tts_service.provider} TTS is at capacity")
+        
+        if prompt_args is None:
+            text_stream = iter([TIME_UP_MESSAGE])
+        else:
+            text_stream = ai_service.generate_response_stream(**prompt_args)
+            
+        sentences = self._speak_and_persist(step.id, log, text_stream, time_up=prompt_args is None)
+        return self._voice_audio(tts_service, sentences)
+
+    def _voice_audio(self, tts_service, sentences: Iterator[str]) -> Iterator[bytes]:
+        try:
+            yield from tts_service.synthesize_stream(sentences, cache=audio_cache)
+        except TTSBusyError as e:
+            # Headers are already sent; end the audio early. The transcript keeps the reply so far.
+            logger.warning(f"Voice turn audio stopped: {e}")
+
+    def _prepare_turn(self, session_id: uuid.UUID, step_id: uuid.UUID, message: str):
+        """
+        Loads the step, appends the user message and builds the generate_response arguments.
+        Returns (step, log, prompt_args); prompt_args is None when the step's time is up.
+        """
+        step = self.session_repository.get_step(step_id, profile="turn")
         if not step:
             raise HTTPException(status_code=404, detail="Step not found")
             
         # Update log
-        current_log = step.interaction_log or []
-        if isinstance(current_log, dict): log = list(current_log.values())
-        elif isinstance(current_log, list): log = list(current_log)
-        else: log = []
+        log = log_entries(step.interaction_log)
         
         log.append({"role": "user", "content": message, "id": str(uuid.uuid4())})
         
-        db_session = self.get_session(session_id)
+        db_session = self.get_session(session_id, profile="turn")
         
         # Check time limit
         start_time = step.started_at or db_session.created_at
         duration = datetime.timedelta(minutes=db_session.duration_minutes)
         
         if datetime.datetime.utcnow() > start_time + duration:
-            ai_response = "The interview time for this step has ended. Please proceed to the next step."
-            log.append({"role": "assistant", "content": ai_response, "id": str(uuid.uuid4())})
-            step.interaction_log = log
-            self.session_repository.session.add(step)
-            self.session_repository.session.commit()
-            return {"response": ai_response}
+            return step, log, None
 
         # Calculate remaining time
         remaining_minutes = None
@@ -149,55 +349,167 @@ class SessionService:
             remaining_minutes = int(remaining.total_seconds() / 60)
             if remaining_minutes < 0: remaining_minutes = 0
 
+        # Pin one problem per technical step so every turn (and the test harness) sees the same one
+        if step.step_type == StepType.TECHNICAL and not step.problem:
+            step.problem = self._pick_problem(db_session)
+            # Commit it now; left staged, the context queries would autoflush it and hold a write transaction through the LLM call
+            self.session_repository.add(step)
+
         # Build Context
-        context_str = self._build_context_string(db_session)
+        context_str = self._build_context_string(db_session, step.step_type)
         
         # Build History
-        history = [f"{entry['role']}: {entry['content']}" for entry in log if entry["role"] != "system"]
-            
-        ai_response = ai_service.generate_response(
-            context_str, 
-            history, 
-            message, 
-            step_type=step.step_type, 
-            role_level=db_session.role_level,
-            roadmap=step.roadmap,
-            remaining_time=remaining_minutes
+        history = self._build_history(log)
+        
+        prompt_args = {
+            "context": context_str,
+            "history": history,
+            "user_message": message,
+            "step_type": step.step_type,
+            "role_level": db_session.role_level,
+            "roadmap": step.roadmap,
+            "remaining_time": remaining_minutes,
+            "problem": step.problem,
+        }
+        return step, log, prompt_args
+
+    def _pick_problem(self, db_session: DbSession) -> Optional[Dict]:
+        company_name = db_session.company_name if db_session.company_name != "Pending" else "google"
+        problems = leetcode_service.get_company_problems(company_name) or leetcode_service.get_company_problems("google")
+        if not problems:
+            return None
+        
+        # Prefer problems we can run test cases for
+        testable = [p for p in problems if get_test_suite(p["title"])]
+        problem = dict(random.choice(testable or problems))
+        suite = get_test_suite(problem["title"])
+        if suite:
+            problem.update(suite)
+        return problem
+
+    def run_step_tests(self, session_id: uuid.UUID, step_id: uuid.UUID, code: str) -> Dict:
+        step = self.session_repository.get_step(step_id, profile="code")
+        if not step or step.session_id != session_id:
+            raise HTTPException(status_code=404, detail="Step not found")
+        if not step.problem or not step.problem.get("test_cases"):
+            raise HTTPException(status_code=400, detail="No test cases available for this step's problem")
+        
+        result = code_service.run_tests(
+            code,
+            step.problem["function_name"],
+            step.problem["test_cases"],
+            unordered=step.problem.get("unordered", False)
         )
         
-        # Parse Roadmap
-        ai_response = self._process_roadmap(ai_response, step)
+        # Keep a compact summary for the evaluation prompt
+        code_results = dict(step.code_results or {})
+        code_results["tests"] = {
+            "passed": result["passed"],
+            "total": result["total"],
+            "error": result.get("error"),
+            "cases": [{"index": r["index"], "passed": r["passed"], "error": r["error"]} for r in result["results"]],
+        }
+        step.code_results = code_results
+        self.session_repository.add(step)
+        
+        return result
+
+    def profile_step_code(self, session_id: uuid.UUID, step_id: uuid.UUID, code: str) -> Dict:
+        step = self.session_repository.get_step(step_id, profile="code")
+        if not step or step.session_id != session_id:
+            raise HTTPException(status_code=404, detail="Step not found")
+        if not step.problem or not step.problem.get("profile_input"):
+            raise HTTPException(status_code=400, detail="Complexity profiling is not available for this step's problem")
         
-        log.append({"role": "assistant", "content": ai_response, "id": str(uuid.uuid4())})
+        result = code_service.profile_complexity(code, step.problem["function_name"], step.problem["profile_input"])
         
-        step.interaction_log = log
-        step.status = StepStatus.IN_PROGRESS
-        self.session_repository.session.add(step)
-        self.session_repository.session.commit()
+        code_results = dict(step.code_results or {})
+        code_results["complexity"] = {
+            "time": result["time_complexity"],
+            "space": result["space_complexity"],
+            "error": result.get("error"),
+        }
+        step.code_results = code_results
+        self.session_repository.add(step)
         
-        return {"response": ai_response}
+        return result
+
+    def _speak_and_persist(self, step_id: uuid.UUID, log: List, text_stream: Iterator[str], time_up: bool = False) -> Iterator[str]:
+        buffer = SentenceBuffer()
+        full_text = ""
+        spoken_upto = 0
+        try:
+            for text in text_stream:
+                full_text += text
+                
+                # The roadmap block is shown in the transcript, never spoken
+                visible = ROADMAP_BLOCK.sub("", full_text)
+                open_tag = visible.find("<roadmap>")
+                if open_tag != -1:
+                    visible = visible[:open_tag]
+                else:
+                    # Hold back what may be the start of a tag split across chunks
+                    lt = visible.rfind("<")
+                    if lt != -1 and "<roadmap>".startswith(visible[lt:]):
+                        visible = visible[:lt]
+                
+                for sentence in buffer.feed(visible[spoken_upto:]):
+                    yield SPEECH_MARKUP.sub("", sentence)
+                spoken_upto = len(visible)
+                
+            for sentence in buffer.feed(ROADMAP_BLOCK.sub("", full_text)[spoken_upto:]) + buffer.flush():
+                yield SPEECH_MARKUP.sub("", sentence)
+        finally:
+            # Runs even if the listener disconnects or generation fails, so the
+            # transcript keeps the user's message and whatever was said
+            self._persist_reply(step_id, log, full_text, time_up)
+
+    def _persist_reply(self, step_id: uuid.UUID, log: List, ai_response: str, time_up: bool = False):
+        # The request-scoped DB session may already be closed while audio streams,
+        # so the reply is written through a session of its own
+        with Session(engine) as db:
+            step = db.get(SessionStep, step_id)
+            if not step:
+                return
+            self._record_reply(step, log, ai_response, time_up)
+            db.add(step)
+            db.commit()
+
+    def _record_reply(self, step: SessionStep, log: List, ai_response: Optional[str], time_up: bool = False) -> Optional[str]:
+        """
+        Appends the assistant's reply to the log (which already has the user's
+        message) and sets it on the step. When time is up the reply is the
+        time-up notice and the status is left alone; an empty reply (generation
+        failed) records just the user's message.
+        """
+        if time_up:
+            ai_response = TIME_UP_MESSAGE
+        else:
+            if ai_response:
+                ai_response = self._process_roadmap(ai_response, step)
+            step.status = StepStatus.IN_PROGRESS
+        
+        if ai_response:
+            log.append({"role": "assistant", "content": ai_response, "id": str(uuid.uuid4())})
+        step.interaction_log = log
+        return ai_response
 
     def complete_step(self, session_id: uuid.UUID, step_id: uuid.UUID) -> Dict:
-        step = self.session_repository.session.get(SessionStep, step_id)
+        step = self.session_repository.get_step(step_id, profile="evaluate")
         if not step:
             raise HTTPException(status_code=404, detail="Step not found")
             
-        db_session = step.session
-        context_str = self._build_context_string(db_session)
+        db_session = self.get_session(step.session_id, profile="turn")
+        context_str = self._build_context_string(db_session, step.step_type)
         
         # Reconstruct history
-        history = []
-        current_log = step.interaction_log or []
-        if isinstance(current_log, dict): log_list = list(current_log.values())
-        elif isinstance(current_log, list): log_list = list(current_log)
-        else: log_list = []
-        
-        for entry in log_list:
-            if entry["role"] != "system":
-                history.append(f"{entry['role']}: {entry['content']}")
+        history = self._build_history(log_entries(step.interaction_log))
+        all_steps = db_session.steps
+        # Both evaluations run with no transaction or connection held
+        self.session_repository.release_connection()
                 
         # Agent 1: Bar Raiser (Standard Evaluation)
-        feedback = ai_service.evaluate_step(context_str, history, step.step_type)
+        feedback = ai_service.evaluate_step(context_str, history, step.step_type, code_results=step.code_results)
         
         # Agent 2: Hiring Manager (Fresh Considerations, aligned with Bar Raiser)
         hm_feedback = ai_service.get_hiring_manager_feedback(context_str, history, bar_raiser_feedback=feedback)
@@ -205,23 +517,20 @@ class SessionService:
         # Combine feedback
         combined_feedback = f"{feedback}\n\n---\n\n{hm_feedback}"
         
-        step.status = StepStatus.COMPLETED
-        step.feedback = combined_feedback
-        self.session_repository.session.add(step)
-        
-        # Activate next step
-        all_steps = db_session.steps
-        next_step = next((s for s in all_steps if s.status == StepStatus.PENDING), None)
-        if next_step:
-            next_step.status = StepStatus.IN_PROGRESS
-            next_step.started_at = datetime.datetime.utcnow()
-            self.session_repository.session.add(next_step)
+        with self.session_repository.unit_of_work():
+            step.status = StepStatus.COMPLETED
+            step.feedback = combined_feedback
+            
+            # Activate next step
+            next_step = next((s for s in all_steps if s.status == StepStatus.PENDING), None)
+            if next_step:
+                next_step.status = StepStatus.IN_PROGRESS
+                next_step.started_at = datetime.datetime.utcnow()
             
-        self.session_repository.session.commit()
         return {"status": "success", "feedback": feedback}
 
     def research_session(self, session_id: uuid.UUID) -> Dict:
-        db_session = self.get_session(session_id)
+        db_session = self.get_session(session_id, profile="list")
         
         if not db_session.company_name or db_session.company_name == "Pending":
              raise HTTPException(status_code=400, detail="Company name is required for research")
@@ -232,41 +541,38 @@ class SessionService:
         perform_context_research.delay(str(session_id), db_session.company_name, db_session.job_title)
         
         db_session.research_status = "pending"
-        self.session_repository.session.add(db_session)
-        self.session_repository.session.commit()
+        self.session_repository.add(db_session)
         
         return {"status": "research_started"}
 
     def add_url_context(self, session_id: uuid.UUID, url: str) -> ContextData:
-        db_session = self.get_session(session_id)
+        db_session = self.get_session(session_id, profile="list")
         
         content = scraper_service.scrape_url(url)
         if not content:
             raise HTTPException(status_code=400, detail="Failed to scrape URL")
             
         context_data = ContextData(session_id=session_id, source=url, content=content[:5000])
-        self.session_repository.session.add(context_data)
-        self.session_repository.session.commit()
-        self.session_repository.session.refresh(context_data)
+        self.session_repository.add(context_data)
         
         return context_data
 
     def add_reddit_context(self, session_id: uuid.UUID, query: str) -> ContextData:
-        db_session = self.get_session(session_id)
+        db_session = self.get_session(session_id, profile="list")
         
         content = scraper_service.scrape_reddit(query)
             
         context_data = ContextData(session_id=session_id, source=f"Reddit: {query}", content=content)
-        self.session_repository.session.add(context_data)
-        self.session_repository.session.commit()
-        self.session_repository.session.refresh(context_data)
+        self.session_repository.add(context_data)
         
         return context_data
 
 
-    def _build_context_string(self, db_session: DbSession) -> str:
+    def _build_context_string(self, db_session: DbSession, step_type: Optional[str] = None,
+                              context_data: Optional[List[ContextData]] = None) -> str:
+        # context_data: in place of db_session.context_data, e.g. with rows not yet saved
         context_str = f"Job Title: {db_session.job_title}\nCompany: {db_session.company_name}\nJD: {db_session.jd_content}\n"
-        for ctx in db_session.context_data:
+        for ctx in (db_session.context_data if context_data is None else context_data):
             context_str += f"\nSource ({ctx.source}): {ctx.content[:500]}"
             
         # Add Resume (Need to query resumes via user)
@@ -276,15 +582,34 @@ class SessionService:
         # But we might not have User loaded.
         # Let's do a direct query for now using the session from repo
         from sqlmodel import select
+        # parsed_content stays deferred; it's only read for resumes that predate sectioning
         latest_resume = self.session_repository.session.exec(
-            select(Resume).where(Resume.user_id == db_session.user_id).order_by(Resume.id.desc())
+            select(Resume)
+            .where(Resume.user_id == db_session.user_id, Resume.parsed_content != "")
+            .order_by(Resume.created_at.desc())
+            .options(undefer(Resume.sections))
         ).first()
         
-        if latest_resume and latest_resume.parsed_content:
-            context_str += f"\n\nCandidate Resume:\n{latest_resume.parsed_content[:2000]}"
+        if latest_resume:
+            resume_str = self._build_resume_string(latest_resume, step_type)
+            if resume_str:
+                context_str += f"\n\nCandidate Resume:\n{resume_str}"
             
         return context_str
 
+    def _build_history(self, log: List[Dict]) -> List[str]:
+        return [f"{entry['role']}: {entry['content']}" for entry in log if entry["role"] != "system"]
+
+    def _build_resume_string(self, resume: Resume, step_type: Optional[str] = None) -> str:
+        # Resumes uploaded before sectioning existed only have the raw text
+        if not resume.sections:
+            return (resume.parsed_content or "")[:2000]
+        
+        strategy = ai_service.strategies.get(step_type) if step_type else None
+        if strategy:
+            return parser_service.build_digest(resume.sections, strategy.resume_sections)
+        return resume.digest or parser_service.build_digest(resume.sections)
+
     def _process_roadmap(self, ai_response: str, step: SessionStep) -> str:
         import re
         roadmap_match = re.search(r"<roadmap>(.*?)</roadmap>", ai_response, re.DOTALL)
@@ -295,8 +620,7 @@ class SessionService:
         return ai_response
 
     def close_session(self, session_id: uuid.UUID) -> Dict:
-        db_session = self.get_session(session_id)
+        db_session = self.get_session(session_id, profile="list")
         db_session.status = SessionStatus.COMPLETED
-        self.session_repository.session.add(db_session)
-        self.session_repository.session.commit()
+        self.session_repository.add(db_session)
         return {"status": "closed"}
@@ -1,18 +1,32 @@
 import os
+import re
 import boto3
-import shutil
+import base64
+import hashlib
+import tempfile
+from typing import BinaryIO, Dict
+from botocore.exceptions import ClientError
 from fastapi import UploadFile
 from ..core.logger import get_logger
 
 logger = get_logger(__name__)
 
+UPLOAD_DIR = os.getenv("UPLOAD_DIR", "backend/uploads")
+CHUNK_SIZE = 1024 * 1024 # 1 MiB
+S3_KEY_PREFIX = "resumes"
+PRESIGNED_URL_EXPIRY = int(os.getenv("PRESIGNED_URL_EXPIRY", 900)) # seconds
+
+_SHA256_HEX = re.compile(r"^[0-9a-f]{64}$")
+
 class StorageService:
     def __init__(self):
         self.aws_access_key = os.getenv("AWS_ACCESS_KEY_ID")
         self.aws_secret_key = os.getenv("AWS_SECRET_ACCESS_KEY")
         self.aws_region = os.getenv("AWS_REGION", "us-east-1")
         self.s3_bucket = os.getenv("S3_BUCKET_NAME")
-        
+        # S3-compatible stand-in (MinIO, moto server) for local runs
+        self.endpoint_url = os.getenv("STORAGE_ENDPOINT_URL") or None
+
         self.s3_client = None
         if self.aws_access_key and self.aws_secret_key and self.s3_bucket:
             try:
@@ -20,7 +34,8 @@ class StorageService:
                     's3',
                     aws_access_key_id=self.aws_access_key,
                     aws_secret_access_key=self.aws_secret_key,
-                    region_name=self.aws_region
+                    region_name=self.aws_region,
+                    endpoint_url=self.endpoint_url
                 )
                 logger.info("S3 Client initialized successfully.")
             except Exception as e:
@@ -28,46 +43,140 @@ class StorageService:
         else:
             logger.warning("AWS credentials or S3 bucket not configured. Falling back to local storage.")
 
-    def upload_file(self, file: UploadFile, destination_path: str) -> str:
+    def upload_file(self, file: UploadFile, filename: str) -> Dict:
         """
-        Uploads a file to S3 or saves locally.
-        Returns the file path or S3 URL.
+        Stores a file content-addressed by the SHA-256 of its bytes, on S3 or locally.
+        The hash is computed while the upload is streamed to a temp file in chunks,
+        and objects that already exist are not written again.
+        Returns the location, the content hash and whether the object already existed.
         """
-        if self.s3_client:
-            try:
-                # Reset file pointer
-                file.file.seek(0)
-                
-                # Upload to S3
-                self.s3_client.upload_fileobj(
-                    file.file,
-                    self.s3_bucket,
-                    destination_path,
-                    ExtraArgs={'ContentType': file.content_type}
-                )
-                
-                url = f"https://{self.s3_bucket}.s3.{self.aws_region}.amazonaws.com/{destination_path}"
-                logger.info(f"File uploaded to S3: {url}")
-                return url
-            except Exception as e:
-                logger.error(f"S3 upload failed: {e}. Falling back to local storage.")
-                # Fallback to local
-        
-        # Local Storage
-        upload_dir = "backend/uploads"
-        os.makedirs(upload_dir, exist_ok=True)
-        
-        # Ensure destination_path is just the filename for local storage to avoid directory traversal issues
-        filename = os.path.basename(destination_path)
-        local_path = f"{upload_dir}/{filename}"
-        
+        ext = os.path.splitext(filename)[1].lower()
+        os.makedirs(UPLOAD_DIR, exist_ok=True)
+
+        file.file.seek(0)
+        temp_path, content_hash = self._spool_and_hash(file.file)
+        try:
+            if self.s3_client:
+                try:
+                    return self._store_s3(temp_path, content_hash, ext, file.content_type)
+                except Exception as e:
+                    logger.error(f"S3 upload failed: {e}. Falling back to local storage.")
+                    # Fallback to local
+
+            return self._store_local(temp_path, content_hash, ext)
+        finally:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+
+    def create_presigned_upload(self, content_hash: str, filename: str, content_type: str) -> Dict:
+        """
+        Issues a presigned PUT so the client uploads straight to the object store.
+        The object is keyed by the client-computed SHA-256, and S3 rejects bodies
+        that don't match it. If the object already exists no URL is issued.
+        """
+        if not self.s3_client:
+            raise RuntimeError("Direct uploads require object storage to be configured")
+        if not _SHA256_HEX.match(content_hash):
+            raise ValueError("content_hash must be a lowercase hex SHA-256 digest")
+
+        key = self.object_key(content_hash, os.path.splitext(filename)[1].lower())
+        if self.object_exists(key):
+            return {"key": key, "existing": True, "upload_url": None, "headers": {}}
+
+        checksum = base64.b64encode(bytes.fromhex(content_hash)).decode()
+        upload_url = self.s3_client.generate_presigned_url(
+            "put_object",
+            Params={
+                "Bucket": self.s3_bucket,
+                "Key": key,
+                "ContentType": content_type,
+                "ChecksumSHA256": checksum,
+            },
+            ExpiresIn=PRESIGNED_URL_EXPIRY
+        )
+        return {
+            "key": key,
+            "existing": False,
+            "upload_url": upload_url,
+            # Must be sent with the PUT for the signature and checksum to match
+            "headers": {"Content-Type": content_type, "x-amz-checksum-sha256": checksum},
+        }
+
+    def download_to_tempfile(self, key: str) -> BinaryIO:
+        """
+        Fetches an object into a seekable temp file (parsers need random access).
+        """
+        temp_file = tempfile.SpooledTemporaryFile(max_size=CHUNK_SIZE * 8)
+        self.s3_client.download_fileobj(self.s3_bucket, key, temp_file)
+        temp_file.seek(0)
+        return temp_file
+
+    def object_url(self, key: str) -> str:
+        if self.endpoint_url:
+            return f"{self.endpoint_url.rstrip('/')}/{self.s3_bucket}/{key}"
+        return f"https://{self.s3_bucket}.s3.{self.aws_region}.amazonaws.com/{key}"
+
+    def object_exists(self, key: str) -> bool:
+        try:
+            self.s3_client.head_object(Bucket=self.s3_bucket, Key=key)
+            return True
+        except ClientError as e:
+            if e.response.get("Error", {}).get("Code") in ("404", "NoSuchKey", "NotFound"):
+                return False
+            raise
+
+    def object_key(self, content_hash: str, ext: str = "") -> str:
+        return f"{S3_KEY_PREFIX}/{content_hash}{ext}"
+
+    def local_path(self, content_hash: str, ext: str = "") -> str:
+        # Shard by hash prefix so no single directory grows unbounded
+        return os.path.join(UPLOAD_DIR, content_hash[:2], content_hash[2:4], f"{content_hash}{ext}")
+
+    def _spool_and_hash(self, stream: BinaryIO):
+        digest = hashlib.sha256()
+        # Spool next to the final location so the local store is a rename, not a copy
+        fd, temp_path = tempfile.mkstemp(dir=UPLOAD_DIR, suffix=".part")
+        try:
+            with os.fdopen(fd, "wb") as temp_file:
+                while True:
+                    chunk = stream.read(CHUNK_SIZE)
+                    if not chunk:
+                        break
+                    digest.update(chunk)
+                    temp_file.write(chunk)
+        except Exception:
+            os.remove(temp_path)
+            raise
+        return temp_path, digest.hexdigest()
+
+    def _store_s3(self, temp_path: str, content_hash: str, ext: str, content_type: str) -> Dict:
+        key = self.object_key(content_hash, ext)
+        url = self.object_url(key)
+
+        if self.object_exists(key):
+            logger.info(f"File already on S3, skipping upload: {url}")
+            return {"location": url, "content_hash": content_hash, "existing": True}
+
+        self.s3_client.upload_file(
+            temp_path,
+            self.s3_bucket,
+            key,
+            ExtraArgs={'ContentType': content_type or "application/octet-stream"}
+        )
+        logger.info(f"File uploaded to S3: {url}")
+        return {"location": url, "content_hash": content_hash, "existing": False}
+
+    def _store_local(self, temp_path: str, content_hash: str, ext: str) -> Dict:
+        local_path = self.local_path(content_hash, ext)
+        if os.path.exists(local_path):
+            logger.info(f"File already stored locally: {local_path}")
+            return {"location": local_path, "content_hash": content_hash, "existing": True}
+
         try:
-            file.file.seek(0)
-            with open(local_path, "wb+") as file_object:
-                shutil.copyfileobj(file.file, file_object)
-            
+            os.makedirs(os.path.dirname(local_path), exist_ok=True)
+            os.replace(temp_path, local_path)
             logger.info(f"File saved locally: {local_path}")
-            return local_path
+            return {"location": local_path, "content_hash": content_hash, "existing": False}
         except Exception as e:
             logger.error(f"Local file save failed: {e}")
             raise e
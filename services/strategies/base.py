@@ -1,6 +1,9 @@
 from abc import ABC, abstractmethod
 
 class InterviewStrategy(ABC):
+    # Resume sections to include in the prompt, most relevant first
+    resume_sections = ("summary", "experience", "skills", "projects", "education")
+
     @abstractmethod
     def get_prompt(self, context: str, history: list, user_message: str) -> str:
         pass
@@ -1,6 +1,8 @@
 from .base import InterviewStrategy
 
 class BehavioralStrategy(InterviewStrategy):
+    resume_sections = ("experience", "projects", "summary")
+
     def get_prompt(self, context: str, history: list, user_message: str, role_level: str = "mid") -> str:
         specific_instruction = """
         **Current Step: Behavioral Interview**
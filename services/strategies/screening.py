@@ -1,6 +1,8 @@
 from .base import InterviewStrategy
 
 class ScreeningStrategy(InterviewStrategy):
+    resume_sections = ("summary", "experience", "education", "skills")
+
     def get_prompt(self, context: str, history: list, user_message: str, role_level: str = "mid") -> str:
         specific_instruction = """
         **Current Step: Screening Call**
@@ -1,6 +1,8 @@
 from .base import InterviewStrategy
 
 class SystemDesignStrategy(InterviewStrategy):
+    resume_sections = ("experience", "projects", "skills")
+
     def get_prompt(self, context: str, history: list, user_message: str, role_level: str = "mid") -> str:
         specific_instruction = """
         **Current Step: System Design**
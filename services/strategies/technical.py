@@ -2,22 +2,28 @@ from .base import InterviewStrategy
 from ..leetcode import leetcode_service
 
 class TechnicalStrategy(InterviewStrategy):
-    def get_prompt(self, context: str, history: list, user_message: str, role_level: str = "mid") -> str:
-        # Extract company name from context (simple heuristic)
-        # Context usually starts with "Job Title: ...\nCompany: ..."
-        company_name = "google" # Default
-        try:
-            for line in context.split('\n'):
-                if line.startswith("Company:"):
-                    company_name = line.split(":", 1)[1].strip()
-                    break
-        except:
-            pass
+    resume_sections = ("skills", "projects", "experience")
+
+    def get_prompt(self, context: str, history: list, user_message: str, role_level: str = "mid", problem: dict = None) -> str:
+        if problem is None:
+            # Extract company name from context (simple heuristic)
+            # Context usually starts with "Job Title: ...\nCompany: ..."
+            company_name = "google" # Default
+            try:
+                for line in context.split('\n'):
+                    if line.startswith("Company:"):
+                        company_name = line.split(":", 1)[1].strip()
+                        break
+            except:
+                pass
+                
+            problem = leetcode_service.get_random_problem(company_name)
             
-        problem = leetcode_service.get_random_problem(company_name)
         problem_text = ""
         if problem:
             problem_text = f"\n\n**Proposed Problem**: {problem['title']} ({problem['difficulty']})\nURL: {problem['url']}\n\nIf you haven't already, propose this problem to the candidate."
+            if problem.get("function_name"):
+                problem_text += f" Ask them to implement it as a Python function named `{problem['function_name']}` so it can be run against test cases."
 
         specific_instruction = f"""
         **Current Step: Technical Interview (Data Structures & Algorithms)**
@@ -28,7 +34,20 @@ class TechnicalStrategy(InterviewStrategy):
         """
         return f"{self._get_base_instruction(role_level)}\n{specific_instruction}\nContext: {context}\nCurrent conversation history:\n{history}\nUser: {user_message}"
 
-    def evaluate(self, context: str, history: list) -> str:
+    def evaluate(self, context: str, history: list, code_results: dict = None) -> str:
+        results_text = ""
+        if code_results and code_results.get("tests"):
+            tests = code_results["tests"]
+            results_text = f"\n        **Objective Test Results**: {tests['passed']}/{tests['total']} test cases passed."
+            if tests.get("error"):
+                results_text += f" Error: {tests['error']}"
+        if code_results and code_results.get("complexity", {}).get("time"):
+            complexity = code_results["complexity"]
+            results_text += (
+                f"\n        **Measured Complexity** (empirical estimate): time {complexity['time']}, space {complexity['space']}."
+                " Compare this with the complexity the candidate claimed."
+            )
+            
         prompt = f"""
         {self._get_evaluation_instruction()}
         
@@ -40,6 +59,7 @@ class TechnicalStrategy(InterviewStrategy):
         - Did they handle edge cases?
         - Did they communicate their thought process?
         - Code quality and cleanliness.
+        {results_text}
         
         Context: {context}
         Conversation History: {history}
@@ -5,41 +5,310 @@ from dotenv import load_dotenv
 
 load_dotenv()
 
-from typing import Iterator
+import re
+import time
+import queue
+import threading
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Iterable, Iterator, List, Optional
 from ..core.logger import get_logger
+from ..core.metrics import TTS_SECONDS, observe
 
 logger = get_logger(__name__)
 
+# Shared, bounded pool for chunked synthesis; each request keeps at most
+# TTS_CHUNK_WINDOW sentences in flight ahead of playback
+TTS_CHUNK_WORKERS = int(os.getenv("TTS_CHUNK_WORKERS", 8))
+TTS_CHUNK_WINDOW = int(os.getenv("TTS_CHUNK_WINDOW", 3))
+TTS_MIN_CHUNK_CHARS = 40
+_chunk_executor = ThreadPoolExecutor(max_workers=TTS_CHUNK_WORKERS, thread_name_prefix="tts-chunk")
+
+# Provider health: after N consecutive failures a provider is skipped for a cooldown
+TTS_ACQUIRE_TIMEOUT = float(os.getenv("TTS_ACQUIRE_TIMEOUT", 10))
+TTS_DEGRADE_AFTER_FAILURES = int(os.getenv("TTS_DEGRADE_AFTER_FAILURES", 3))
+TTS_DEGRADE_COOLDOWN = float(os.getenv("TTS_DEGRADE_COOLDOWN", 30))
+
+_SENTENCE_BOUNDARY = re.compile(r"(?<=[.!?])\s+")
+
+def split_sentences(text: str, min_chars: int = TTS_MIN_CHUNK_CHARS) -> List[str]:
+    """
+    Splits text at sentence boundaries, merging very short sentences ("Great.")
+    into the next one so we don't pay a round trip per fragment.
+    """
+    chunks = []
+    pending = ""
+    for sentence in _SENTENCE_BOUNDARY.split(text.strip()):
+        sentence = sentence.strip()
+        if not sentence:
+            continue
+        pending = f"{pending} {sentence}" if pending else sentence
+        if len(pending) >= min_chars:
+            chunks.append(pending)
+            pending = ""
+    if pending:
+        chunks.append(pending)
+    return chunks
+
+class SentenceBuffer:
+    """
+    Accumulates streamed text and releases it a sentence (chunk) at a time,
+    using the same boundaries and merging rules as split_sentences.
+    """
+    def __init__(self, min_chars: int = TTS_MIN_CHUNK_CHARS):
+        self.min_chars = min_chars
+        self._buffer = ""
+
+    def feed(self, text: str) -> List[str]:
+        self._buffer += text
+        boundaries = list(_SENTENCE_BOUNDARY.finditer(self._buffer))
+        if not boundaries:
+            return []
+
+        cut = boundaries[-1].end()
+        ready = split_sentences(self._buffer[:cut], self.min_chars)
+        rest = self._buffer[cut:]
+        # A short trailing sentence waits to be merged with what comes next
+        if ready and len(ready[-1]) < self.min_chars:
+            rest = f"{ready.pop()} {rest}"
+        self._buffer = rest
+        return ready
+
+    def flush(self) -> List[str]:
+        rest = self._buffer.strip()
+        self._buffer = ""
+        return [rest] if rest else []
+
+class TTSBusyError(Exception):
+    pass
+
 class TTSService:
-    def generate_speech(self, text: str) -> Iterator[bytes]:
+    # Everything that changes the synthesized audio; used for cache keys
+    provider = ""
+    voice = ""
+    audio_format = "mp3"
+    media_type = "audio/mpeg"
+    max_concurrency = 8
+
+    def __init__(self):
+        self._limiter = threading.BoundedSemaphore(self.max_concurrency)
+        self._consecutive_failures = 0
+        self._degraded_until = 0.0
+
+    def health_check(self):
+        """
+        Cheap call that forces connection and credential setup. Raises on failure.
+        """
         raise NotImplementedError
 
+    def is_degraded(self) -> bool:
+        return time.monotonic() < self._degraded_until
+
+    def synthesize(self, text: str) -> bytes:
+        with self._slot():
+            try:
+                with observe(TTS_SECONDS, provider=self.provider):
+                    audio = self._synthesize(text)
+            except Exception:
+                self._record_failure()
+                raise
+        self._record_success()
+        return audio
+
+    def generate_speech(self, text: str, release: Optional[Callable[[], None]] = None) -> Iterator[bytes]:
+        """
+        release: from reserve(), when the caller took the slot before the
+        response started; otherwise the slot is taken on first iteration.
+        """
+        release = release or self.reserve()
+        try:
+            try:
+                with observe(TTS_SECONDS, provider=self.provider):
+                    for chunk in self._stream(text):
+                        yield chunk
+            except Exception:
+                self._record_failure()
+                raise
+            self._record_success()
+        finally:
+            release()
+
+    def _synthesize(self, text: str) -> bytes:
+        raise NotImplementedError
+
+    def _stream(self, text: str) -> Iterator[bytes]:
+        yield self._synthesize(text)
+
+    def reserve(self) -> Callable[[], None]:
+        """
+        Takes a concurrency slot (TTSBusyError if none frees up in time) and
+        returns its release function, which only releases once however often it's called.
+        """
+        if not self._limiter.acquire(timeout=TTS_ACQUIRE_TIMEOUT):
+            raise TTSBusyError(f"{self.provider} TTS is at capacity")
+        released = threading.Lock()
+
+        def release():
+            if released.acquire(blocking=False):
+                self._limiter.release()
+        return release
+
+    def has_capacity(self) -> bool:
+        # A snapshot, not a reservation; for streams whose chunks take their own slots
+        if not self._limiter.acquire(blocking=False):
+            return False
+        self._limiter.release()
+        return True
+
+    @contextmanager
+    def _slot(self):
+        release = self.reserve()
+        try:
+            yield
+        finally:
+            release()
+
+    def _record_failure(self):
+        if self._degraded_until and time.monotonic() >= self._degraded_until:
+            # Cooldown over: the provider starts again with a full failure budget
+            self._consecutive_failures = 0
+            self._degraded_until = 0.0
+        self._consecutive_failures += 1
+        if self._consecutive_failures >= TTS_DEGRADE_AFTER_FAILURES:
+            self._degraded_until = time.monotonic() + TTS_DEGRADE_COOLDOWN
+            logger.warning(f"{self.provider} TTS marked degraded for {TTS_DEGRADE_COOLDOWN}s")
+
+    def _record_success(self):
+        self._consecutive_failures = 0
+        self._degraded_until = 0.0
+
+    def generate_speech_chunked(self, text: str, cache=None) -> Iterator[bytes]:
+        """
+        Synthesizes sentence chunks concurrently and yields the audio in order,
+        so playback can start once the first sentence is ready.
+        MP3 frames concatenate cleanly, so the chunks form one playable stream.
+        """
+        return self.synthesize_stream(split_sentences(text), cache=cache)
+
+    def synthesize_stream(self, sentences: Iterable[str], cache=None) -> Iterator[bytes]:
+        """
+        Like generate_speech_chunked, but pulls sentences lazily from any iterable
+        (e.g. an LLM stream). The iterable is consumed on a feeder thread so audio
+        for earlier sentences is yielded while later ones are still being produced.
+        At most TTS_CHUNK_WINDOW sentences are in flight ahead of the consumer.
+        """
+        pending: "queue.Queue" = queue.Queue()
+        window = threading.Semaphore(TTS_CHUNK_WINDOW)
+        stopped = threading.Event()
+
+        def feed():
+            try:
+                for sentence in sentences:
+                    window.acquire()
+                    if stopped.is_set():
+                        return
+                    pending.put(_chunk_executor.submit(self._synthesize_cached, sentence, cache))
+            except Exception as e:
+                pending.put(e)
+            finally:
+                # Stopped early: close a generator source here, on its own thread, so its cleanup runs now
+                try:
+                    getattr(sentences, "close", lambda: None)()
+                except Exception as e:
+                    logger.error(f"Error closing TTS sentence source: {e}")
+                pending.put(None)
+
+        threading.Thread(target=feed, name="tts-feed", daemon=True).start()
+
+        try:
+            while True:
+                item = pending.get()
+                if item is None:
+                    break
+                if isinstance(item, Exception):
+                    raise item
+                audio = item.result()
+                window.release()
+                yield audio
+        finally:
+            # Client went away: stop the feeder and drop work that hasn't started yet
+            stopped.set()
+            window.release()
+            while not pending.empty():
+                item = pending.get_nowait()
+                if hasattr(item, "cancel"):
+                    item.cancel()
+
+    def _synthesize_cached(self, text: str, cache=None) -> bytes:
+        if cache is None:
+            return self.synthesize(text)
+
+        key = cache.make_key(text, self.provider, self.voice, self.audio_format)
+        path = cache.get(key)
+        if path:
+            try:
+                with open(path, "rb") as f:
+                    return f.read()
+            except FileNotFoundError:
+                pass # Evicted between lookup and read
+        audio = self.synthesize(text)
+        cache.put(key, audio)
+        return audio
+
 class OpenAITTSService(TTSService):
-    def __init__(self):
-        self.client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+    provider = "openai:tts-1"
+    voice = "alloy"
+    max_concurrency = int(os.getenv("TTS_MAX_CONCURRENCY_OPENAI", 8))
 
-    def generate_speech(self, text: str) -> Iterator[bytes]:
+    def __init__(self):
         if not os.getenv("OPENAI_API_KEY"):
             raise Exception("OPENAI_API_KEY not found")
-            
+        super().__init__()
+        self.client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+
+    def health_check(self):
+        self.client.models.retrieve("tts-1")
+
+    def _synthesize(self, text: str) -> bytes:
         try:
             response = self.client.audio.speech.create(
                 model="tts-1",
-                voice="alloy",
+                voice=self.voice,
                 input=text
             )
-            # Stream the response
-            return response.iter_bytes()
+            return response.content
+        except Exception as e:
+            logger.error(f"Error generating OpenAI speech: {e}")
+            raise e
+
+    def _stream(self, text: str) -> Iterator[bytes]:
+        try:
+            with self.client.audio.speech.with_streaming_response.create(
+                model="tts-1",
+                voice=self.voice,
+                input=text
+            ) as response:
+                # Stream the response
+                for chunk in response.iter_bytes():
+                    yield chunk
         except Exception as e:
             logger.error(f"Error generating OpenAI speech: {e}")
             raise e
 
 class GoogleTTSService(TTSService):
+    provider = "google"
+    voice = "en-US-Wavenet-D"
+    max_concurrency = int(os.getenv("TTS_MAX_CONCURRENCY_GOOGLE", 16))
+
     def __init__(self):
+        super().__init__()
         # Assumes GOOGLE_APPLICATION_CREDENTIALS is set in env
         self.client = texttospeech.TextToSpeechClient()
 
-    def generate_speech(self, text: str) -> Iterator[bytes]:
+    def health_check(self):
+        self.client.list_voices(language_code="en-US")
+
+    def _synthesize(self, text: str) -> bytes:
         try:
             synthesis_input = texttospeech.SynthesisInput(text=text)
             
@@ -47,7 +316,7 @@ class GoogleTTSService(TTSService):
             # voice gender ("neutral")
             voice = texttospeech.VoiceSelectionParams(
                 language_code="en-US",
-                name="en-US-Wavenet-D", # Standard WaveNet voice
+                name=self.voice, # Standard WaveNet voice
                 ssml_gender=texttospeech.SsmlVoiceGender.NEUTRAL
             )
 
@@ -59,15 +328,71 @@ class GoogleTTSService(TTSService):
             response = self.client.synthesize_speech(
                 input=synthesis_input, voice=voice, audio_config=audio_config
             )
-
-            # Google TTS returns full content, so we yield it as a single chunk
-            yield response.audio_content
+            # Google TTS returns full content, so streams yield it as a single chunk
+            return response.audio_content
         except Exception as e:
             logger.error(f"Error generating Google speech: {e}")
             raise e
 
+class TTSProviderRegistry:
+    """
+    Holds one long-lived client per tier (a gRPC channel / HTTP pool each),
+    created lazily or at startup, and falls back from premium to free
+    while a provider is degraded.
+    """
+    PROVIDERS = {
+        "premium": OpenAITTSService,
+        "free": GoogleTTSService,
+    }
+    FALLBACKS = {"premium": "free"}
+
+    def __init__(self):
+        self._services: Dict[str, TTSService] = {}
+        self._lock = threading.Lock()
+
+    def get(self, tier: Optional[str] = "free") -> TTSService:
+        tier = tier if tier in self.PROVIDERS else "free"
+        fallback = self.FALLBACKS.get(tier)
+
+        try:
+            service = self._get_or_create(tier)
+        except Exception as e:
+            if not fallback:
+                raise
+            logger.warning(f"TTS tier '{tier}' unavailable ({e}); falling back to '{fallback}'")
+            return self.get(fallback)
+
+        if service.is_degraded() and fallback:
+            logger.info(f"TTS tier '{tier}' degraded; falling back to '{fallback}'")
+            return self.get(fallback)
+        return service
+
+    def warmup(self):
+        """
+        Creates every provider client and runs its health check. Failures are
+        logged and the provider is retried lazily on first use.
+        """
+        for tier in self.PROVIDERS:
+            try:
+                service = self._get_or_create(tier)
+                service.health_check()
+                logger.info(f"TTS tier '{tier}' ({service.provider}) warmed up")
+            except Exception as e:
+                logger.warning(f"TTS tier '{tier}' warmup failed: {e}")
+                with self._lock:
+                    self._services.pop(tier, None)
+
+    def _get_or_create(self, tier: str) -> TTSService:
+        service = self._services.get(tier)
+        if service:
+            return service
+        with self._lock:
+            if tier not in self._services:
+                self._services[tier] = self.PROVIDERS[tier]()
+            return self._services[tier]
+
+tts_registry = TTSProviderRegistry()
+
 def get_tts_service(tier: str = "free") -> TTSService:
-    if tier == "premium":
-        return OpenAITTSService()
-    else:
-        return GoogleTTSService()
+    # Blocks while a tier's client is created (first use without warmup); async code runs it in the threadpool
+    return tts_registry.get(tier)
@@ -1,13 +1,16 @@
 import os
 import json
+import uuid
 from google import genai
 from google.genai.types import Tool, GenerateContentConfig, GoogleSearch
 from .celery_worker import celery_app
-from .core.database import get_session
+from .core.database import get_session, pin_to_primary
 from .core.models import Session, SessionStep, StepType, StepStatus
 from sqlmodel import select, Session as DbSession
 from typing import List, Dict
 from .core.logger import get_logger
+# Imported for its ORM hooks: commits made here invalidate the cached session views
+from .repositories import session as _session_views
 
 logger = get_logger(__name__)
 
@@ -23,6 +26,8 @@ def perform_interview_research(session_id: str, company: str, role: str):
     Background task to research interview process using Gemini with Google Search Grounding.
     """
     logger.info(f"Starting research for {company} - {role} (Session {session_id})")
+    # Task arguments arrive as JSON strings; the UUID columns need UUIDs (SQLite rejects str)
+    session_id = uuid.UUID(session_id)
     
     # 1. Update status to processing
     from .core.database import engine
@@ -34,6 +39,8 @@ def perform_interview_research(session_id: str, company: str, role: str):
         session.research_status = "processing"
         db.add(session)
         db.commit()
+        # The owner is polling research status; keep those reads off lagging replicas
+        pin_to_primary(str(session.user_id))
 
     try:
         if not client:
@@ -135,6 +142,7 @@ def perform_interview_research(session_id: str, company: str, role: str):
                 session.research_data = final_data
                 db.add(session)
                 db.commit()
+                pin_to_primary(str(session.user_id))
                 
         logger.info(f"Research completed for {session_id}")
         
@@ -146,6 +154,7 @@ def perform_interview_research(session_id: str, company: str, role: str):
                 session.research_status = "failed"
                 db.add(session)
                 db.commit()
+                pin_to_primary(str(session.user_id))
 
 @celery_app.task
 def perform_context_research(session_id: str, company: str, role: str):
@@ -153,6 +162,7 @@ def perform_context_research(session_id: str, company: str, role: str):
     Background task to research company/role context using Gemini with Google Search Grounding.
     """
     logger.info(f"Starting context research for {company} - {role} (Session {session_id})")
+    session_id = uuid.UUID(session_id)
     from .core.database import engine
     from .core.models import ContextData
 
@@ -199,3 +209,44 @@ def perform_context_research(session_id: str, company: str, role: str):
 
     except Exception as e:
         logger.error(f"Error in context research task: {e}")
+
+@celery_app.task
+def parse_uploaded_resume(resume_id: str, key: str, filename: str):
+    """
+    Background task to parse a resume uploaded directly to object storage.
+    """
+    logger.info(f"Parsing uploaded resume {resume_id} ({key})")
+    from .services.parser import parser_service
+    from .services.storage import storage_service
+
+    try:
+        with storage_service.download_to_tempfile(key) as stream:
+            parsed_text = parser_service.parse_resume(stream, filename=filename)
+        if not parsed_text:
+            # parse_resume logs the cause and returns "" on errors
+            raise ValueError("No text could be extracted from the resume")
+
+        sections = parser_service.segment_resume(parsed_text)
+        digest = parser_service.build_digest(sections)
+        _finish_resume_parse(resume_id, parsed_content=parsed_text, sections=sections, digest=digest,
+                             parse_status="completed", parse_error=None)
+        logger.info(f"Resume parsing completed for {resume_id}")
+
+    except Exception as e:
+        logger.error(f"Error in resume parsing task: {e}")
+        # Recorded so clients polling the resume can stop waiting
+        _finish_resume_parse(resume_id, parse_status="failed", parse_error=str(e)[:500])
+
+def _finish_resume_parse(resume_id: str, **values):
+    from .core.database import engine
+    from .core.models import Resume
+
+    with DbSession(engine) as db:
+        resume = db.get(Resume, uuid.UUID(resume_id))
+        if not resume:
+            logger.warning(f"Resume {resume_id} not found")
+            return
+        for name, value in values.items():
+            setattr(resume, name, value)
+        db.add(resume)
+        db.commit()
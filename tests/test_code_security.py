@@ -0,0 +1,40 @@
+import pytest
+
+from backend.services.code import code_service
+
+FRAME_ESCAPE = """
+def gen():
+    yield it.gi_frame.f_back
+it = gen()
+for frame in it:
+    break
+print(frame.f_globals["os"].environ)
+"""
+
+UNSAFE = [
+    FRAME_ESCAPE,
+    "print(().__class__.__base__.__subclasses__())",
+    "f = lambda: 1\nprint(getattr(f, '__globals__'))",
+    "print(vars(print))",
+    "print(type(print))",
+    "def gen():\n    yield 1\ng = gen()\nprint('{0.gi_frame.f_back}'.format(g))",
+    "try:\n    1 / 0\nexcept Exception as e:\n    print(e.__traceback__.tb_frame)",
+    "print(__builtins__)",
+]
+
+SAFE = [
+    "print(sum(range(10)))",
+    "def solve(nums):\n    return sorted(nums)\n\nif __name__ == \"__main__\":\n    print(solve([3, 1, 2]))",
+    "class Node:\n    def __init__(self, val):\n        self.val = val\nprint(Node(1).val)",
+]
+
+@pytest.mark.parametrize("code", UNSAFE)
+def test_rejects_unrestricted_object_access(code):
+    assert not code_service._is_safe_code(code)
+
+@pytest.mark.parametrize("code", SAFE)
+def test_allows_ordinary_submissions(code):
+    assert code_service._is_safe_code(code)
+
+def test_frame_escape_never_reaches_the_sandbox():
+    assert code_service.run_code(FRAME_ESCAPE).startswith("Error: Security violation")